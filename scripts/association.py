@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Station <-> AP association registry.
+
+LLF used to derive AP load by scanning every station's
+wintfs[0].associatedTo for every AP on every decision. The registry
+instead keeps a station set per AP, updated on associate/disconnect
+events, so a load lookup is a set length and all controllers read the
+same counts. `version` increases on every change, for caches that depend
+on the load state.
+"""
+
+import numpy as np
+
+
+class AssociationRegistry:
+    """Per-AP station sets and loads, maintained from association events"""
+
+    def __init__(self, aps, background=None):
+        """
+        Args:
+            aps: List of AP objects (column order of loads())
+            background: Optional dict {ap: count} of stations that load an AP
+                        but are not tracked individually
+        """
+        self.aps = list(aps)
+        self.ap_index = {ap: i for i, ap in enumerate(self.aps)}
+        self._stations = {ap: set() for ap in self.aps}
+        self._station_ap = {}
+        self._background = {ap: 0 for ap in self.aps}
+        self.version = 0
+        for ap, count in (background or {}).items():
+            self.set_background(ap, count)
+
+    @classmethod
+    def from_net(cls, net, aps, background=None):
+        """Registry seeded from the current wintfs associations (one scan)"""
+        registry = cls(aps, background)
+        by_intf = {ap.wintfs[0]: ap for ap in registry.aps if getattr(ap, 'wintfs', None)}
+        for sta in getattr(net, 'stations', []):
+            try:
+                ap = by_intf.get(sta.wintfs[0].associatedTo)
+            except (AttributeError, IndexError):
+                continue
+            if ap is not None:
+                registry.associate(sta, ap)
+        return registry
+
+    def associate(self, sta, ap):
+        """Record that sta is now associated to ap (leaving its previous AP)"""
+        old_ap = self._station_ap.get(sta)
+        if old_ap is ap:
+            return
+        if old_ap is not None:
+            self._stations[old_ap].discard(sta)
+        self._stations[ap].add(sta)
+        self._station_ap[sta] = ap
+        self.version += 1
+
+    def disconnect(self, sta):
+        """Record that sta is no longer associated"""
+        old_ap = self._station_ap.pop(sta, None)
+        if old_ap is not None:
+            self._stations[old_ap].discard(sta)
+            self.version += 1
+
+    def set_background(self, ap, count):
+        """Set the untracked station count of an AP"""
+        if self._background[ap] != count:
+            self._background[ap] = count
+            self.version += 1
+
+    def ap_of(self, sta):
+        """AP the station is associated to, or None"""
+        return self._station_ap.get(sta)
+
+    def stations(self, ap):
+        """Stations associated to an AP"""
+        return frozenset(self._stations[ap])
+
+    def load(self, ap):
+        """Number of stations on an AP, background included"""
+        return len(self._stations[ap]) + self._background[ap]
+
+    def loads(self):
+        """Load of every AP as an int array in aps order (one consistent snapshot)"""
+        return np.array([self.load(ap) for ap in self.aps], dtype=int)
+
+    def snapshot(self):
+        """Load of every AP as a dict {ap: load}"""
+        return {ap: self.load(ap) for ap in self.aps}
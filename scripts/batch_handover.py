@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Multi-station handover controller.
+
+One controller drives any number of stations: station positions and
+current associations are arrays, and SSF (with hysteresis), LLF (load
+first, RSSI tiebreak) and MCDM (Entropy + TOPSIS) are evaluated over the
+full station x AP matrix at once. AP associations are column indices into
+`aps`, with -1 meaning "not associated". Every decision takes optional
+`rows` to re-decide only some stations (see dirty_tracker.py); the others
+keep their current AP.
+"""
+
+import time
+
+import numpy as np
+from signal_engine import SignalEngine
+from rssi_filter import RSSIFilter, TimeToTrigger
+from mcdm import (entropy_weights_batch, topsis_batch, get_criteria, benefit_mask,
+                  build_decision_matrices)
+
+
+class BatchHandover:
+    """SSF / LLF / MCDM decisions for a whole station population per tick"""
+
+    def __init__(self, aps, ap_positions, hysteresis_margin=5, min_rssi_threshold=-90,
+                 ap_range=None, criteria=('rssi', 'delay'), chunk_size=4096, radio_map=None,
+                 propagation=None, filter_alpha=None, filter_window=None, time_to_trigger=0.0):
+        """
+        Args:
+            aps: List of AP objects (column order of all arrays)
+            ap_positions: Dict {ap: position}
+            hysteresis_margin: SSF margin in dB
+            min_rssi_threshold: LLF reachability threshold in dBm
+            ap_range: If set, APs farther than this are never candidates
+            criteria: MCDM criteria names from the mcdm registry
+            chunk_size: Stations evaluated per matrix, bounds peak memory
+            radio_map: Optional RadioMap of this layout for RSSI lookups
+            propagation: Propagation model name, spec or instance (default free space)
+            filter_alpha, filter_window: SSF RSSI smoothing per (station, AP),
+                                         EWMA weight or window length (rssi_filter.py)
+            time_to_trigger: Seconds an SSF handover condition must hold
+        """
+        self.aps = aps
+        self.hysteresis_margin = hysteresis_margin
+        self.min_rssi_threshold = min_rssi_threshold
+        self.ap_range = ap_range
+        self.criteria = get_criteria(criteria)
+        self.benefit = benefit_mask(self.criteria)
+        self.chunk_size = chunk_size
+        self.engine = SignalEngine(aps, ap_positions, model=propagation)
+        self.engine.attach_radio_map(radio_map)
+
+        # SSF smoothing state, sized on first use for the station population
+        self.filter_params = {}
+        if filter_alpha is not None or filter_window is not None:
+            self.filter_params = {'alpha': filter_alpha, 'window': filter_window}
+        self.time_to_trigger = time_to_trigger
+        self.rssi_filter = None
+        self.ttt = None
+
+    def _chunks(self, n, rows=None):
+        """Station index blocks of at most chunk_size: slices, or slices of rows"""
+        if rows is None:
+            for start in range(0, n, self.chunk_size):
+                yield slice(start, min(start + self.chunk_size, n))
+        else:
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            for start in range(0, len(rows), self.chunk_size):
+                yield rows[start:start + self.chunk_size]
+
+    def _signal(self, sta_positions, need_distance=False):
+        """Distance (None if not needed), RSSI and in-range mask, each (stations, APs)"""
+        distances = None
+        if need_distance or self.ap_range is not None or self.engine.radio_map is None:
+            distances = self.engine.distance_matrix(sta_positions)
+        if self.engine.radio_map is None:
+            rssi = self.engine.rssi_from_distance(distances, sta_positions)
+        else:
+            rssi = self.engine.rssi_matrix(sta_positions)
+        if self.ap_range is None:
+            in_range = np.ones(rssi.shape, dtype=bool)
+        else:
+            in_range = distances <= self.ap_range
+        return distances, rssi, in_range
+
+    def _smoothing_state(self, n_stations):
+        """Filter / time-to-trigger state for n_stations (fresh if the population size changed)"""
+        if self.filter_params and (self.rssi_filter is None or
+                                   self.rssi_filter.n_stations != n_stations):
+            self.rssi_filter = RSSIFilter(n_stations, len(self.aps), **self.filter_params)
+        if self.time_to_trigger > 0 and (self.ttt is None or self.ttt.n_stations != n_stations):
+            self.ttt = TimeToTrigger(n_stations, self.time_to_trigger)
+
+    def pending(self):
+        """Bool array of stations with a pending time-to-trigger condition (None without TTT)"""
+        if self.ttt is None:
+            return None
+        return self.ttt.candidate >= 0
+
+    @staticmethod
+    def _finish(decided, current):
+        handover = (decided != current) & (decided >= 0)
+        return decided, handover
+
+    def ssf(self, sta_positions, current, now=None, rows=None):
+        """
+        Strongest Signal First with hysteresis for every station.
+
+        With smoothing, station i of every call is row i of the filter
+        state, so keep the station order stable between ticks.
+
+        Args:
+            sta_positions: Array (stations, 2 or 3)
+            current: Int array (stations,) of current AP columns, -1 = none
+            now: Time in seconds for time-to-trigger (default monotonic clock)
+            rows: Optional indices (or bool mask) of the stations to re-decide
+
+        Returns:
+            (decided, handover): AP column per station and bool handover flags
+        """
+        sta_positions = np.asarray(sta_positions, dtype=float)
+        current = np.asarray(current, dtype=int)
+        decided = current.copy()
+        self._smoothing_state(len(current))
+        if self.ttt is not None and now is None:
+            now = time.monotonic()
+        for sl in self._chunks(len(current), rows):
+            _, rssi, in_range = self._signal(sta_positions[sl])
+            if self.rssi_filter is not None:
+                rssi = self.rssi_filter.update(
+                    rssi, rows=np.arange(sl.start, sl.stop) if rows is None else sl)
+            rssi = np.where(in_range, rssi, -np.inf)
+            cur = current[sl]
+            i = np.arange(len(cur))
+
+            best = np.argmax(rssi, axis=1)
+            best_rssi = rssi[i, best]
+            cur_rssi = np.where(cur >= 0, rssi[i, np.maximum(cur, 0)], -np.inf)
+
+            # Stay if the current AP is still in range and the best is not
+            # better by the hysteresis margin; stay if nothing is in range
+            with np.errstate(invalid='ignore'):
+                stay = np.isfinite(cur_rssi) & (best_rssi - cur_rssi < self.hysteresis_margin)
+            stay |= ~np.isfinite(best_rssi)
+            if self.ttt is not None:
+                # Stations whose current AP is still in range switch only once the
+                # same target held for time_to_trigger; a lost link is left at once
+                switching = ~stay & np.isfinite(cur_rssi) & (best != cur)
+                fire = self.ttt.check(np.where(switching, best, -1), now, rows=sl)
+                stay |= switching & ~fire
+            decided[sl] = np.where(stay, cur, best)
+        return self._finish(decided, current)
+
+    def llf(self, sta_positions, current, loads, rows=None):
+        """
+        Least-Loaded First for every station, RSSI as tiebreaker.
+
+        All stations decide against the same load snapshot (the loads at
+        the start of the tick); use association_loads() on the result to
+        get the loads for the next tick. A station does not count toward
+        the load of its own current AP, or it would always leave it for an
+        equally loaded neighbour.
+
+        Args:
+            sta_positions: Array (stations, 2 or 3)
+            current: Int array (stations,) of current AP columns, -1 = none
+            loads: Array (APs,) of associated station counts, these stations
+                   included (AssociationRegistry.loads(), association_loads())
+            rows: Optional indices (or bool mask) of the stations to re-decide
+
+        Returns:
+            (decided, handover): AP column per station and bool handover flags
+        """
+        sta_positions = np.asarray(sta_positions, dtype=float)
+        current = np.asarray(current, dtype=int)
+        loads = np.asarray(loads, dtype=float)
+        decided = current.copy()
+        for sl in self._chunks(len(current), rows):
+            _, rssi, in_range = self._signal(sta_positions[sl])
+            reachable = in_range & (rssi >= self.min_rssi_threshold)
+            cur = current[sl]
+
+            # Loads as each station sees them: without itself on its current AP
+            station_loads = np.repeat(loads[None], len(cur), axis=0)
+            associated = np.flatnonzero(cur >= 0)
+            station_loads[associated, cur[associated]] -= 1
+
+            # Lowest load among reachable APs, then strongest RSSI among those
+            masked_load = np.where(reachable, station_loads, np.inf)
+            min_load = np.min(masked_load, axis=1, keepdims=True)
+            tied = reachable & (masked_load == min_load)
+            best = np.argmax(np.where(tied, rssi, -np.inf), axis=1)
+
+            decided[sl] = np.where(reachable.any(axis=1), best, cur)
+        return self._finish(decided, current)
+
+    def mcdm(self, sta_positions, current, load_factors, loads=None, channel_utilization=None,
+             rows=None):
+        """
+        Entropy-weighted TOPSIS over the configured criteria for every station.
+
+        Args:
+            sta_positions: Array (stations, 2 or 3)
+            current: Int array (stations,) of current AP columns, -1 = none
+            load_factors: Array (APs,) of congestion factors (1.0 = normal)
+            loads: Optional array (APs,) of associated station counts
+            channel_utilization: Optional array (APs,) of busy airtime 0..1
+            rows: Optional indices (or bool mask) of the stations to re-decide
+
+        Returns:
+            (decided, handover): AP column per station and bool handover flags
+        """
+        sta_positions = np.asarray(sta_positions, dtype=float)
+        current = np.asarray(current, dtype=int)
+        context = {'load_factor': np.asarray(load_factors, dtype=float)}
+        if loads is not None:
+            context['load'] = np.asarray(loads, dtype=float)
+        if channel_utilization is not None:
+            context['channel_utilization'] = np.asarray(channel_utilization, dtype=float)
+
+        decided = current.copy()
+        for sl in self._chunks(len(current), rows):
+            signal = self._signal(sta_positions[sl], need_distance=True)
+            context['distance'], context['rssi'], in_range = signal
+            matrices = build_decision_matrices(self.criteria, context)
+
+            weights = entropy_weights_batch(matrices, mask=in_range)
+            best, _ = topsis_batch(matrices, weights, benefit=self.benefit, mask=in_range)
+            decided[sl] = np.where(best >= 0, best, current[sl])
+        return self._finish(decided, current)
+
+    def association_loads(self, decided):
+        """Station count per AP column for an association array"""
+        return np.bincount(decided[decided >= 0], minlength=len(self.aps))
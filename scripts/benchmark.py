@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the handover decision hot paths (no Mininet needed).
+
+Single-station entry points are timed per call at every AP count:
+
+    ssf.select_best_ap       ssf2.SSFHandover
+    llf.select_best_ap       llf.LLFHandover
+    mcdm.mcdm_decision       mcdm_ssf_compare.HandoverComparison
+    mcdm.entropy_weights     HandoverComparison.calculate_entropy_weights
+    mcdm.apply_topsis        HandoverComparison.apply_topsis
+    mcdm.memo_decision       mcdm_decision with a DecisionMemo over a
+                             recurring set of positions
+
+and the whole-population paths (BatchHandover ssf/llf/mcdm) at every AP
+and station count. Each case reports decisions/second and per-call
+latency percentiles; results go to a JSON file that a later run can be
+compared against:
+
+    python3 scripts/benchmark.py --output bench_before.json
+    python3 scripts/benchmark.py --compare bench_before.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+DEFAULT_APS = (2, 4, 64, 1024)
+DEFAULT_STATIONS = (1, 10, 100, 1000, 10000)
+AREA = (140.0, 90.0)  # plot area of the scripts, meters
+AP_RANGE = 60
+
+
+def time_calls(fn, min_time=0.2, min_calls=5, max_calls=10000):
+    """
+    Call fn() repeatedly, timing every call.
+
+    Returns:
+        Array of per-call durations in seconds
+    """
+    fn()  # warm-up: caches, lazy allocations
+    durations = []
+    total = 0.0
+    while len(durations) < max_calls and (total < min_time or len(durations) < min_calls):
+        t_start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t_start
+        durations.append(elapsed)
+        total += elapsed
+    return np.array(durations)
+
+
+def summarize(name, durations, aps, stations=1):
+    """One result row: decisions/s and latency percentiles in microseconds"""
+    p50, p90, p99 = np.percentile(durations, (50, 90, 99)) * 1e6
+    return {
+        'name': name,
+        'aps': aps,
+        'stations': stations,
+        'calls': len(durations),
+        'decisions_per_s': stations / durations.mean(),
+        'mean_us': durations.mean() * 1e6,
+        'p50_us': p50,
+        'p90_us': p90,
+        'p99_us': p99,
+    }
+
+
+def ap_layout(n_aps, rng):
+    """n_aps AP positions over the plot area ('x,y,0' strings)"""
+    xy = rng.uniform((0, 0), AREA, (n_aps, 2))
+    return [f'{x:.1f},{y:.1f},0' for x, y in xy]
+
+
+def single_station_cases(n_aps, rng):
+    """(name, fn) of the single-station entry points on an n_aps layout"""
+    from headless import HeadlessNet
+    import ssf2
+    import llf
+    import mcdm_ssf_compare
+    from decision_memo import DecisionMemo
+
+    net = HeadlessNet()
+    sta = net.addStation('sta1', position='10,20,0')
+    aps = [net.addAccessPoint(f'ap{i + 1}', position=pos, range=AP_RANGE)
+           for i, pos in enumerate(ap_layout(n_aps, rng))]
+    ssf = ssf2.SSFHandover(net, sta, aps, ap_range=AP_RANGE)
+    lf = llf.LLFHandover(net, sta, aps, ap_range=AP_RANGE)
+    ap_configs = {ap: {'position': ap.params['position'], 'load': float(load)}
+                  for ap, load in zip(aps, rng.uniform(1.0, 2.5, n_aps))}
+    comparator = mcdm_ssf_compare.HandoverComparison(aps, ap_configs)
+    memoized = mcdm_ssf_compare.HandoverComparison(aps, ap_configs, memo=DecisionMemo())
+
+    # Walk the station over a fixed set of positions, one per call
+    positions = [f'{x:.1f},{y:.1f},0' for x, y in rng.uniform((0, 0), AREA, (256, 2))]
+    step = {'i': 0}
+
+    def moved(decide):
+        def call():
+            step['i'] = (step['i'] + 1) % len(positions)
+            sta.setPosition(positions[step['i']])
+            return decide()
+        return call
+
+    matrix = comparator.build_decision_matrices(
+        comparator.criteria_context(sta.params['position']))[0]
+    weights = comparator.calculate_entropy_weights(matrix)
+    return [
+        ('ssf.select_best_ap', moved(ssf.select_best_ap)),
+        ('llf.select_best_ap', moved(lf.select_best_ap)),
+        ('mcdm.mcdm_decision', moved(lambda: comparator.mcdm_decision(sta.params['position']))),
+        ('mcdm.entropy_weights', lambda: comparator.calculate_entropy_weights(matrix)),
+        ('mcdm.apply_topsis', lambda: comparator.apply_topsis(matrix, weights)),
+        ('mcdm.memo_decision', moved(lambda: memoized.mcdm_decision(sta.params['position']))),
+    ]
+
+
+def batch_cases(n_aps, n_stations, rng):
+    """(name, fn) of the BatchHandover paths for n_stations on an n_aps layout"""
+    from batch_handover import BatchHandover
+
+    aps = [f'ap{i + 1}' for i in range(n_aps)]
+    batch = BatchHandover(aps, dict(zip(aps, ap_layout(n_aps, rng))), ap_range=AP_RANGE)
+    positions = rng.uniform((0, 0), AREA, (n_stations, 2))
+    current = np.full(n_stations, -1)
+    loads = rng.integers(0, 5, n_aps)
+    load_factors = rng.uniform(1.0, 2.5, n_aps)
+    return [
+        ('batch.ssf', lambda: batch.ssf(positions, current)),
+        ('batch.llf', lambda: batch.llf(positions, current, loads)),
+        ('batch.mcdm', lambda: batch.mcdm(positions, current, load_factors)),
+    ]
+
+
+def run_benchmarks(ap_counts=DEFAULT_APS, station_counts=DEFAULT_STATIONS, min_time=0.2,
+                   select=None, seed=0, report=None):
+    """
+    Run every case; select keeps only case names containing one of its strings.
+
+    Returns:
+        List of result rows (see summarize())
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+
+    def run(name, fn, aps, stations=1):
+        if select and not any(s in name for s in select):
+            return
+        row = summarize(name, time_calls(fn, min_time), aps, stations)
+        results.append(row)
+        if report:
+            report(row)
+
+    for n_aps in ap_counts:
+        for name, fn in single_station_cases(n_aps, rng):
+            run(name, fn, n_aps)
+        for n_stations in station_counts:
+            for name, fn in batch_cases(n_aps, n_stations, rng):
+                run(name, fn, n_aps, n_stations)
+    return results
+
+
+def environment():
+    """Interpreter, NumPy and source revision of a benchmark run"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)),
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'revision': revision,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def format_row(row, baseline=None):
+    """One table line; with a baseline row, the decisions/s ratio against it"""
+    line = (f"{row['name']:<22} {row['aps']:>5} {row['stations']:>6} "
+            f"{row['decisions_per_s']:>14,.0f} {row['p50_us']:>10.1f} "
+            f"{row['p90_us']:>10.1f} {row['p99_us']:>10.1f}")
+    if baseline is not None:
+        line += f" {row['decisions_per_s'] / baseline['decisions_per_s']:>8.2f}x"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Handover decision microbenchmarks")
+    parser.add_argument('--aps', type=int, nargs='+', default=list(DEFAULT_APS))
+    parser.add_argument('--stations', type=int, nargs='+', default=list(DEFAULT_STATIONS))
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Seconds of timed calls per case")
+    parser.add_argument('--select', nargs='+', help="Only cases whose name contains one of these")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r['name'], r['aps'], r['stations']): r for r in json.load(f)['results']}
+
+    # Decision traces would dominate the timings
+    try:
+        from mininet.log import setLogLevel
+    except ImportError:
+        from headless import setLogLevel
+    setLogLevel('warning')
+
+    header = (f"{'Case':<22} {'APs':>5} {'STAs':>6} {'decisions/s':>14} "
+              f"{'p50 us':>10} {'p90 us':>10} {'p99 us':>10}")
+    print(header + (f" {'vs base':>9}" if baseline else ""))
+    print('-' * (len(header) + (10 if baseline else 0)))
+
+    def report(row):
+        print(format_row(row, baseline.get((row['name'], row['aps'], row['stations']))),
+              flush=True)
+
+    results = run_benchmarks(args.aps, args.stations, args.min_time, args.select, report=report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\n*** Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,33 +4,143 @@ Compare SSF vs LLF Handover Algorithms with Metrics Collection
 Run this script to test both algorithms and generate comparison plots
 """
 
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi
 from threading import Thread
 import time
 import math
 import matplotlib.pyplot as plt
+import numpy as np
 import sys
+from signal_engine import SignalEngine, parse_position
+from association import AssociationRegistry
+from shadowing import ShadowingNoise
+from metrics_writer import csv_header, format_csv_rows, read_binary_metrics
+from throughput import RateTableModel, MeasuredThroughput
+from sim_clock import SimulationClock
+from trajectory import Trajectory, corridor, piecewise_linear, format_position
 
 class HandoverMetrics:
-    """Collect metrics during handover"""
-    
-    def __init__(self):
-        self.timestamps = []
-        self.positions = []
-        self.rssi_ap1 = []
-        self.rssi_ap2 = []
-        self.connected_ap = []
+    """
+    Collect metrics during handover.
+    
+    Samples are stored column-wise in preallocated NumPy arrays that grow by
+    doubling; the timestamps/positions/rssi/connected properties are views of
+    the filled part, so plotting and CSV code use them without copying.
+    Records are also passed to any streaming writers (metrics_writer); with
+    retain=False nothing is kept in memory, for long soak runs; rebuild the
+    samples from a BinaryMetricsWriter file with from_binary() to plot them.
+    """
+    
+    def __init__(self, ap_names=('ap1', 'ap2'), capacity=256, writers=(), retain=True):
+        self.ap_names = list(ap_names)
+        self.writers = list(writers)
+        self.retain = retain
+        self.ap_index = {name: i for i, name in enumerate(self.ap_names)}
+        self._size = 0
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._positions = np.empty(capacity, dtype=np.float64)
+        self._rssi = np.empty((capacity, len(self.ap_names)), dtype=np.float32)
+        self._connected = np.empty(capacity, dtype=np.int16)  # index into ap_names, -1 = None
         self.handover_events = []
-        
-    def record(self, timestamp, position, rssi1, rssi2, ap_name):
-        """Record a single measurement"""
-        self.timestamps.append(timestamp)
-        self.positions.append(position)
-        self.rssi_ap1.append(rssi1)
-        self.rssi_ap2.append(rssi2)
-        self.connected_ap.append(ap_name)
+    
+    @classmethod
+    def from_binary(cls, path, handover_events=()):
+        """
+        Load the samples streamed by a BinaryMetricsWriter.
+
+        Args:
+            path: File written by BinaryMetricsWriter
+            handover_events: handover_events of the run (not part of the stream)
+        """
+        ap_names, records = read_binary_metrics(path)
+        metrics = cls(ap_names, capacity=max(len(records), 1))
+        n = len(records)
+        metrics._timestamps[:n] = records['timestamp']
+        metrics._positions[:n] = records['position']
+        metrics._rssi[:n] = records['rssi']
+        metrics._connected[:n] = records['connected']
+        metrics._size = n
+        metrics.handover_events = list(handover_events)
+        return metrics
+    
+    def _grow(self):
+        capacity = 2 * len(self._timestamps)
+        for name in ('_timestamps', '_positions', '_rssi', '_connected'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    def record(self, timestamp, position, rssi_values, ap_name):
+        """Record a single measurement (rssi_values in ap_names order)"""
+        connected = self.ap_index.get(ap_name, -1)
+        for writer in self.writers:
+            writer.write(timestamp, position, rssi_values, connected)
+        if not self.retain:
+            return
+        if self._size == len(self._timestamps):
+            self._grow()
+        i = self._size
+        self._timestamps[i] = timestamp
+        self._positions[i] = position
+        self._rssi[i] = rssi_values
+        self._connected[i] = connected
+        self._size += 1
+    
+    def close(self):
+        """Flush and close the streaming writers"""
+        for writer in self.writers:
+            writer.close()
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def timestamps(self):
+        return self._timestamps[:self._size]
+    
+    @property
+    def positions(self):
+        return self._positions[:self._size]
+    
+    @property
+    def rssi(self):
+        """RSSI per sample and AP, shape (samples, APs)"""
+        return self._rssi[:self._size]
+    
+    @property
+    def connected(self):
+        """Connected AP index per sample, -1 when not associated"""
+        return self._connected[:self._size]
+    
+    @property
+    def connected_ap(self):
+        """Connected AP name per sample ('None' when not associated)"""
+        return np.array(self.ap_names + ['None'])[self.connected]
+    
+    def rssi_for(self, ap_name):
+        """RSSI column of one AP"""
+        return self.rssi[:, self.ap_index[ap_name]]
+    
+    @property
+    def rssi_ap1(self):
+        return self.rssi_for('ap1')
+    
+    @property
+    def rssi_ap2(self):
+        return self.rssi_for('ap2')
+    
+    def connected_rssi(self, default=-90.0):
+        """RSSI of the connected AP per sample (default when not associated)"""
+        connected = self.connected
+        values = self.rssi[np.arange(len(connected)), np.maximum(connected, 0)]
+        return np.where(connected >= 0, values, default)
     
     def mark_handover(self, timestamp, position, old_ap, new_ap):
         """Mark when handover occurred"""
@@ -43,12 +153,12 @@ class HandoverMetrics:
     
     def save_to_csv(self, filename):
         """Save metrics to CSV file"""
+        if not self.retain:
+            raise ValueError("samples were not retained (retain=False); "
+                             "stream them with a CSVMetricsWriter instead")
         with open(filename, 'w') as f:
-            f.write("Timestamp,Position,RSSI_AP1,RSSI_AP2,Connected_AP\n")
-            for i in range(len(self.timestamps)):
-                f.write(f"{self.timestamps[i]:.2f},{self.positions[i]},"
-                       f"{self.rssi_ap1[i]:.1f},{self.rssi_ap2[i]:.1f},"
-                       f"{self.connected_ap[i]}\n")
+            f.write(csv_header(self.ap_names))
+            f.write(format_csv_rows(self.timestamps, self.positions, self.rssi, self.connected_ap))
         info(f"*** Metrics saved to {filename}\n")
     
     def get_handover_count(self):
@@ -59,48 +169,62 @@ class HandoverMetrics:
         """Return positions where handovers occurred"""
         return [event['position'] for event in self.handover_events]
 
+# Untracked stations on the first AP (LLF's initial load, and contention
+# for the throughput model of both tests)
+BACKGROUND_STATIONS = 3
+
+# Fallback positions for the standard two-AP test layout
+DEFAULT_AP_POSITIONS = [('20', '40', '0'), ('100', '40', '0')]
+
+def get_ap_positions(aps):
+    """AP positions from node params, falling back to the two-AP test layout"""
+    positions = {}
+    for i, ap in enumerate(aps):
+        try:
+            positions[ap] = ap.params['position']
+        except (KeyError, AttributeError):
+            positions[ap] = DEFAULT_AP_POSITIONS[i]
+    return positions
+
 class SSFHandover:
     """SSF with metrics collection"""
     
-    def __init__(self, net, sta, aps, hysteresis_margin=5):
+    def __init__(self, net, sta, aps, hysteresis_margin=5, clock=None, shadow_sigma=0.0,
+                 shadowing=None, metrics=None, propagation=None):
         self.net = net
         self.sta = sta
         self.aps = aps
         self.hysteresis_margin = hysteresis_margin
+        self.shadow_sigma = shadow_sigma  # dB std-dev for shadowing
+        self.shadowing = shadowing if shadowing is not None else ShadowingNoise(len(aps), shadow_sigma)
         self.current_ap = None
-        self.metrics = HandoverMetrics()
-        self.start_time = time.time()
-        self.ap_positions = {
-            aps[0]: ('20', '40', '0'),
-            aps[1]: ('100', '40', '0')
-        }
+        self.metrics = metrics if metrics is not None else HandoverMetrics([ap.name for ap in aps])
+        self.clock = clock if clock is not None else SimulationClock(realtime=True)
+        self.ap_positions = get_ap_positions(aps)
+        self.engine = SignalEngine(aps, self.ap_positions, model=propagation)
     
     def calculate_distance(self, pos1, pos2):
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
     
     def estimate_rssi(self, distance):
-        if distance < 1:
-            distance = 1
-        return -40 - 20 * math.log10(distance)
+        """RSSI of the engine's propagation model at one distance"""
+        return float(self.engine.model.rssi(distance))
     
     def select_best_ap(self, current_pos):
         """SSF: Select AP with strongest signal"""
-        current_time = time.time() - self.start_time
+        current_time = self.clock.now
         
-        rssi_values = {}
-        for ap in self.aps:
-            distance = self.calculate_distance(current_pos, self.ap_positions[ap])
-            rssi = self.estimate_rssi(distance)
-            rssi_values[ap] = rssi
+        rssi = self.engine.rssi_row(current_pos)
+        if self.shadow_sigma > 0:
+            rssi = rssi + self.shadowing.sample(current_pos)
+        rssi_values = dict(zip(self.aps, rssi))
         
         # Record metrics
         self.metrics.record(
             timestamp=current_time,
             position=float(current_pos[0]),
-            rssi1=rssi_values[self.aps[0]],
-            rssi2=rssi_values[self.aps[1]],
+            rssi_values=rssi,
             ap_name=self.current_ap.name if self.current_ap else 'None'
         )
         
@@ -117,50 +241,59 @@ class SSFHandover:
 class LLFHandover:
     """LLF with metrics collection"""
     
-    def __init__(self, net, sta, aps):
+    def __init__(self, net, sta, aps, clock=None, shadow_sigma=0.0, shadowing=None, metrics=None,
+                 propagation=None):
         self.net = net
         self.sta = sta
         self.aps = aps
+        self.shadow_sigma = shadow_sigma  # dB std-dev for shadowing
+        self.shadowing = shadowing if shadowing is not None else ShadowingNoise(len(aps), shadow_sigma)
         self.current_ap = None
-        self.metrics = HandoverMetrics()
-        self.start_time = time.time()
-        self.ap_loads = {aps[0]: 3, aps[1]: 0}  # Initial load: ap1=3, ap2=0
-        self.ap_positions = {
-            aps[0]: ('20', '40', '0'),
-            aps[1]: ('100', '40', '0')
-        }
+        self.metrics = metrics if metrics is not None else HandoverMetrics([ap.name for ap in aps])
+        self.clock = clock if clock is not None else SimulationClock(realtime=True)
+        # Initial load: ap1=3 (untracked background stations), others=0
+        self.registry = AssociationRegistry(aps, background={aps[0]: BACKGROUND_STATIONS})
+        self.ap_positions = get_ap_positions(aps)
+        self.engine = SignalEngine(aps, self.ap_positions, model=propagation)
     
     def calculate_distance(self, pos1, pos2):
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
     
     def estimate_rssi(self, distance):
-        if distance < 1:
-            distance = 1
-        return -40 - 20 * math.log10(distance)
+        """RSSI of the engine's propagation model at one distance"""
+        return float(self.engine.model.rssi(distance))
+    
+    @property
+    def ap_loads(self):
+        """Current load per AP as a dict {ap: stations}"""
+        return self.registry.snapshot()
     
     def select_best_ap(self, current_pos):
         """LLF: Select AP with lowest load"""
-        current_time = time.time() - self.start_time
+        current_time = self.clock.now
         
-        rssi_values = {}
-        for ap in self.aps:
-            distance = self.calculate_distance(current_pos, self.ap_positions[ap])
-            rssi = self.estimate_rssi(distance)
-            rssi_values[ap] = rssi
+        rssi = self.engine.rssi_row(current_pos)
+        if self.shadow_sigma > 0:
+            rssi = rssi + self.shadowing.sample(current_pos)
+        rssi_values = dict(zip(self.aps, rssi))
         
         # Record metrics
         self.metrics.record(
             timestamp=current_time,
             position=float(current_pos[0]),
-            rssi1=rssi_values[self.aps[0]],
-            rssi2=rssi_values[self.aps[1]],
+            rssi_values=rssi,
             ap_name=self.current_ap.name if self.current_ap else 'None'
         )
         
-        # LLF logic: choose least loaded AP (only if signal > -90dBm)
-        candidates = [(ap, self.ap_loads[ap]) for ap in self.aps 
+        # LLF logic: choose least loaded AP (only if signal > -90dBm). The
+        # station itself does not count toward its current AP's load, or it
+        # would always look worse than an idle neighbour
+        loads = self.ap_loads
+        own_ap = self.registry.ap_of(self.sta)
+        if own_ap is not None:
+            loads[own_ap] -= 1
+        candidates = [(ap, loads[ap]) for ap in self.aps 
                      if rssi_values[ap] >= -90]
         
         if not candidates:
@@ -170,20 +303,50 @@ class LLFHandover:
         candidates.sort(key=lambda x: (x[1], -rssi_values[x[0]]))
         return candidates[0][0]
 
-def run_test(algorithm_name):
-    """Run handover test with specified algorithm"""
+def run_test(algorithm_name, clock=None, hysteresis_margin=5, shadow_sigma=0.0,
+             ap_positions=('20,40,0', '100,40,0'), path=None, seed=None,
+             net_cls=None, save_csv=True, writers=(), retain=True, decorrelation_distance=None,
+             propagation=None):
+    """
+    Run handover test with specified algorithm (paced by clock, real time by default)
+    
+    Args:
+        hysteresis_margin: SSF hysteresis in dB
+        shadow_sigma: Shadowing std-dev in dB added to every RSSI sample
+        ap_positions: 'x,y,z' per AP, named ap1..apN
+        path: Trajectory of the station, or list of (x, y) positions visited
+              every 0.5s (default: x=10..120 at y=20 in 5m steps)
+        seed: Seed for the shadowing noise
+        decorrelation_distance: Shadowing decorrelation distance in meters
+                                (None = independent samples per step)
+        propagation: Propagation model name or spec (default free space)
+        net_cls: Network class (default Mininet_wifi)
+        save_csv: Write <algorithm>_metrics.csv
+        writers: metrics_writer writers streaming records during the run
+                 (closed when the run ends)
+        retain: Keep samples in memory (False for unbounded soak runs;
+                requires save_csv=False)
+    """
+    if save_csv and not retain:
+        raise ValueError("save_csv needs retain=True; "
+                         "stream the CSV with a CSVMetricsWriter instead")
     info(f"\n{'='*60}\n")
     info(f"*** Running {algorithm_name} Algorithm Test\n")
     info(f"{'='*60}\n\n")
     
-    net = Mininet_wifi(controller=Controller)
+    if net_cls is None:
+        net_cls = Mininet_wifi
+    if path is None:
+        path = corridor(speed=10.0, dt=0.5)
+    elif not isinstance(path, Trajectory):
+        path = piecewise_linear(path, dt=0.5)
+    net = net_cls(controller=Controller)
 
     info("*** Creating nodes\n")
-    sta1 = net.addStation('sta1', ip='10.0.0.1', position='10,20,0')
-    ap1  = net.addAccessPoint('ap1', ssid='test-ssid', mode='g', channel='1',
-                              position='20,40,0', range=60)
-    ap2  = net.addAccessPoint('ap2', ssid='test-ssid', mode='g', channel='1',
-                              position='100,40,0', range=60)
+    sta1 = net.addStation('sta1', ip='10.0.0.1', position=path.labels()[0])
+    aps = [net.addAccessPoint(f'ap{i + 1}', ssid='test-ssid', mode='g', channel='1',
+                              position=position, range=60)
+           for i, position in enumerate(ap_positions)]
     c0   = net.addController('c0')
 
     info("*** Configuring WiFi nodes\n")
@@ -192,65 +355,119 @@ def run_test(algorithm_name):
     info("*** Starting network\n")
     net.build()
     c0.start()
-    ap1.start([c0])
-    ap2.start([c0])
+    for ap in aps:
+        ap.start([c0])
     
     sta1.setRange(50)
 
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    shadowing = ShadowingNoise(len(aps), shadow_sigma, seed=seed,
+                               decorrelation_distance=decorrelation_distance)
+
+    metrics = HandoverMetrics([ap.name for ap in aps], writers=writers, retain=retain)
+
     # Initialize handover controller based on algorithm
     if algorithm_name == "SSF":
-        handover_controller = SSFHandover(net, sta1, [ap1, ap2], hysteresis_margin=5)
+        handover_controller = SSFHandover(net, sta1, aps, hysteresis_margin=hysteresis_margin,
+                                          clock=clock, shadow_sigma=shadow_sigma, shadowing=shadowing,
+                                          metrics=metrics, propagation=propagation)
     else:  # LLF
-        handover_controller = LLFHandover(net, sta1, [ap1, ap2])
+        handover_controller = LLFHandover(net, sta1, aps, clock=clock,
+                                          shadow_sigma=shadow_sigma, shadowing=shadowing,
+                                          metrics=metrics, propagation=propagation)
 
     info(f"*** Starting mobility with {algorithm_name}\n")
     
     # Move station and collect metrics
-    for x in range(10, 121, 5):
-        sta1.setPosition(f'{x},20,0')
-        
-        old_ap = handover_controller.current_ap
-        best_ap = handover_controller.select_best_ap((str(x), '20', '0'))
-        
-        if best_ap != old_ap:
-            current_time = time.time() - handover_controller.start_time
-            info(f"\n*** HANDOVER at position {x}: {old_ap.name if old_ap else 'None'} -> {best_ap.name}\n")
-            
-            handover_controller.metrics.mark_handover(
-                current_time, x,
-                old_ap.name if old_ap else 'None',
-                best_ap.name
-            )
+    try:
+        for coords in path.station(0):
+            position = format_position(coords)
+            sta1.setPosition(position)
+            x = float(coords[0])
             
-            # Update load for LLF
-            if algorithm_name == "LLF":
-                if old_ap:
-                    handover_controller.ap_loads[old_ap] -= 1
-                handover_controller.ap_loads[best_ap] += 1
+            old_ap = handover_controller.current_ap
+            best_ap = handover_controller.select_best_ap(tuple(position.split(',')))
             
-            try:
-                if old_ap:
-                    sta1.wintfs[0].disconnect(sta1.wintfs[0].associatedTo)
-                sta1.wintfs[0].associate(best_ap.wintfs[0])
-            except:
-                pass
+            if best_ap != old_ap:
+                current_time = clock.now
+                info(f"\n*** HANDOVER at position {x:g}: {old_ap.name if old_ap else 'None'} -> {best_ap.name}\n")
+                
+                handover_controller.metrics.mark_handover(
+                    current_time, x,
+                    old_ap.name if old_ap else 'None',
+                    best_ap.name
+                )
+                
+                # Update load for LLF
+                if algorithm_name == "LLF":
+                    handover_controller.registry.associate(sta1, best_ap)
+                
+                try:
+                    if old_ap:
+                        sta1.wintfs[0].disconnect(sta1.wintfs[0].associatedTo)
+                    sta1.wintfs[0].associate(best_ap.wintfs[0])
+                except:
+                    pass
+                
+                handover_controller.current_ap = best_ap
             
-            handover_controller.current_ap = best_ap
-        
-        time.sleep(0.5)  # Shorter delay for faster simulation
+            clock.sleep(path.dt)  # Shorter delay for faster simulation
+    finally:
+        # Flush streamed records even if the run is interrupted
+        metrics.close()
     
     info(f"*** {algorithm_name} test complete!\n")
     
     # Save metrics
-    handover_controller.metrics.save_to_csv(f'{algorithm_name.lower()}_metrics.csv')
+    if save_csv:
+        handover_controller.metrics.save_to_csv(f'{algorithm_name.lower()}_metrics.csv')
     
     # Clean up
     net.stop()
     
     return handover_controller.metrics
 
-def plot_comparison(ssf_metrics, llf_metrics):
-    """Create comparison plots for SSF vs LLF"""
+
+AP_COLORS = ['blue', 'red', 'orange', 'teal', 'brown', 'magenta']
+
+
+def plot_connected_rssi(ax, metrics):
+    """RSSI line per AP, with the samples of the connected AP highlighted"""
+    for j, name in enumerate(metrics.ap_names):
+        color = AP_COLORS[j % len(AP_COLORS)]
+        ax.plot(metrics.positions, metrics.rssi[:, j], '-', color=color,
+                label=f'{name.upper()} RSSI', linewidth=1, alpha=0.3)
+        connected = metrics.connected == j
+        ax.scatter(metrics.positions[connected], metrics.rssi[connected, j],
+                   c=color, s=20, alpha=0.8)
+
+
+def estimate_throughput(metrics, model=None):
+    """
+    Throughput (Mbps) per sample from a throughput.py model: the 802.11g
+    rate table with shared airtime by default, or MeasuredThroughput for
+    iperf samples. The first AP carries BACKGROUND_STATIONS in both tests.
+    """
+    model = model if model is not None else RateTableModel()
+    return model.estimate(metrics, background={metrics.ap_names[0]: BACKGROUND_STATIONS})
+
+
+def plot_comparison(ssf_metrics, llf_metrics, ssf_model=None, llf_model=None):
+    """
+    Create comparison plots for SSF vs LLF
+
+    Args:
+        ssf_model, llf_model: Throughput models per test (default rate table);
+                              pass throughput.MeasuredThroughput for iperf data
+
+    Metrics of retain=False runs hold no samples; load the streamed ones
+    with HandoverMetrics.from_binary() first.
+    """
+    for metrics in (ssf_metrics, llf_metrics):
+        if not metrics.retain:
+            raise ValueError("cannot plot metrics collected with retain=False; "
+                             "load them with HandoverMetrics.from_binary()")
     fig = plt.figure(figsize=(18, 12))
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
     
@@ -259,20 +476,8 @@ def plot_comparison(ssf_metrics, llf_metrics):
     # Plot 1: SSF Signal Strength (only show connected AP highlighted)
     ax1 = fig.add_subplot(gs[0, 0])
     
-    # Plot both APs in light color
-    ax1.plot(ssf_metrics.positions, ssf_metrics.rssi_ap1, 'b-', 
-             label='AP1 RSSI', linewidth=1, alpha=0.3)
-    ax1.plot(ssf_metrics.positions, ssf_metrics.rssi_ap2, 'r-', 
-             label='AP2 RSSI', linewidth=1, alpha=0.3)
-    
-    # Highlight the connected AP
-    for i in range(len(ssf_metrics.positions)):
-        if ssf_metrics.connected_ap[i] == 'ap1':
-            ax1.scatter(ssf_metrics.positions[i], ssf_metrics.rssi_ap1[i], 
-                       c='blue', s=20, alpha=0.8)
-        elif ssf_metrics.connected_ap[i] == 'ap2':
-            ax1.scatter(ssf_metrics.positions[i], ssf_metrics.rssi_ap2[i], 
-                       c='red', s=20, alpha=0.8)
+    # Plot all APs in light color, highlight the connected AP
+    plot_connected_rssi(ax1, ssf_metrics)
     
     # Mark handovers with clear vertical lines and labels
     for event in ssf_metrics.handover_events:
@@ -293,18 +498,7 @@ def plot_comparison(ssf_metrics, llf_metrics):
     # Plot 2: LLF Signal Strength (only show connected AP highlighted)
     ax2 = fig.add_subplot(gs[0, 1])
     
-    ax2.plot(llf_metrics.positions, llf_metrics.rssi_ap1, 'b-', 
-             label='AP1 RSSI', linewidth=1, alpha=0.3)
-    ax2.plot(llf_metrics.positions, llf_metrics.rssi_ap2, 'r-', 
-             label='AP2 RSSI', linewidth=1, alpha=0.3)
-    
-    for i in range(len(llf_metrics.positions)):
-        if llf_metrics.connected_ap[i] == 'ap1':
-            ax2.scatter(llf_metrics.positions[i], llf_metrics.rssi_ap1[i], 
-                       c='blue', s=20, alpha=0.8)
-        elif llf_metrics.connected_ap[i] == 'ap2':
-            ax2.scatter(llf_metrics.positions[i], llf_metrics.rssi_ap2[i], 
-                       c='red', s=20, alpha=0.8)
+    plot_connected_rssi(ax2, llf_metrics)
     
     for event in llf_metrics.handover_events:
         pos = event['position']
@@ -324,26 +518,7 @@ def plot_comparison(ssf_metrics, llf_metrics):
     # Plot 3: Simulated Throughput for SSF
     ax3 = fig.add_subplot(gs[0, 2])
     
-    # Simulate throughput based on RSSI (better signal = better throughput)
-    ssf_throughput = []
-    for i in range(len(ssf_metrics.positions)):
-        if ssf_metrics.connected_ap[i] == 'ap1':
-            rssi = ssf_metrics.rssi_ap1[i]
-        elif ssf_metrics.connected_ap[i] == 'ap2':
-            rssi = ssf_metrics.rssi_ap2[i]
-        else:
-            rssi = -90
-        
-        # Simulate throughput drop during handover
-        is_handover = any(abs(ssf_metrics.positions[i] - event['position']) < 2 
-                         for event in ssf_metrics.handover_events)
-        
-        if is_handover:
-            throughput = max(0, 20 + (rssi + 90) * 2) * 0.3  # 70% drop during handover
-        else:
-            throughput = max(0, 20 + (rssi + 90) * 2)  # Better signal = better throughput
-        
-        ssf_throughput.append(throughput)
+    ssf_throughput = estimate_throughput(ssf_metrics, ssf_model)
     
     ax3.plot(ssf_metrics.positions, ssf_throughput, 'g-', linewidth=2)
     ax3.fill_between(ssf_metrics.positions, ssf_throughput, alpha=0.3, color='green')
@@ -357,33 +532,16 @@ def plot_comparison(ssf_metrics, llf_metrics):
     
     ax3.set_xlabel('Position (m)', fontsize=12, fontweight='bold')
     ax3.set_ylabel('Throughput (Mbps)', fontsize=12, fontweight='bold')
-    ax3.set_title('SSF: Estimated Throughput', fontsize=13, fontweight='bold')
+    ax3.set_title(f"SSF: {'Measured' if isinstance(ssf_model, MeasuredThroughput) else 'Estimated'} Throughput", fontsize=13, fontweight='bold')
     ax3.grid(True, alpha=0.3)
-    avg_throughput = sum(ssf_throughput) / len(ssf_throughput)
-    ax3.text(70, max(ssf_throughput)-5, f'Avg: {avg_throughput:.1f} Mbps', 
+    avg_throughput = np.nanmean(ssf_throughput)
+    ax3.text(70, np.nanmax(ssf_throughput)-5, f'Avg: {avg_throughput:.1f} Mbps', 
              fontsize=10, bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
     
     # Plot 4: Simulated Throughput for LLF
     ax4 = fig.add_subplot(gs[1, 0])
     
-    llf_throughput = []
-    for i in range(len(llf_metrics.positions)):
-        if llf_metrics.connected_ap[i] == 'ap1':
-            rssi = llf_metrics.rssi_ap1[i]
-        elif llf_metrics.connected_ap[i] == 'ap2':
-            rssi = llf_metrics.rssi_ap2[i]
-        else:
-            rssi = -90
-        
-        is_handover = any(abs(llf_metrics.positions[i] - event['position']) < 2 
-                         for event in llf_metrics.handover_events)
-        
-        if is_handover:
-            throughput = max(0, 20 + (rssi + 90) * 2) * 0.3
-        else:
-            throughput = max(0, 20 + (rssi + 90) * 2)
-        
-        llf_throughput.append(throughput)
+    llf_throughput = estimate_throughput(llf_metrics, llf_model)
     
     ax4.plot(llf_metrics.positions, llf_throughput, 'purple', linewidth=2)
     ax4.fill_between(llf_metrics.positions, llf_throughput, alpha=0.3, color='purple')
@@ -397,19 +555,19 @@ def plot_comparison(ssf_metrics, llf_metrics):
     
     ax4.set_xlabel('Position (m)', fontsize=12, fontweight='bold')
     ax4.set_ylabel('Throughput (Mbps)', fontsize=12, fontweight='bold')
-    ax4.set_title('LLF: Estimated Throughput', fontsize=13, fontweight='bold')
+    ax4.set_title(f"LLF: {'Measured' if isinstance(llf_model, MeasuredThroughput) else 'Estimated'} Throughput", fontsize=13, fontweight='bold')
     ax4.grid(True, alpha=0.3)
-    avg_throughput = sum(llf_throughput) / len(llf_throughput)
-    ax4.text(70, max(llf_throughput)-5, f'Avg: {avg_throughput:.1f} Mbps', 
+    avg_throughput = np.nanmean(llf_throughput)
+    ax4.text(70, np.nanmax(llf_throughput)-5, f'Avg: {avg_throughput:.1f} Mbps', 
              fontsize=10, bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
     
     # Plot 5: Throughput Comparison Bar Chart
     ax5 = fig.add_subplot(gs[1, 1])
     
-    ssf_avg = sum(ssf_throughput) / len(ssf_throughput)
-    llf_avg = sum(llf_throughput) / len(llf_throughput)
-    ssf_min = min(ssf_throughput)
-    llf_min = min(llf_throughput)
+    ssf_avg = np.nanmean(ssf_throughput)
+    llf_avg = np.nanmean(llf_throughput)
+    ssf_min = np.nanmin(ssf_throughput)
+    llf_min = np.nanmin(llf_throughput)
     
     x = ['Average\nThroughput', 'Minimum\nThroughput\n(during handover)']
     ssf_vals = [ssf_avg, ssf_min]
@@ -478,15 +636,15 @@ def plot_comparison(ssf_metrics, llf_metrics):
     • Handovers: {ssf_metrics.get_handover_count()}                                   • Handovers: {llf_metrics.get_handover_count()}
     • Positions: {ssf_handovers}                         • Positions: {llf_handovers}
     • Strategy: Signal-based (5dB hysteresis)            • Strategy: Load-based balancing
-    • Avg Throughput: {sum(ssf_throughput)/len(ssf_throughput):.1f} Mbps                          • Avg Throughput: {sum(llf_throughput)/len(llf_throughput):.1f} Mbps
-    • Min Throughput: {min(ssf_throughput):.1f} Mbps                          • Min Throughput: {min(llf_throughput):.1f} Mbps
+    • Avg Throughput: {ssf_avg:.1f} Mbps                          • Avg Throughput: {llf_avg:.1f} Mbps
+    • Min Throughput: {ssf_min:.1f} Mbps                          • Min Throughput: {llf_min:.1f} Mbps
     
     🔑 KEY INSIGHTS:
     ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     ✓ SSF switches when signal strength improves significantly (maintains better connection quality)
     ✓ LLF switches to distribute load across APs (may accept weaker signal for network balance)
     ✓ Throughput dips occur during handover due to reconnection overhead
-    ✓ SSF typically has {"higher" if sum(ssf_throughput) > sum(llf_throughput) else "lower"} average throughput due to {"better signal selection" if sum(ssf_throughput) > sum(llf_throughput) else "load considerations"}
+    ✓ SSF typically has {"higher" if ssf_avg > llf_avg else "lower"} average throughput due to {"better signal selection" if ssf_avg > llf_avg else "load considerations"}
     ✓ Green dashed lines show exact handover positions where AP switch occurred
     """
     
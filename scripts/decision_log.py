@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Binary MCDM decision log and replay tool.
+
+DecisionLogWriter is a decision_trace sink that stores every
+'mcdm_position' record (the per-AP distance/rssi/delay/topsis_score/
+load_factor table of mcdm_ssf_compare.move_and_compare, the entropy
+weights and both decisions) as one fixed-width binary record. Full traces
+of long runs stay small and are memory-mapped back without parsing.
+
+Replay a log offline, re-rendering the text tables or just the summary:
+
+    python3 scripts/decision_log.py mcdm_decisions.bin
+    python3 scripts/decision_log.py mcdm_decisions.bin --tables --limit 5
+"""
+
+import argparse
+
+import numpy as np
+
+from metrics_writer import MetricsWriter, write_binary_header, map_binary_records
+
+
+DECISION_MAGIC = b'HODECN01'
+
+# Per-AP columns of analyze_position's metrics table, before criterion values
+BASE_METRICS = ['distance', 'rssi', 'delay', 'topsis_score', 'load_factor']
+
+
+class DecisionLogWriter(MetricsWriter):
+    """decision_trace sink writing 'mcdm_position' records as fixed-width binary"""
+
+    def __init__(self, path, ap_names, criteria, batch_size=1024, flush_interval=5.0,
+                 fsync=False):
+        """
+        Args:
+            path: Output file, truncated on open
+            ap_names: AP names in column order
+            criteria: MCDM criteria names (weight order)
+            batch_size, flush_interval, fsync: As for MetricsWriter
+        """
+        self.criteria = list(criteria)
+        self.metric_names = BASE_METRICS + [c for c in self.criteria if c not in BASE_METRICS]
+        self.ap_index = {name: i for i, name in enumerate(ap_names)}
+        super().__init__(path, ap_names, batch_size, flush_interval, fsync)
+
+    @classmethod
+    def for_comparator(cls, path, comparator, **kwargs):
+        """Writer matching a HandoverComparison's APs and criteria"""
+        return cls(path, [ap.name for ap in comparator.aps],
+                   [c.name for c in comparator.criteria], **kwargs)
+
+    def record_dtype(self):
+        n_aps, n_crit = len(self.ap_names), len(self.criteria)
+        return np.dtype([('position', '<f8', (2,)), ('ssf_choice', '<i2'),
+                         ('mcdm_choice', '<i2'), ('agree', '?'),
+                         ('weights', '<f4', (n_crit,))] +
+                        [(f'metric_{name}', '<f4', (n_aps,)) for name in self.metric_names])
+
+    def _open(self):
+        f = open(self.path, 'wb')
+        write_binary_header(f, DECISION_MAGIC, {'ap_names': self.ap_names,
+                                                'criteria': self.criteria,
+                                                'metrics': self.metric_names}, self.dtype)
+        return f
+
+    def _write_batch(self, records):
+        self._file.write(records.tobytes())
+
+    def write(self, record):
+        """
+        Buffer one analyze_position result (replaces MetricsWriter.write,
+        whose metrics records do not fit this writer's record dtype).
+
+        Args:
+            record: analyze_position result dict (or its trace record)
+        """
+        out = self._buffer[self._size]
+        out['position'] = record['position']
+        out['ssf_choice'] = self.ap_index[record['ssf_choice']]
+        out['mcdm_choice'] = self.ap_index[record['mcdm_choice']]
+        out['agree'] = record['agree']
+        out['weights'] = [record['weights'][name] for name in self.criteria]
+        metrics = record['metrics']
+        for name in self.metric_names:
+            out[f'metric_{name}'] = [metrics[ap][name] for ap in self.ap_names]
+        self._commit()
+
+    def __call__(self, record):
+        """decision_trace sink: log 'mcdm_position' records, ignore the rest"""
+        if record['kind'] == 'mcdm_position':
+            self.write(record)
+
+
+def read_decision_log(path):
+    """
+    Memory-map a DecisionLogWriter file.
+
+    Returns:
+        (header, records): header has ap_names, criteria and metrics lists
+    """
+    return map_binary_records(path, DECISION_MAGIC)
+
+
+def record_to_result(header, record):
+    """One binary record back to the analyze_position result dict"""
+    ap_names = header['ap_names']
+    x, y = record['position']
+    return {
+        'position': (int(x) if x.is_integer() else x, int(y) if y.is_integer() else y),
+        'ssf_choice': ap_names[record['ssf_choice']],
+        'mcdm_choice': ap_names[record['mcdm_choice']],
+        'agree': bool(record['agree']),
+        'weights': {name: float(w) for name, w in zip(header['criteria'], record['weights'])},
+        'metrics': {ap: {name: float(record[f'metric_{name}'][i]) for name in header['metrics']}
+                    for i, ap in enumerate(ap_names)},
+    }
+
+
+def summarize(header, records):
+    """Agreement, handover and chosen-AP statistics over a whole log, column-wise"""
+    rows = np.arange(len(records))
+    ssf, mcdm = records['ssf_choice'], records['mcdm_choice']
+    rssi, delay = records['metric_rssi'], records['metric_delay']
+    summary = {
+        'positions': len(records),
+        'agreements': int(np.count_nonzero(ssf == mcdm)),
+        'ssf_handovers': int(np.count_nonzero(np.diff(ssf))),
+        'mcdm_handovers': int(np.count_nonzero(np.diff(mcdm))),
+        'mean_weights': dict(zip(header['criteria'], records['weights'].mean(axis=0).tolist()))
+                        if len(records) else {},
+    }
+    for name, choice in (('ssf', ssf), ('mcdm', mcdm)):
+        summary[f'{name}_mean_rssi'] = float(rssi[rows, choice].mean()) if len(records) else np.nan
+        summary[f'{name}_mean_delay'] = float(delay[rows, choice].mean()) if len(records) else np.nan
+        counts = np.bincount(choice, minlength=len(header['ap_names']))
+        summary[f'{name}_selections'] = dict(zip(header['ap_names'], counts.tolist()))
+    return summary
+
+
+def format_summary(summary):
+    """Text report of summarize()"""
+    total = summary['positions']
+    lines = [f"Positions analyzed: {total}\n"]
+    if total:
+        lines.append(f"Agreements: {summary['agreements']} "
+                     f"({summary['agreements'] / total * 100:.0f}%)\n")
+    lines.append(f"SSF handovers:  {summary['ssf_handovers']}\n")
+    lines.append(f"MCDM handovers: {summary['mcdm_handovers']}\n")
+    lines.append("Mean weights: " + ", ".join(f"{name}: {w:.3f}" for name, w
+                                              in summary['mean_weights'].items()) + "\n")
+    for name in ('ssf', 'mcdm'):
+        selections = " ".join(f"{ap}={n}" for ap, n in summary[f'{name}_selections'].items())
+        lines.append(f"{name.upper():<4} chosen AP: mean RSSI {summary[f'{name}_mean_rssi']:.1f}dBm, "
+                     f"mean delay {summary[f'{name}_mean_delay']:.2f}ms, selections {selections}\n")
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a binary MCDM decision log")
+    parser.add_argument('path')
+    parser.add_argument('--tables', action='store_true',
+                        help="Re-render the per-position tables of move_and_compare")
+    parser.add_argument('--limit', type=int, help="Render at most this many tables")
+    args = parser.parse_args()
+
+    header, records = read_decision_log(args.path)
+    if args.tables:
+        from mcdm_ssf_compare import format_mcdm_position
+        for record in records[:args.limit]:
+            print(format_mcdm_position(record_to_result(header, record)), end='')
+        print()
+    print(format_summary(summarize(header, records)), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+LRU memoization of MCDM decisions per (optionally quantized) station position.
+
+HandoverComparison.mcdm_decision rebuilds the decision matrix, entropy
+weights and TOPSIS scores on every call, although along recorded or
+repeated trajectories the station keeps coming back to (nearly) the same
+spots while the AP loads stay put. DecisionMemo keys results on
+
+    (x, y, z, state)
+
+where `state` is whatever the caller's result depends on besides the
+position (HandoverComparison uses its load version and the signal
+engine's version). By default the coordinates are exact, so a cached
+result is the one the position itself would get; '15,25,0' and
+(15.0, 25.0, 0.0) share an entry. With a quantum, positions snap to the
+nearest grid point first and the caller evaluates that point: jittered
+trajectories then hit the cache, and the result is the one of a position
+at most quantum * sqrt(3) / 2 away.
+
+The memo holds at most maxsize entries, dropping the least recently used
+one; invalidate() empties it when the inputs change (e.g. AP loads).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class DecisionMemo:
+    """Bounded LRU cache of decisions keyed by position and input state"""
+
+    def __init__(self, maxsize=4096, quantum=None):
+        """
+        Args:
+            maxsize: Maximum number of cached decisions
+            quantum: Grid spacing in meters positions snap to (None = exact keys)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if quantum is not None and quantum <= 0:
+            raise ValueError("quantum must be positive (or None for exact keys)")
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def snap(self, sta_positions):
+        """(stations, 3) float positions the decisions are evaluated and keyed at"""
+        positions = np.asarray(sta_positions, dtype=float)
+        if self.quantum is None:
+            return positions
+        return np.round(positions / self.quantum) * self.quantum
+
+    def key(self, position, state=()):
+        """Hashable key of one (x, y, z) float position and the input state"""
+        return tuple(np.asarray(position, dtype=float).tolist()) + tuple(state)
+
+    def get(self, key):
+        """Cached value of key (and mark it recently used), or None on a miss"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Drop every cached decision (inputs such as AP loads changed)"""
+        if self._entries:
+            self._entries.clear()
+        self.invalidations += 1
+
+    @property
+    def hit_rate(self):
+        """Share of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Counters as a dict"""
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hit_rate, 'evictions': self.evictions,
+                'invalidations': self.invalidations}
+
+    def format_stats(self):
+        """One-line report of the counters"""
+        return (f"*** Decision memo: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate * 100:.1f}% hit rate), {len(self)}/{self.maxsize} entries, "
+                f"{self.evictions} evictions, {self.invalidations} invalidations\n")
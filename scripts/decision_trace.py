@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Lazy, level-gated decision trace.
+
+Controllers used to build several f-strings per AP on every
+select_best_ap call and hand them to info(), which throws them away when
+the log level is above info. Now a controller first asks trace.enabled()
+(one logger level check plus a sink list check) and only then emits a
+structured record: a dict with a 'kind' and plain fields. Records go to
+every registered sink as-is; they are formatted to text only when
+info-level output is actually enabled.
+
+Text formatters are registered per kind, like the MCDM criteria:
+
+    register_formatter('ssf_stay', format_ssf_stay)
+    trace.emit('ssf_stay', ap='ap1', rssi=-60.2, best=-58.0, margin=5)
+"""
+
+import json
+import logging
+
+try:
+    from mininet.log import lg, info
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import lg, info
+
+
+FORMATTERS = {}
+
+
+def register_formatter(kind, formatter):
+    """Add (or replace) the text formatter of a record kind"""
+    FORMATTERS[kind] = formatter
+    return formatter
+
+
+class DecisionTrace:
+    """Structured decision records, formatted only when someone reads them"""
+
+    def __init__(self, level=logging.INFO):
+        """
+        Args:
+            level: Log level at which records are formatted and logged
+        """
+        self.level = level
+        self.sinks = []
+
+    def add_sink(self, sink):
+        """Send every record (a dict) to sink(record)"""
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def enabled(self):
+        """Cheap check to run before building a record"""
+        return bool(self.sinks) or lg.isEnabledFor(self.level)
+
+    def emit(self, kind, **fields):
+        """Deliver one record to the sinks, and to the log if its level is enabled"""
+        record = dict(fields, kind=kind)
+        for sink in self.sinks:
+            sink(record)
+        if lg.isEnabledFor(self.level):
+            formatter = FORMATTERS.get(kind)
+            info(formatter(record) if formatter else f"*** {record}\n")
+
+
+class JSONLinesSink:
+    """Trace sink writing one JSON object per record"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def __call__(self, record):
+        self.file.write(json.dumps(record, default=_to_builtin) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def _to_builtin(value):
+    """NumPy scalars/arrays and AP objects -> JSON-serializable values"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return getattr(value, 'name', str(value))
+
+
+# Shared trace of all controllers
+trace = DecisionTrace()
+
+
+def format_ssf_no_candidate(r):
+    return f"\n*** SSF Analysis: No AP in range at {r['position']}, staying with current\n"
+
+
+def format_ssf_stay(r):
+    return (f"\n*** SSF Analysis: Staying with {r['ap']} "
+            f"(RSSI={r['rssi']:.1f}dBm, best={r['best']:.1f}dBm, "
+            f"margin={r['best'] - r['rssi']:.1f}dB < {r['margin']}dB)\n")
+
+
+def format_ssf_wait(r):
+    return (f"\n*** SSF Analysis: {r['best']} ahead of {r['ap']} for {r['held']:.1f}s "
+            f"< {r['ttt']:g}s time-to-trigger, staying with {r['ap']}\n")
+
+
+def format_ssf_select(r):
+    lines = [f"\n*** SSF Analysis at position {r['position']}:\n"]
+    for name, ap_rssi in zip(r['aps'], r['rssi']):
+        marker = " <-- STRONGEST" if name == r['best'] else ""
+        lines.append(f"*** {name}: RSSI={ap_rssi:.1f}dBm{marker}\n")
+    return "".join(lines)
+
+
+def format_llf_select(r):
+    lines = [f"\n*** LLF Analysis at position {r['position']}:\n",
+             "*** Strategy: Choose LEAST LOADED AP (load is priority, not signal)\n"]
+    if 'all_loads' in r:
+        lines.append("*** Current AP loads: " +
+                     "".join(f"{name}={load} " for name, load in r['all_loads'].items()) + "\n")
+    for name, ap_rssi, load, ok in zip(r['aps'], r['rssi'], r['loads'], r['reachable']):
+        lines.append(f"*** {name}: Load={load} stations, RSSI={ap_rssi:.1f}dBm" +
+                     (" ✓ Reachable\n" if ok else " ✗ Out of range\n"))
+    order = r['order']
+    if not order:
+        lines.append("*** No APs reachable! Staying with current.\n")
+        return "".join(lines)
+    best = order[0]
+    best_name, best_load, best_rssi = r['aps'][best], r['loads'][best], r['rssi'][best]
+    if len(order) > 1:
+        second = order[1]
+        second_name, second_rssi = r['aps'][second], r['rssi'][second]
+        lines.append(f"*** Choosing {best_name} (Load={best_load}) over "
+                     f"{second_name} (Load={r['loads'][second]})\n")
+        if second_rssi > best_rssi:
+            lines.append(f"*** NOTE: {second_name} has better signal ({second_rssi:.1f}dBm vs "
+                         f"{best_rssi:.1f}dBm) but {best_name} is less loaded!\n")
+    else:
+        lines.append(f"*** Selected: {best_name} (Load={best_load}, RSSI={best_rssi:.1f}dBm)\n")
+    return "".join(lines)
+
+
+register_formatter('ssf_no_candidate', format_ssf_no_candidate)
+register_formatter('ssf_stay', format_ssf_stay)
+register_formatter('ssf_wait', format_ssf_wait)
+register_formatter('ssf_select', format_ssf_select)
+register_formatter('llf_select', format_llf_select)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Dirty-station tracking for incremental re-evaluation.
+
+In a mostly stationary population most stations would get the same
+decision tick after tick. DirtyTracker remembers, per station, where it
+was and what its serving AP's load was when it was last decided, and
+marks a station dirty only if since then it
+
+    moved         more than epsilon meters
+    reassociated  its serving AP changed outside the controller
+    load          its serving AP's load changed
+    pending       has a pending time-to-trigger condition (caller supplied)
+
+or has never been decided. Only dirty rows are handed to the controller:
+
+    tracker = DirtyTracker(epsilon=0.5)
+    rows = np.flatnonzero(tracker.dirty(positions, current, loads, batch.pending()))
+    decided, handover = batch.ssf(positions, current, rows=rows)
+    tracker.commit(rows, positions, decided, batch.association_loads(decided))
+
+The same mask works for HandoverComparison.mcdm_decision_batch() on
+positions[rows]. Counters report how many decisions were skipped.
+"""
+
+import numpy as np
+
+
+REASONS = ('new', 'moved', 'reassociated', 'load', 'pending')
+
+
+def _serving_load(current, loads):
+    """Load of each station's AP column (-1 where not associated, NaN without loads)"""
+    current = np.asarray(current, dtype=int)
+    if loads is None:
+        return np.full(len(current), np.nan)
+    loads = np.asarray(loads, dtype=float)
+    return np.where(current >= 0, loads[np.maximum(current, 0)], -1.0)
+
+
+class DirtyTracker:
+    """Stations whose handover decision may have changed since they were last decided"""
+
+    def __init__(self, epsilon=0.5):
+        """
+        Args:
+            epsilon: Movement in meters below which a station is still clean
+        """
+        self.epsilon = epsilon
+        self.reset()
+
+    def reset(self):
+        """Forget all decisions (every station is dirty on the next tick) and the counters"""
+        self._positions = None
+        self._serving = None
+        self._serving_load = None
+        self._new = None
+        self.ticks = 0
+        self.evaluated = 0
+        self.skipped = 0
+        self.reasons = dict.fromkeys(REASONS, 0)
+
+    @property
+    def n_stations(self):
+        return 0 if self._positions is None else len(self._positions)
+
+    def dirty(self, sta_positions, current, loads=None, pending=None):
+        """
+        Stations to re-decide this tick; also counts the tick in the statistics.
+
+        Args:
+            sta_positions: Array (stations, 2 or 3)
+            current: Int array (stations,) of current AP columns, -1 = none
+            loads: Optional array (APs,) of station counts per AP
+            pending: Optional bool array (stations,) that must be re-decided
+
+        Returns:
+            Bool array (stations,)
+        """
+        positions = np.asarray(sta_positions, dtype=float)
+        current = np.asarray(current, dtype=int)
+        n = len(current)
+        if self._positions is None or self._positions.shape != positions.shape:
+            # New or resized population: start over with everyone dirty
+            self._positions = np.zeros(positions.shape)
+            self._serving = np.full(n, -1)
+            self._serving_load = np.full(n, np.nan)
+            self._new = np.ones(n, dtype=bool)
+
+        step = positions - self._positions
+        reasons = {
+            'new': self._new,
+            'moved': np.einsum('ij,ij->i', step, step) > self.epsilon ** 2,
+            'reassociated': current != self._serving,
+            'load': None,
+            'pending': np.asarray(pending, dtype=bool) if pending is not None else None,
+        }
+        if loads is not None:
+            # Stations committed without loads have none to compare (NaN)
+            recorded = self._serving_load
+            reasons['load'] = ~np.isnan(recorded) & (_serving_load(current, loads) != recorded)
+
+        mask = np.zeros(n, dtype=bool)
+        for reason in REASONS:
+            if reasons[reason] is None:
+                continue
+            # Attribute each station to the first reason that applies
+            self.reasons[reason] += int(np.count_nonzero(reasons[reason] & ~mask))
+            mask |= reasons[reason]
+
+        self.ticks += 1
+        count = int(np.count_nonzero(mask))
+        self.evaluated += count
+        self.skipped += n - count
+        return mask
+
+    def commit(self, rows, sta_positions, decided, loads=None):
+        """
+        Record the state of the stations just decided.
+
+        Args:
+            rows: Indices (or bool mask) of the re-decided stations
+            sta_positions: Array (stations, 2 or 3) they were decided at
+            decided: Int array (stations,) of AP columns after the decision
+            loads: Optional array (APs,) of station counts with the decisions
+                   applied, i.e. the loads the next tick will see
+        """
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        decided = np.asarray(decided, dtype=int)
+        self._positions[rows] = np.asarray(sta_positions, dtype=float)[rows]
+        self._serving[rows] = decided[rows]
+        self._serving_load[rows] = _serving_load(decided[rows], loads)
+        self._new[rows] = False
+
+    @property
+    def skip_ratio(self):
+        """Share of station decisions skipped so far"""
+        total = self.evaluated + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def stats(self):
+        """Counters as a dict"""
+        return {'ticks': self.ticks, 'evaluated': self.evaluated, 'skipped': self.skipped,
+                'skip_ratio': self.skip_ratio, **self.reasons}
+
+    def format_stats(self):
+        """One-line report of the counters"""
+        reasons = ", ".join(f"{reason} {count}" for reason, count in self.reasons.items() if count)
+        return (f"*** Dirty tracking: {self.evaluated} decisions, {self.skipped} skipped "
+                f"({self.skip_ratio * 100:.1f}%) over {self.ticks} ticks"
+                + (f" [{reasons}]" if reasons else "") + "\n")
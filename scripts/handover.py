@@ -1,21 +1,33 @@
 #!/usr/bin/env python3
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
-from mn_wifi.cli import CLI
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+    from mn_wifi.cli import CLI
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi, CLI
 from threading import Thread
-import time
+from sim_clock import SimulationClock
+from trajectory import corridor
 
-def move_station(net, sta):
-    """Move station in a separate thread"""
-    time.sleep(3)  # Wait for network to be ready
+def move_station(net, sta, clock=None, path=None):
+    """
+    Move station in a separate thread (paced by clock, real time by default)
+    
+    path: Trajectory of the station (default: x=10 -> 120 in 5m steps)
+    """
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    if path is None:
+        path = corridor()
+    clock.sleep(3)  # Wait for network to be ready
     info("*** Starting station movement\n")
     
     current_ap = None
     
-    # Move station from x=10 to x=120
-    for x in range(10, 121, 5):
-        sta.setPosition(f'{x},20,0')
+    for position in path.labels():
+        sta.setPosition(position)
         
         # Check which AP the station is associated with
         try:
@@ -27,7 +39,7 @@ def move_station(net, sta):
             
             # Detect handover
             if connected_ap != current_ap and connected_ap is not None:
-                info(f"\n*** HANDOVER! sta1: {current_ap or 'None'} -> {connected_ap} at position ({x},20,0)\n")
+                info(f"\n*** HANDOVER! sta1: {current_ap or 'None'} -> {connected_ap} at position ({position})\n")
                 current_ap = connected_ap
             
             # Get signal strength
@@ -36,11 +48,11 @@ def move_station(net, sta):
                 rssi = sta.wintfs[0].rssi if hasattr(sta.wintfs[0], 'rssi') else 'N/A'
                 rssi_info = f" | RSSI: {rssi} dBm"
             
-            info(f"*** Position: ({x},20,0) | AP: {connected_ap or 'None'}{rssi_info}\n")
+            info(f"*** Position: ({position}) | AP: {connected_ap or 'None'}{rssi_info}\n")
         except Exception as e:
-            info(f"*** Position: ({x},20,0) | Error: {e}\n")
+            info(f"*** Position: ({position}) | Error: {e}\n")
         
-        time.sleep(1)
+        clock.sleep(path.dt)
     
     info("*** Movement complete!\n")
 
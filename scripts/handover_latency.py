@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Handover latency instrumentation.
+
+Timing only the Python calls around wintfs[0].disconnect()/associate()
+says little about when the link is actually usable. HandoverLatency
+performs the disconnect/associate itself and timestamps every stage:
+
+    decision      the controller picked a new AP (start of the handover)
+    disconnect    disconnect() returned
+    associate     associate() returned
+    link_up       first confirmed association to the target
+                  (wintfs[0].associatedTo, or `iw dev <intf> link`)
+    first_packet  first successful probe after link-up (ping or a new
+                  non-zero iperf interval), if a packet probe is given
+
+Stages that are not reached within their timeout stay NaN. breakdown()
+turns the records into per-stage latencies, summary() adds percentiles
+and histograms across the run, and save_csv() exports one row per
+handover.
+"""
+
+import csv
+import re
+import time
+
+import numpy as np
+
+
+STAGES = ('decision', 'disconnect', 'associate', 'link_up', 'first_packet')
+
+# Histogram bin edges in ms (last bin is open ended)
+HISTOGRAM_EDGES_MS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, np.inf)
+
+
+def associated_probe(sta, ap):
+    """Link confirmed once the station's interface reports the target AP"""
+    return sta.wintfs[0].associatedTo is ap.wintfs[0]
+
+
+def iw_link_probe(sta, ap):
+    """Link confirmed once `iw dev <intf> link` reports a connection (real Mininet-WiFi)"""
+    return sta.cmd(f'iw dev {sta.wintfs[0].name} link').startswith('Connected')
+
+
+def ping_probe(target_ip, timeout=1):
+    """Packet probe: one ping to target_ip succeeds"""
+    def probe(sta):
+        return ' 0% packet loss' in sta.cmd(f'ping -c 1 -W {timeout} {target_ip}')
+    return probe
+
+
+def iperf_log_probe(path):
+    """Packet probe: the iperf client log gained a non-zero interval since the last call"""
+    state = {'offset': 0}
+    rate = re.compile(r'([\d.]+)\s+[KMG]?bits/sec')
+
+    def probe(sta):
+        try:
+            with open(path) as f:
+                f.seek(state['offset'])
+                new = f.read()
+                state['offset'] = f.tell()
+        except OSError:
+            return False
+        return any(float(value) > 0 for value in rate.findall(new))
+    return probe
+
+
+class HandoverLatency:
+    """Instrumented disconnect/associate with per-stage timestamps"""
+
+    def __init__(self, link_probe=associated_probe, link_timeout=5.0, packet_probe=None,
+                 packet_timeout=5.0, poll_interval=0.01, timer=time.perf_counter):
+        """
+        Args:
+            link_probe: Function(sta, ap) -> True once the link to ap is up
+            link_timeout: Seconds to wait for link-up before giving up (NaN)
+            packet_probe: Optional function(sta) -> True on a successful packet
+                          (ping_probe, iperf_log_probe)
+            packet_timeout: Seconds to wait for the first packet
+            poll_interval: Seconds between probe calls
+            timer: Monotonic time source in seconds
+        """
+        self.link_probe = link_probe
+        self.link_timeout = link_timeout
+        self.packet_probe = packet_probe
+        self.packet_timeout = packet_timeout
+        self.poll_interval = poll_interval
+        self.timer = timer
+        self.records = []
+
+    def _wait(self, probe, timeout):
+        """Poll probe until it succeeds; its time, or NaN on timeout"""
+        deadline = self.timer() + timeout
+        while True:
+            try:
+                if probe():
+                    return self.timer()
+            except Exception:
+                pass
+            if self.timer() >= deadline:
+                return np.nan
+            time.sleep(self.poll_interval)
+
+    def execute(self, sta, old_ap, new_ap, position=None, t_decision=None):
+        """
+        Hand sta over from old_ap (None = not associated) to new_ap, timing each stage.
+
+        Args:
+            t_decision: Timer value of the decision (default: now)
+
+        Returns:
+            The handover record: from/to/position, t_<stage> timestamps and
+            'error' (association exception text or None)
+        """
+        record = {'from': old_ap.name if old_ap else 'None', 'to': new_ap.name,
+                  'position': position, 'error': None}
+        record['t_decision'] = self.timer() if t_decision is None else t_decision
+        intf = sta.wintfs[0]
+        try:
+            if old_ap:
+                intf.disconnect(intf.associatedTo)
+            record['t_disconnect'] = self.timer()
+            intf.associate(new_ap.wintfs[0])
+        except Exception as e:
+            record['error'] = str(e)
+            record.setdefault('t_disconnect', np.nan)
+        record['t_associate'] = self.timer()
+
+        record['t_link_up'] = self._wait(lambda: self.link_probe(sta, new_ap), self.link_timeout)
+        record['t_first_packet'] = np.nan
+        if self.packet_probe is not None and not np.isnan(record['t_link_up']):
+            record['t_first_packet'] = self._wait(lambda: self.packet_probe(sta),
+                                                  self.packet_timeout)
+        self.records.append(record)
+        return record
+
+    def breakdown(self):
+        """
+        Per-handover stage latencies in ms, as arrays over all records.
+
+        Returns:
+            Dict {stage: array}: disconnect, associate, link_up and
+            first_packet are measured from the previous stage, total from
+            the decision to the last stage reached
+        """
+        times = np.array([[r[f't_{stage}'] for stage in STAGES] for r in self.records],
+                         dtype=float).reshape(-1, len(STAGES))
+        stages = {stage: (times[:, i] - times[:, i - 1]) * 1000
+                  for i, stage in enumerate(STAGES) if i}
+        # Skip unreached stages: the last finite timestamp ends the handover
+        last = np.where(np.isnan(times), -np.inf, times).max(axis=1)
+        stages['total'] = (last - times[:, 0]) * 1000
+        return stages
+
+    def summary(self, edges=HISTOGRAM_EDGES_MS):
+        """
+        Percentiles and histogram per stage across the run.
+
+        Returns:
+            Dict {stage: {'count', 'missing', 'mean', 'p50', 'p90', 'p99',
+            'max', 'histogram'}}, histogram counts per edges bin
+        """
+        out = {}
+        for stage, values in self.breakdown().items():
+            valid = values[np.isfinite(values)]
+            stats = {'count': len(valid), 'missing': len(values) - len(valid),
+                     'histogram': np.histogram(valid, bins=np.asarray(edges, dtype=float))[0]}
+            if len(valid):
+                stats['mean'] = float(valid.mean())
+                stats.update(zip(('p50', 'p90', 'p99'),
+                                 np.percentile(valid, (50, 90, 99)).tolist()))
+                stats['max'] = float(valid.max())
+            out[stage] = stats
+        return out
+
+    def format_summary(self, edges=HISTOGRAM_EDGES_MS, width=30):
+        """Text report of summary(): one percentile line and histogram per stage"""
+        lines = [f"*** Handover latency over {len(self.records)} handovers (ms)\n"]
+        for stage, stats in self.summary(edges).items():
+            if not stats['count']:
+                lines.append(f"*** {stage:<12} not observed ({stats['missing']} missing)\n")
+                continue
+            lines.append(f"*** {stage:<12} n={stats['count']} mean={stats['mean']:.1f} "
+                         f"p50={stats['p50']:.1f} p90={stats['p90']:.1f} "
+                         f"p99={stats['p99']:.1f} max={stats['max']:.1f}"
+                         + (f" ({stats['missing']} missing)" if stats['missing'] else "") + "\n")
+            peak = stats['histogram'].max()
+            for lo, hi, n in zip(edges[:-1], edges[1:], stats['histogram']):
+                if n:
+                    label = f"{lo:g}-{hi:g}" if np.isfinite(hi) else f">={lo:g}"
+                    lines.append(f"      {label:>10} | {'#' * max(1, round(n / peak * width))} {n}\n")
+        return "".join(lines)
+
+    def save_csv(self, filename):
+        """One row per handover: timestamps and stage latencies in ms"""
+        stages = self.breakdown()
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['from', 'to', 'position', 'error'] +
+                            [f't_{stage}' for stage in STAGES] +
+                            [f'{stage}_ms' for stage in stages])
+            for i, r in enumerate(self.records):
+                position = r['position']
+                if isinstance(position, (tuple, list)):
+                    position = ','.join(str(c) for c in position)
+                writer.writerow([r['from'], r['to'], position, r['error'] or ''] +
+                                [r[f't_{stage}'] for stage in STAGES] +
+                                [values[i] for values in stages.values()])
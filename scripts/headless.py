@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Headless, Mininet-free network model for evaluating the handover algorithms.
+
+Handover decisions only depend on node positions and associations, so the
+controllers (SSFHandover, LLFHandover, HandoverComparison) can run against
+this in-process stand-in instead of a real Mininet-WiFi network: no root,
+no hostapd, no controller, no net.build(). HeadlessNet mirrors the parts of
+the Mininet_wifi API the scripts use (addStation, addAccessPoint,
+setPosition, wintfs[0].associate/disconnect/associatedTo, ...).
+
+The scripts fall back to this module when Mininet-WiFi is not installed.
+Run it directly to evaluate SSF, LLF and MCDM on the standard scenarios:
+
+    python3 scripts/headless.py
+"""
+
+import logging
+import sys
+import time
+
+
+# Same logger name as mininet.log, so log level handling is shared
+lg = logging.getLogger('mininet')
+
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'output': 25,
+          'warning': logging.WARNING, 'error': logging.ERROR, 'critical': logging.CRITICAL}
+
+
+def setLogLevel(level='info'):
+    """Set the level for info() output (mininet.log compatible names)"""
+    lg.setLevel(LEVELS.get(level, logging.INFO))
+
+
+def info(*args):
+    """Write args to stdout if the info level is enabled (mininet.log.info stand-in)"""
+    if lg.isEnabledFor(logging.INFO):
+        sys.stdout.write(''.join(str(arg) for arg in args))
+
+
+def _position_tuple(position):
+    """'x,y,z' or (x, y, z) -> ('x', 'y', 'z') as the controllers expect in params"""
+    if isinstance(position, str):
+        position = position.split(',')
+    coords = [str(c).strip() for c in position]
+    while len(coords) < 3:
+        coords.append('0')
+    return tuple(coords[:3])
+
+
+class HeadlessIntf:
+    """Wireless interface: tracks which AP interface it is associated to"""
+
+    def __init__(self, node):
+        self.node = node
+        self.name = f"{node.name}-wlan0"
+        self.associatedTo = None
+
+    def associate(self, ap_intf):
+        self.associatedTo = ap_intf
+
+    def disconnect(self, ap_intf=None):
+        self.associatedTo = None
+
+
+class HeadlessNode:
+    """Station, AP or host with a position and one wireless interface"""
+
+    def __init__(self, name, position='0,0,0', **params):
+        self.name = name
+        self.params = dict(params)
+        self.wintfs = [HeadlessIntf(self)]
+        self.setPosition(position)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
+
+    def setPosition(self, position):
+        self.params['position'] = _position_tuple(position)
+        self.position = [float(c) for c in self.params['position']]
+
+    def setRange(self, range_):
+        self.params['range'] = range_
+
+    def IP(self):
+        return self.params.get('ip', '').split('/')[0]
+
+    def start(self, controllers=None):
+        pass
+
+    def cmd(self, *args, **kwargs):
+        return ''
+
+
+class HeadlessController:
+    """Placeholder for mininet.node.Controller"""
+
+    def __init__(self, name='c0', **params):
+        self.name = name
+
+    def start(self):
+        pass
+
+
+class HeadlessNet:
+    """In-process stand-in for Mininet_wifi: node bookkeeping only"""
+
+    def __init__(self, controller=None, **params):
+        self.stations = []
+        self.aps = []
+        self.hosts = []
+        self.controllers = []
+
+    def addStation(self, name, **params):
+        sta = HeadlessNode(name, **params)
+        self.stations.append(sta)
+        return sta
+
+    def addAccessPoint(self, name, **params):
+        ap = HeadlessNode(name, **params)
+        self.aps.append(ap)
+        return ap
+
+    def addHost(self, name, **params):
+        host = HeadlessNode(name, **params)
+        self.hosts.append(host)
+        return host
+
+    def addController(self, name='c0', **params):
+        controller = HeadlessController(name, **params)
+        self.controllers.append(controller)
+        return controller
+
+    def addLink(self, *args, **params):
+        pass
+
+    def configureWifiNodes(self):
+        pass
+
+    def plotGraph(self, **params):
+        pass
+
+    def build(self):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+# Drop-in names for the scripts' Mininet-WiFi imports
+Controller = HeadlessController
+Mininet_wifi = HeadlessNet
+
+
+def CLI(net):
+    """No interactive CLI without Mininet-WiFi"""
+    info("*** Headless mode: no CLI\n")
+
+
+def evaluate(steps=23):
+    """Run SSF, LLF and MCDM headless on the scripts' scenarios and report decision rates"""
+    # Imported here: the scripts import this module when Mininet-WiFi is missing
+    import numpy as np
+    from sim_clock import SimulationClock
+    from batch_handover import BatchHandover
+    import ssf2
+    import llf
+    import mcdm_ssf_compare
+
+    net = HeadlessNet()
+    sta1 = net.addStation('sta1', ip='10.0.0.1', position='10,20,0')
+    ap1 = net.addAccessPoint('ap1', position='20,40,0', range=60)
+    ap2 = net.addAccessPoint('ap2', position='100,40,0', range=60)
+
+    ssf = ssf2.SSFHandover(net, sta1, [ap1, ap2], hysteresis_margin=5, ap_range=60)
+    lf = llf.LLFHandover(net, sta1, [ap1, ap2], min_rssi_threshold=-90, ap_range=60)
+    for name, controller, move in (('SSF', ssf, ssf2.move_station_ssf),
+                                   ('LLF', lf, llf.move_station_llf)):
+        sta1.setPosition('10,20,0')
+        sta1.wintfs[0].disconnect()
+        clock = SimulationClock()
+        move(net, sta1, controller, clock=clock)
+        print(f"{name}: final AP {controller.current_ap.name}, "
+              f"{clock.now:.0f}s of virtual time")
+
+    ap_configs = {
+        ap1: {'position': ('30', '50', '0'), 'load': 1.0},
+        ap2: {'position': ('100', '50', '0'), 'load': 2.5},
+    }
+    comparator = mcdm_ssf_compare.HandoverComparison([ap1, ap2], ap_configs)
+
+    # Decision rate of the single-station entry points
+    for name, decide in (('SSF select_best_ap', ssf.select_best_ap),
+                         ('LLF select_best_ap', lf.select_best_ap),
+                         ('MCDM mcdm_decision', lambda: comparator.mcdm_decision(sta1.params['position']))):
+        t_start = time.perf_counter()
+        for x in range(steps * 100):
+            sta1.setPosition(f'{10 + x % 110},20,0')
+            decide()
+        elapsed = time.perf_counter() - t_start
+        print(f"{name}: {steps * 100 / elapsed:,.0f} decisions/s")
+
+    # Replaying a jittered path: exact memo keys miss, a 0.5m grid hits
+    from decision_memo import DecisionMemo
+    from trajectory import piecewise_linear
+    walk = piecewise_linear(mcdm_ssf_compare.MCDM_WAYPOINTS, dt=0.2).station(0)
+    replays = np.concatenate([walk + np.random.default_rng(rep).normal(0, 0.1, walk.shape)
+                              for rep in range(5)])
+    reference = comparator.mcdm_decision_batch(replays)[0]
+    for quantum in (None, 0.5):
+        memoized = mcdm_ssf_compare.HandoverComparison(
+            [ap1, ap2], ap_configs, memo=DecisionMemo(quantum=quantum))
+        decided = np.array([memoized.aps.index(memoized.mcdm_decision(p)[0]) for p in replays])
+        print(f"MCDM memo (quantum={quantum}): {memoized.memo.hit_rate * 100:.1f}% hit rate, "
+              f"{np.mean(decided == reference) * 100:.2f}% same decisions")
+
+    # Whole-population decisions in one call
+    batch = BatchHandover([ap1, ap2], {ap: ap.params['position'] for ap in (ap1, ap2)},
+                          ap_range=60)
+    positions = np.random.default_rng(0).uniform((0, 0), (140, 90), (10000, 2))
+    current = np.full(len(positions), -1)
+    t_start = time.perf_counter()
+    for _ in range(10):
+        current, _ = batch.ssf(positions, current)
+    elapsed = time.perf_counter() - t_start
+    print(f"BatchHandover.ssf: {10 * len(positions) / elapsed:,.0f} decisions/s")
+
+    # LLF fed its own association loads: a lone station between two idle
+    # APs must not count itself and keep switching
+    lone = np.array([[60.0, 40.0]])
+    decided = np.array([-1])
+    handovers = 0
+    for _ in range(10):
+        decided, handover = batch.llf(lone, decided, batch.association_loads(decided))
+        handovers += int(handover[0])
+    assert handovers == 1, f"lone LLF station switched {handovers - 1} times"
+    print(f"BatchHandover.llf: lone station stays on {batch.aps[decided[0]].name} over 10 ticks")
+
+    # Mostly stationary office: 2% of the stations take a step per tick, and
+    # only stations that moved (or changed AP) are re-decided
+    from dirty_tracker import DirtyTracker
+    rng = np.random.default_rng(1)
+    tracker = DirtyTracker(epsilon=0.5)
+    full = incremental = np.full(len(positions), -1)
+    t_full = t_incremental = 0.0
+    for _ in range(steps):
+        walking = rng.random(len(positions)) < 0.02
+        positions[walking] += rng.normal(0, 1.5, (np.count_nonzero(walking), 2))
+        t_start = time.perf_counter()
+        full, _ = batch.ssf(positions, full)
+        t_full += time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        rows = np.flatnonzero(tracker.dirty(positions, incremental))
+        incremental, _ = batch.ssf(positions, incremental, rows=rows)
+        tracker.commit(rows, positions, incremental)
+        t_incremental += time.perf_counter() - t_start
+    print(tracker.format_stats(), end='')
+    print(f"Incremental SSF: {t_full / t_incremental:.1f}x faster per tick than re-deciding "
+          f"everyone, {np.mean(full == incremental) * 100:.2f}% same decisions")
+
+    # Mobility models: 1000 stations walking for 2 minutes, decided every second
+    import trajectory
+    for name, model in (('Random waypoint', trajectory.random_waypoint),
+                        ('Gauss-Markov', trajectory.gauss_markov),
+                        ('Manhattan', trajectory.manhattan)):
+        t_start = time.perf_counter()
+        path = model(1000, 120, seed=0)
+        t_generate = time.perf_counter() - t_start
+        tracker = DirtyTracker(epsilon=0.5)
+        current = np.full(path.n_stations, -1)
+        handovers = 0
+        for _, positions in path:
+            rows = np.flatnonzero(tracker.dirty(positions, current))
+            decided, handover = batch.ssf(positions, current, rows=rows)
+            tracker.commit(rows, positions, decided)
+            # First associations are not handovers
+            handovers += int(np.count_nonzero(handover & (current >= 0)))
+            current = decided
+        print(f"{name}: {len(path)} ticks generated in {t_generate * 1000:.0f} ms, "
+              f"{handovers} SSF handovers, {tracker.skip_ratio * 100:.1f}% decisions skipped")
+
+
+if __name__ == '__main__':
+    setLogLevel('warning')
+    evaluate()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Streaming iperf log parser and throughput timeline.
+
+The scripts start iperf clients with `-i 1` and redirect their interval
+reports to sta1_iperf.log, sta2_iperf.log, ... (and the server's to
+iperf_server.log). IperfLogTail follows one such file while it is being
+written, parsing only the complete lines appended since the last poll, and
+ThroughputMonitor polls a set of logs from a background thread:
+
+    monitor = ThroughputMonitor({'sta1': 'sta1_iperf.log'}).start()
+    ...
+    monitor.stop()
+    times, mbps = monitor.timeline('sta1')
+    dips = throughput_dips(times, mbps, [ev['t_start'] for ev in events])
+
+Interval reports are relative to the connection start; a sample's time is
+t0 + interval end, with t0 either given (the time the client was started)
+or inferred from when the first report was seen. Times use the same
+monotonic timer as handover_latency (time.perf_counter), so they line up
+with handover_events.
+"""
+
+import re
+import threading
+import time
+
+import numpy as np
+
+
+# iperf2 interval report: "[  3]  1.0- 2.0 sec  1.25 MBytes  10.5 Mbits/sec"
+INTERVAL_RE = re.compile(r'^\[\s*(\w+)\]\s+([\d.]+)\s*-\s*([\d.]+)\s+sec\s+'
+                         r'([\d.]+)\s+([KMG]?)Bytes\s+([\d.]+)\s+([KMG]?)bits/sec')
+# Connection line: "[  4] local 10.0.0.100 port 5001 connected with 10.0.0.1 port 40312"
+CONNECT_RE = re.compile(r'^\[\s*(\w+)\]\s+local\s+\S+\s+port\s+\d+\s+connected with\s+(\S+)')
+
+UNITS = {'': 1.0, 'K': 1e3, 'M': 1e6, 'G': 1e9}
+
+
+def parse_interval_line(line):
+    """
+    One iperf interval report.
+
+    Returns:
+        (connection id, start s, end s, bits/sec) or None for other lines
+    """
+    m = INTERVAL_RE.match(line)
+    if not m:
+        return None
+    conn, start, end, _, _, rate, unit = m.groups()
+    return conn, float(start), float(end), float(rate) * UNITS[unit]
+
+
+class IperfLogTail:
+    """Incrementally parsed iperf log: one throughput series per connection"""
+
+    def __init__(self, path, t0=None, timer=time.perf_counter):
+        """
+        Args:
+            path: iperf output file (may not exist yet)
+            t0: Timer value at which the iperf client started (None = infer
+                from the arrival of the first report)
+            timer: Time source, shared with the handover timestamps
+        """
+        self.path = path
+        self.t0 = t0
+        self.timer = timer
+        self._offset = 0
+        self._partial = ''
+        self.peers = {}  # connection id -> peer address (server logs)
+        self._series = {}  # key -> ([times], [bits/sec])
+        self._last_end = {}
+        # poll() may run on the monitor thread and a caller's thread at once
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Parse lines appended since the last call; returns the number of new samples"""
+        with self._lock:
+            return self._poll()
+
+    def _poll(self):
+        try:
+            with open(self.path) as f:
+                if f.seek(0, 2) < self._offset:
+                    # Truncated (e.g. a new run's redirect): start over
+                    self._offset, self._partial = 0, ''
+                    self._last_end = {}
+                f.seek(self._offset)
+                chunk = f.read()
+                self._offset = f.tell()
+        except OSError:
+            return 0
+        lines = (self._partial + chunk).split('\n')
+        self._partial = lines.pop()  # incomplete last line, finished next poll
+        now = self.timer()
+        added = 0
+        for line in lines:
+            m = CONNECT_RE.match(line)
+            if m:
+                self.peers[m.group(1)] = m.group(2)
+                continue
+            sample = parse_interval_line(line)
+            if sample is None:
+                continue
+            conn, start, end, bps = sample
+            # The end-of-run summary restarts at 0 and spans the whole run
+            if start < self._last_end.get(conn, 0.0):
+                continue
+            self._last_end[conn] = end
+            if self.t0 is None:
+                self.t0 = now - end
+            times, rates = self._series.setdefault(self.peers.get(conn, conn), ([], []))
+            times.append(self.t0 + end)
+            rates.append(bps)
+            added += 1
+        return added
+
+    def keys(self):
+        """Connection keys seen so far (peer address on server logs, iperf id otherwise)"""
+        with self._lock:
+            return list(self._series)
+
+    def series(self, key=None):
+        """
+        Throughput time series of one connection (default: the only/first one).
+
+        Returns:
+            (times, mbps) float arrays, times in timer seconds at interval end
+        """
+        with self._lock:
+            if not self._series:
+                return np.empty(0), np.empty(0)
+            times, rates = self._series[key if key is not None else next(iter(self._series))]
+            return np.array(times), np.array(rates) / 1e6
+
+
+class ThroughputMonitor:
+    """Background poller of several iperf logs, keyed by station label"""
+
+    def __init__(self, logs, interval=0.5, timer=time.perf_counter):
+        """
+        Args:
+            logs: Dict {label: path} or {label: IperfLogTail}
+            interval: Seconds between polls
+        """
+        self.tails = {label: log if isinstance(log, IperfLogTail) else IperfLogTail(log, timer=timer)
+                      for label, log in logs.items()}
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Poll every log once"""
+        return sum(tail.poll() for tail in self.tails.values())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        """Start polling in a daemon thread; returns self"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling, after a final poll"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.poll()
+
+    def timeline(self, label, key=None):
+        """(times, mbps) of one station's log"""
+        return self.tails[label].series(key)
+
+
+def throughput_dips(times, mbps, handover_times, baseline_window=3.0, horizon=10.0,
+                    recovery_fraction=0.9):
+    """
+    Throughput dip and recovery around every handover.
+
+    Args:
+        times, mbps: Throughput series (sorted by time)
+        handover_times: Handover start times on the same time base
+        baseline_window: Seconds before the handover averaged as the baseline
+        horizon: Seconds after the handover searched for the dip and recovery
+        recovery_fraction: Recovered once throughput is back to this share
+                           of the baseline
+
+    Returns:
+        Dict of (handovers,) arrays: baseline and minimum Mbps, depth (Mbps)
+        and depth_pct (share of the baseline lost), recovery_time (s from the
+        handover, NaN if not within the horizon); NaN where no samples exist
+    """
+    times = np.asarray(times, dtype=float)
+    mbps = np.asarray(mbps, dtype=float)
+    handover_times = np.asarray(handover_times, dtype=float)
+    n = len(handover_times)
+    out = {name: np.full(n, np.nan)
+           for name in ('baseline', 'minimum', 'depth', 'depth_pct', 'recovery_time')}
+
+    # Sample ranges [before, start) and [start, end) of every handover at once
+    before = np.searchsorted(times, handover_times - baseline_window, side='left')
+    start = np.searchsorted(times, handover_times, side='left')
+    end = np.searchsorted(times, handover_times + horizon, side='right')
+    cumulative = np.concatenate([[0.0], np.cumsum(mbps)])
+    has_base = start > before
+    out['baseline'][has_base] = ((cumulative[start] - cumulative[before])[has_base] /
+                                 (start - before)[has_base])
+
+    for i in np.flatnonzero(end > start):
+        window = mbps[start[i]:end[i]]
+        low = int(np.argmin(window))
+        out['minimum'][i] = window[low]
+        if not has_base[i]:
+            continue
+        # Recovery: first sample at or after the minimum back near the baseline
+        recovered = np.flatnonzero(window[low:] >= recovery_fraction * out['baseline'][i])
+        if recovered.size:
+            out['recovery_time'][i] = times[start[i] + low + recovered[0]] - handover_times[i]
+    out['depth'] = np.maximum(out['baseline'] - out['minimum'], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['depth_pct'] = out['depth'] / out['baseline'] * 100
+    return out
+
+
+def format_dips(dips, events):
+    """Text report of throughput_dips() for handover_events"""
+    lines = ["*** Throughput around handovers:\n"]
+    for i, ev in enumerate(events):
+        if not np.isfinite(dips['baseline'][i]):
+            lines.append(f"*** {ev['from']} -> {ev['to']} at {ev['position']}: "
+                         "no throughput samples before the handover\n")
+            continue
+        recovery = dips['recovery_time'][i]
+        lines.append(f"*** {ev['from']} -> {ev['to']} at {ev['position']}: "
+                     f"baseline {dips['baseline'][i]:.2f} Mbps, min {dips['minimum'][i]:.2f} Mbps, "
+                     f"dip {dips['depth'][i]:.2f} Mbps ({dips['depth_pct'][i]:.0f}%), "
+                     + (f"recovered in {recovery:.1f}s\n" if np.isfinite(recovery)
+                        else "no recovery observed\n"))
+    return "".join(lines)
@@ -1,22 +1,34 @@
 #!/usr/bin/env python3
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
-from mn_wifi.cli import CLI
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+    from mn_wifi.cli import CLI
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi, CLI
 from threading import Thread
-import time
+from sim_clock import SimulationClock
+from trajectory import corridor
 import math
+import numpy as np
+from signal_engine import SignalEngine, parse_position
+from association import AssociationRegistry
+import decision_trace
+import position_cache
 
 class LLFHandover:
     """Least-Loaded First (LLF) - Pure load balancing, prioritizes least busy AP"""
     
-    def __init__(self, net, sta, aps, min_rssi_threshold=-90):
+    def __init__(self, net, sta, aps, min_rssi_threshold=-90, ap_range=None, registry=None,
+                 trace=None, propagation=None, positions=None):
         self.net = net
         self.sta = sta
         self.aps = aps
         self.min_rssi_threshold = min_rssi_threshold  # Very lenient, only exclude out-of-range
         self.current_ap = None
-        self.ap_loads = {ap: 0 for ap in aps}  # Track number of stations per AP
+        # Stations per AP, updated on associate/disconnect (shared between controllers)
+        self.registry = registry if registry is not None else AssociationRegistry.from_net(net, aps)
         
         # Store AP positions at initialization
         self.ap_positions = {}
@@ -31,113 +43,88 @@ class LLFHandover:
                         self.ap_positions[ap] = ('20', '40', '0')
                     else:
                         self.ap_positions[ap] = ('100', '40', '0')
+        
+        # Vectorized RSSI for all APs (coordinates parsed once); with
+        # ap_range only in-range APs are scored, via the engine's grid index
+        self.engine = SignalEngine(aps, self.ap_positions, ap_range=ap_range,
+                                   model=propagation)
+        self.trace = trace if trace is not None else decision_trace.trace
+        # Station coordinates kept by a setPosition hook; RSSI only recomputed after a move
+        self.positions = positions if positions is not None else position_cache.positions
+        self.positions.watch(sta)
+        self.rows = position_cache.StationRows(self.engine, self.positions)
     
     def get_position(self, node):
         """Get position of a node"""
         if node in self.ap_positions:
             return self.ap_positions[node]
-        try:
-            return node.params['position']
-        except (KeyError, AttributeError):
-            try:
-                return node.position
-            except AttributeError:
-                return ('10', '20', '0')
+        return self.positions.label(node)
         
     def calculate_distance(self, pos1, pos2):
-        """Calculate Euclidean distance"""
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
     
     def estimate_rssi(self, distance):
-        """Estimate RSSI using path loss model"""
-        if distance < 1:
-            distance = 1
-        return -40 - 20 * math.log10(distance)
+        """RSSI of the engine's propagation model at one distance"""
+        return float(self.engine.model.rssi(distance))
+    
+    @property
+    def ap_loads(self):
+        """Current load per AP as a dict {ap: stations}"""
+        return self.registry.snapshot()
     
     def get_ap_load(self, ap):
         """Get current load on AP (number of associated stations)"""
-        # In real scenario, would query AP for actual load
-        # For simulation, we track it manually
-        try:
-            # Count stations associated with this AP
-            load = len([sta for sta in self.net.stations 
-                       if hasattr(sta, 'wintfs') and len(sta.wintfs) > 0 
-                       and hasattr(sta.wintfs[0], 'associatedTo') 
-                       and sta.wintfs[0].associatedTo == ap.wintfs[0]])
-            return load
-        except:
-            return self.ap_loads.get(ap, 0)
+        return self.registry.load(ap)
     
     def select_best_ap(self):
         """Select AP with LEAST LOAD (prioritize load over signal strength)"""
-        # Get current position - try multiple methods
-        try:
-            current_pos = self.sta.params['position']
-        except (KeyError, AttributeError):
-            try:
-                current_pos = self.sta.position
-            except AttributeError:
-                current_pos = ('10', '20', '0')
+        current_pos = self.get_position(self.sta)
         
-        candidate_aps = []
-        
-        info(f"\n*** LLF Analysis at position {current_pos}:\n")
-        info(f"*** Strategy: Choose LEAST LOADED AP (load is priority, not signal)\n")
+        # RSSI for all in-range APs (recomputed only if the station moved),
+        # loads from one registry snapshot
+        cols, rssi = self.rows.row(self.sta)
+        all_loads = self.registry.loads()
+        loads = all_loads[cols]
+        # The station does not count toward its current AP's load, or that
+        # AP would always look one station heavier than its neighbours
+        own_ap = self.registry.ap_of(self.sta)
+        if own_ap is not None:
+            loads[cols == self.engine.ap_index[own_ap]] -= 1
         
         # Find APs that are reachable (minimal signal threshold)
-        for ap in self.aps:
-            try:
-                ap_pos = ap.params['position']
-            except (KeyError, AttributeError):
-                ap_pos = ap.position
-            
-            distance = self.calculate_distance(current_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            load = self.get_ap_load(ap)
-            
-            info(f"*** {ap.name}: Load={load} stations, RSSI={rssi:.1f}dBm")
-            
-            if rssi >= self.min_rssi_threshold:
-                candidate_aps.append((ap, rssi, load))
-                info(f" ✓ Reachable\n")
-            else:
-                info(f" ✗ Out of range\n")
-        
-        if not candidate_aps:
-            info("*** No APs reachable! Staying with current.\n")
-            return self.current_ap
+        reachable = rssi >= self.min_rssi_threshold
+        candidate_aps = np.flatnonzero(reachable)
         
         # CRITICAL: Sort ONLY by load (ascending), IGNORE RSSI unless loads are exactly equal
         # This means we prefer a less-loaded AP even if signal is weaker
-        candidate_aps.sort(key=lambda x: (x[2], -x[1]))  # Load first, RSSI only as tiebreaker
+        candidate_aps = candidate_aps[np.lexsort((-rssi[candidate_aps], loads[candidate_aps]))]
         
-        best_ap = candidate_aps[0][0]
-        best_load = candidate_aps[0][2]
-        best_rssi = candidate_aps[0][1]
+        # Show why we choose (or cannot choose) an AP
+        if self.trace.enabled():
+            self.trace.emit('llf_select', position=current_pos,
+                            aps=[self.aps[col].name for col in cols], rssi=rssi, loads=loads,
+                            reachable=reachable, order=candidate_aps.tolist())
         
-        # Show why we chose this
-        if len(candidate_aps) > 1:
-            second_ap = candidate_aps[1][0]
-            second_load = candidate_aps[1][2]
-            second_rssi = candidate_aps[1][1]
-            info(f"*** Choosing {best_ap.name} (Load={best_load}) over {second_ap.name} (Load={second_load})\n")
-            if second_rssi > best_rssi:
-                info(f"*** NOTE: {second_ap.name} has better signal ({second_rssi:.1f}dBm vs {best_rssi:.1f}dBm) "
-                     f"but {best_ap.name} is less loaded!\n")
-        else:
-            info(f"*** Selected: {best_ap.name} (Load={best_load}, RSSI={best_rssi:.1f}dBm)\n")
-        
-        return best_ap
+        if candidate_aps.size == 0:
+            return self.current_ap
+        return self.aps[cols[candidate_aps[0]]]
 
-def move_station_llf(net, sta, handover_controller):
-    """Move station with LLF handover"""
-    time.sleep(3)
+def move_station_llf(net, sta, handover_controller, clock=None, path=None):
+    """
+    Move station with LLF handover (paced by clock, real time by default)
+    
+    path: Trajectory of the station (default: the x=10 -> 120 corridor)
+    """
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    if path is None:
+        path = corridor()
+    clock.sleep(3)
     info("*** Starting LLF (Least-Loaded First) handover\n")
     
-    for x in range(10, 121, 5):
-        sta.setPosition(f'{x},20,0')
+    for position in path.labels():
+        sta.setPosition(position)
         
         best_ap = handover_controller.select_best_ap()
         
@@ -148,9 +135,7 @@ def move_station_llf(net, sta, handover_controller):
             info(f"*** Reason: {best_ap.name} has lower load\n")
             
             # Update load tracking
-            if old_ap:
-                handover_controller.ap_loads[old_ap] = max(0, handover_controller.ap_loads[old_ap] - 1)
-            handover_controller.ap_loads[best_ap] = handover_controller.ap_loads[best_ap] + 1
+            handover_controller.registry.associate(sta, best_ap)
             
             try:
                 if old_ap:
@@ -161,7 +146,7 @@ def move_station_llf(net, sta, handover_controller):
             
             handover_controller.current_ap = best_ap
         
-        time.sleep(1)
+        clock.sleep(path.dt)
     
     info("*** Movement complete!\n")
 
@@ -195,16 +180,17 @@ def run():
 
     info("*** Initializing LLF handover controller (min_rssi=-90dBm)\n")
     info("*** LLF prioritizes LOAD over signal strength!\n")
-    handover_controller = LLFHandover(net, sta1, [ap1, ap2], min_rssi_threshold=-90)
+    handover_controller = LLFHandover(net, sta1, [ap1, ap2], min_rssi_threshold=-90, ap_range=60)
     
     # Simulate initial load by associating other stations to ap1
     info("*** Creating initial load: sta2 and sta3 connect to ap1\n")
     try:
         sta2.wintfs[0].associate(ap1.wintfs[0])
         sta3.wintfs[0].associate(ap1.wintfs[0])
-        handover_controller.ap_loads[ap1] = 2
     except:
         pass
+    handover_controller.registry.associate(sta2, ap1)
+    handover_controller.registry.associate(sta3, ap1)
 
     info("*** Starting mobility\n")
     mobility_thread = Thread(target=move_station_llf, args=(net, sta1, handover_controller))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Batched, N-criteria Entropy + TOPSIS for many stations at once.
+
+Decision matrices are stacked as (stations, APs, criteria). Every step of
+HandoverComparison.calculate_entropy_weights / apply_topsis is evaluated
+with array operations over the whole stack, including the uniform weight
+and score fallbacks. An optional (stations, APs) mask excludes APs (e.g.
+out of range) from a station's matrix.
+
+Criteria are registered by name with a direction (benefit or cost) and a
+vectorized extractor. An extractor receives a context dict of arrays and
+returns a (stations, APs) column:
+
+    'distance', 'rssi'       (stations, APs)
+    'load_factor', 'load',
+    'channel_utilization'    (APs,) congestion factor, associated stations,
+                             busy airtime fraction 0..1
+    'noise_floor'            scalar dBm
+"""
+
+import numpy as np
+
+
+NOISE_FLOOR = -95.0  # dBm, used for SNR when the context has none
+
+
+class Criterion:
+    """One decision matrix column: name, direction and vectorized extractor"""
+
+    def __init__(self, name, benefit, extractor):
+        """
+        Args:
+            name: Criterion name (registry key)
+            benefit: True if higher is better, False for cost criteria
+            extractor: Function(context) -> (stations, APs) array
+        """
+        self.name = name
+        self.benefit = benefit
+        self.extractor = extractor
+
+    def __repr__(self):
+        return f"Criterion({self.name!r}, {'benefit' if self.benefit else 'cost'})"
+
+
+CRITERIA = {}
+
+
+def register_criterion(name, benefit, extractor):
+    """Add (or replace) a criterion in the registry"""
+    CRITERIA[name] = Criterion(name, benefit, extractor)
+    return CRITERIA[name]
+
+
+def get_criteria(names):
+    """Look up criteria by name, preserving order"""
+    try:
+        return [CRITERIA[name] for name in names]
+    except KeyError as e:
+        raise ValueError(f"Unknown MCDM criterion {e.args[0]!r}, "
+                         f"registered: {sorted(CRITERIA)}") from None
+
+
+def build_decision_matrices(criteria, context):
+    """Evaluate every criterion once into a (stations, APs, criteria) stack"""
+    shape = np.shape(context['rssi'])
+    return np.stack([np.broadcast_to(c.extractor(context), shape) for c in criteria], axis=2)
+
+
+def benefit_mask(criteria):
+    """Direction of each criterion as a bool array for topsis_batch"""
+    return np.array([c.benefit for c in criteria], dtype=bool)
+
+
+def estimate_delays(distances, load_factors):
+    """
+    Delay (ms) with AP-specific congestion, same model as
+    HandoverComparison.estimate_delay. load_factors broadcasts over the AP axis.
+    """
+    propagation_delay = (distances / 1000) / 300
+    processing_delay = 5.0
+    distance_factor = 1 + (distances / 100) * 0.1
+    return (propagation_delay + processing_delay) * distance_factor * load_factors
+
+
+def _snr(context):
+    return context['rssi'] - context.get('noise_floor', NOISE_FLOOR)
+
+
+def _load(context):
+    return context.get('load', context['load_factor'])
+
+
+def _estimate_throughput(context):
+    """Shannon rate over 20MHz capped at 54 Mbps, shared by associated stations"""
+    snr_linear = 10 ** (np.maximum(_snr(context), 0) / 10)
+    rate = np.minimum(20 * np.log2(1 + snr_linear), 54.0)
+    utilization = context.get('channel_utilization', 0.0)
+    return rate * (1 - utilization) / (1 + np.asarray(_load(context)))
+
+
+register_criterion('rssi', True, lambda ctx: ctx['rssi'])
+register_criterion('delay', False, lambda ctx: estimate_delays(ctx['distance'], ctx['load_factor']))
+register_criterion('load', False, _load)
+register_criterion('snr', True, _snr)
+register_criterion('channel_utilization', False, lambda ctx: ctx.get('channel_utilization', 0.0))
+register_criterion('throughput', True, _estimate_throughput)
+
+
+def entropy_weights_batch(decision_matrices, mask=None):
+    """
+    Entropy weights for a stack of decision matrices.
+
+    Args:
+        decision_matrices: Array (stations, APs, criteria)
+        mask: Optional bool array (stations, APs), False rows are ignored
+
+    Returns:
+        Array (stations, criteria) of weights
+    """
+    dm = np.abs(np.asarray(decision_matrices, dtype=float))
+    n_sta, n_aps, n_crit = dm.shape
+    if mask is None:
+        mask = np.ones((n_sta, n_aps), dtype=bool)
+    valid = mask[:, :, None]
+    dm = np.where(valid, dm, 0.0)
+
+    col_norms = np.sqrt(np.sum(dm ** 2, axis=1, keepdims=True))
+    col_norms = np.where(col_norms == 0, 1e-10, col_norms)
+    normalized = dm / col_norms
+
+    m = mask.sum(axis=1)
+    fallback = np.full(n_crit, 1.0 / n_crit)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(m > 1, 1.0 / np.log(np.maximum(m, 2)), 0.0)
+
+        col_sum = np.sum(normalized, axis=1, keepdims=True)
+        p = normalized / np.where(col_sum == 0, 1.0, col_sum)
+        p = np.where(p <= 0, 1e-10, p)
+        plogp = np.where(valid, p * np.log(p), 0.0)
+        entropies = -k[:, None] * np.sum(plogp, axis=1)
+        entropies = np.where(col_sum[:, 0, :] == 0, 0.0, entropies)
+
+        diversities = 1 - entropies
+        total = np.sum(diversities, axis=1, keepdims=True)
+        weights = diversities / total
+
+    bad = (m <= 1) | (total[:, 0] == 0) | np.isnan(total[:, 0]) | np.any(np.isnan(weights), axis=1)
+    weights[bad] = fallback
+    return weights
+
+
+def topsis_batch(decision_matrices, weights, benefit=None, mask=None):
+    """
+    TOPSIS closeness scores for a stack of decision matrices.
+
+    Args:
+        decision_matrices: Array (stations, APs, criteria)
+        weights: Array (stations, criteria) or (criteria,)
+        benefit: Bool array (criteria,), True = higher is better.
+                 Defaults to [rssi, delay] = [True, False]
+        mask: Optional bool array (stations, APs), False rows are ignored
+
+    Returns:
+        (best_idx, scores): best AP column per station (-1 if no valid AP)
+        and (stations, APs) closeness scores (0 for masked APs)
+    """
+    dm = np.asarray(decision_matrices, dtype=float)
+    n_sta, n_aps, n_crit = dm.shape
+    if benefit is None:
+        benefit = np.array([True, False])
+    benefit = np.asarray(benefit, dtype=bool)
+    if mask is None:
+        mask = np.ones((n_sta, n_aps), dtype=bool)
+    valid = mask[:, :, None]
+    dm = np.where(valid, dm, 0.0)
+
+    col_norms = np.sqrt(np.sum(dm ** 2, axis=1, keepdims=True))
+    col_norms = np.where(col_norms == 0, 1e-10, col_norms)
+    weighted = dm / col_norms * np.asarray(weights, dtype=float).reshape(-1, 1, n_crit)
+
+    col_max = np.max(np.where(valid, weighted, -np.inf), axis=1, keepdims=True)
+    col_min = np.min(np.where(valid, weighted, np.inf), axis=1, keepdims=True)
+    ideal = np.where(benefit, col_max, col_min)
+    negative = np.where(benefit, col_min, col_max)
+
+    with np.errstate(invalid='ignore'):
+        dist_ideal = np.sqrt(np.sum((weighted - ideal) ** 2, axis=2))
+        dist_negative = np.sqrt(np.sum((weighted - negative) ** 2, axis=2))
+        scores = dist_negative / (dist_ideal + dist_negative + 1e-10)
+    scores = np.where(mask, scores, np.nan)
+
+    # Any NaN among valid APs -> uniform scores, as in apply_topsis
+    n_valid = mask.sum(axis=1)
+    bad = np.any(np.isnan(scores) & mask, axis=1)
+    uniform = np.where(mask, 1.0 / np.maximum(n_valid, 1)[:, None], np.nan)
+    scores = np.where(bad[:, None], uniform, scores)
+
+    best_idx = np.argmax(np.where(mask, scores, -np.inf), axis=1)
+    best_idx = np.where(n_valid > 0, best_idx, -1)
+    return best_idx, np.nan_to_num(scores, nan=0.0)
@@ -4,32 +4,68 @@ Enhanced SSF vs MCDM comparison with 4 APs and more complex scenario
 Shows where MCDM makes significantly different decisions
 """
 
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
-from mn_wifi.cli import CLI
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+    from mn_wifi.cli import CLI
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi, CLI
 from threading import Thread
-import time
+from types import MappingProxyType
+import argparse
+from decision_trace import trace, register_formatter
+from decision_log import DecisionLogWriter
 import math
 import numpy as np
+from sim_clock import SimulationClock
+from signal_engine import SignalEngine, parse_position, positions_array
+from decision_memo import DecisionMemo
+from trajectory import piecewise_linear
+from mcdm import (estimate_delays, entropy_weights_batch, topsis_batch,
+                  get_criteria, benefit_mask, build_decision_matrices)
 
 class HandoverComparison:
     """Compare SSF and MCDM decisions with multiple APs"""
     
-    def __init__(self, aps, ap_configs):
+    def __init__(self, aps, ap_configs, criteria=('rssi', 'delay'), propagation=None, memo=None):
         """
         Args:
             aps: List of AP objects
             ap_configs: Dict with AP configurations
-                       {ap: {'position': (x,y,z), 'load': congestion_factor}}
+                       {ap: {'position': (x,y,z), 'load': congestion_factor,
+                             'stations': n, 'channel_utilization': 0..1}}
+            criteria: MCDM criteria names from the mcdm registry
+            propagation: Propagation model name, spec or instance (default free space)
+            memo: Optional DecisionMemo for MCDM results per position
+
+        Load inputs are read-only views (ap_loads, ap_stations,
+        ap_utilization); change them with set_ap_load() so memoized
+        decisions are dropped.
         """
         self.aps = aps
         self.ap_positions = {}
-        self.ap_loads = {}  # Simulated congestion/load per AP
+        self._ap_loads = {}  # Simulated congestion/load per AP
+        self._ap_stations = {}  # Associated stations per AP (load criterion)
+        self._ap_utilization = {}  # Busy airtime fraction per AP
         
         for ap, config in ap_configs.items():
             self.ap_positions[ap] = config['position']
-            self.ap_loads[ap] = config.get('load', 1.0)
+            self._ap_loads[ap] = config.get('load', 1.0)
+            self._ap_stations[ap] = config.get('stations', 0)
+            self._ap_utilization[ap] = config.get('channel_utilization', 0.0)
+        
+        # Decision matrix columns, in order
+        self.criteria = get_criteria(criteria)
+        self.benefit = benefit_mask(self.criteria)
+        
+        # Vectorized distance/RSSI for all APs (coordinates parsed once)
+        self.engine = SignalEngine(aps, self.ap_positions, model=propagation)
+        
+        # Bumped by set_ap_load(); memoized decisions depend on it
+        self.load_version = 0
+        self.memo = memo
         
         # Track decisions
         self.ssf_decisions = []
@@ -40,17 +76,28 @@ class HandoverComparison:
         self.ssf_current_ap = None
         self.ssf_hysteresis = 3  # Reduced for more sensitivity
     
+    @property
+    def ap_loads(self):
+        """Congestion factor per AP (read-only, see set_ap_load)"""
+        return MappingProxyType(self._ap_loads)
+    
+    @property
+    def ap_stations(self):
+        """Associated stations per AP (read-only, see set_ap_load)"""
+        return MappingProxyType(self._ap_stations)
+    
+    @property
+    def ap_utilization(self):
+        """Busy airtime fraction per AP (read-only, see set_ap_load)"""
+        return MappingProxyType(self._ap_utilization)
+    
     def calculate_distance(self, pos1, pos2):
-        """Calculate Euclidean distance"""
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
     
     def estimate_rssi(self, distance):
-        """Path loss model"""
-        if distance < 1:
-            distance = 1
-        return -40 - 20 * math.log10(distance)
+        """RSSI of the engine's propagation model at one distance"""
+        return float(self.engine.model.rssi(distance))
     
     def estimate_delay(self, distance, ap):
         """
@@ -68,26 +115,20 @@ class HandoverComparison:
         
         return (propagation_delay + processing_delay) * distance_factor * load_factor
     
+    def estimate_delays(self, distances):
+        """Vectorized estimate_delay for distances to every AP (last axis = self.aps)"""
+        load_factors = np.array([self.ap_loads[ap] for ap in self.aps])
+        return estimate_delays(distances, load_factors)
+    
     def ssf_decision(self, sta_pos):
         """SSF: Pick strongest RSSI with hysteresis"""
-        best_ap = None
-        best_rssi = float('-inf')
-        current_rssi = None
-        
-        rssi_values = {}
+        rssi = self.engine.rssi_row(sta_pos)
+        rssi_values = dict(zip(self.aps, rssi))
         
-        for ap in self.aps:
-            ap_pos = self.ap_positions[ap]
-            distance = self.calculate_distance(sta_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            rssi_values[ap] = rssi
-            
-            if ap == self.ssf_current_ap:
-                current_rssi = rssi
-            
-            if rssi > best_rssi:
-                best_rssi = rssi
-                best_ap = ap
+        best_idx = int(np.argmax(rssi))
+        best_ap = self.aps[best_idx]
+        best_rssi = rssi[best_idx]
+        current_rssi = rssi_values.get(self.ssf_current_ap)
         
         # Apply hysteresis
         if self.ssf_current_ap and current_rssi:
@@ -99,125 +140,230 @@ class HandoverComparison:
     
     def calculate_entropy_weights(self, decision_matrix):
         """Calculate entropy weights"""
-        dm = np.abs(decision_matrix)
-        
-        col_norms = np.sqrt(np.sum(dm ** 2, axis=0))
-        col_norms = np.where(col_norms == 0, 1e-10, col_norms)
-        normalized = dm / col_norms
-        
-        m = normalized.shape[0]
-        
-        if m <= 1:
-            return np.array([0.5, 0.5])
-        
-        entropies = []
-        k = 1.0 / np.log(m)
-        
-        for j in range(normalized.shape[1]):
-            column = normalized[:, j]
-            col_sum = np.sum(column)
-            if col_sum == 0:
-                entropies.append(0)
-                continue
-            
-            p = column / col_sum
-            p = np.where(p <= 0, 1e-10, p)
-            
-            entropy = -k * np.sum(p * np.log(p))
-            entropies.append(entropy)
-        
-        entropies = np.array(entropies)
-        diversities = 1 - entropies
-        
-        total = np.sum(diversities)
-        if total == 0 or np.isnan(total):
-            return np.array([0.5, 0.5])
-        
-        weights = diversities / total
-        
-        if np.any(np.isnan(weights)):
-            return np.array([0.5, 0.5])
-        
-        return weights
+        return self.calculate_entropy_weights_batch(decision_matrix[None])[0]
+    
+    def calculate_entropy_weights_batch(self, decision_matrices):
+        """Entropy weights for a stack of decision matrices (stations x APs x criteria)"""
+        return entropy_weights_batch(decision_matrices)
     
     def apply_topsis(self, decision_matrix, weights):
         """Apply TOPSIS"""
-        col_norms = np.sqrt(np.sum(decision_matrix ** 2, axis=0))
-        col_norms = np.where(col_norms == 0, 1e-10, col_norms)
-        normalized = decision_matrix / col_norms
-        
-        weighted = normalized * weights
-        
-        ideal = np.array([np.max(weighted[:, 0]), np.min(weighted[:, 1])])
-        negative = np.array([np.min(weighted[:, 0]), np.max(weighted[:, 1])])
-        
-        dist_ideal = np.sqrt(np.sum((weighted - ideal) ** 2, axis=1))
-        dist_negative = np.sqrt(np.sum((weighted - negative) ** 2, axis=1))
-        
-        scores = dist_negative / (dist_ideal + dist_negative + 1e-10)
-        
-        if np.any(np.isnan(scores)):
-            scores = np.ones(len(scores)) / len(scores)
-        
-        best_idx = np.argmax(scores)
-        
-        return best_idx, scores
+        best_idx, scores = self.apply_topsis_batch(decision_matrix[None], weights[None])
+        return best_idx[0], scores[0]
     
-    def mcdm_decision(self, sta_pos):
-        """MCDM: Entropy + TOPSIS"""
-        candidates = []
-        
-        for ap in self.aps:
-            ap_pos = self.ap_positions[ap]
-            distance = self.calculate_distance(sta_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            delay = self.estimate_delay(distance, ap)  # Now considers AP load
-            candidates.append([rssi, delay])
-        
-        decision_matrix = np.array(candidates)
+    def apply_topsis_batch(self, decision_matrices, weights):
+        """
+        TOPSIS for a stack of decision matrices.
+        Returns best AP index per station and (stations x APs) closeness scores
+        """
+        return topsis_batch(decision_matrices, weights, benefit=self.benefit)
+    
+    def set_ap_load(self, ap, load=None, stations=None, channel_utilization=None):
+        """Update an AP's load inputs (None = unchanged) and drop memoized decisions"""
+        if load is not None:
+            self._ap_loads[ap] = load
+        if stations is not None:
+            self._ap_stations[ap] = stations
+        if channel_utilization is not None:
+            self._ap_utilization[ap] = channel_utilization
+        self.load_version += 1
+        if self.memo is not None:
+            self.memo.invalidate()
+    
+    def _memoized(self, sta_positions):
+        """
+        Memo entries (best_idx, rssi, weights, scores, decision_matrix) per
+        station; misses are evaluated together, at the memo's snapped positions.
+        """
+        positions = self.memo.snap(positions_array(sta_positions))
+        if len(positions) == 1:
+            unique, inverse = positions, np.zeros(1, dtype=int)
+        else:
+            unique, inverse = np.unique(positions, axis=0, return_inverse=True)
+        state = (self.load_version, self.engine.version)
+        keys = [self.memo.key(position, state) for position in unique]
+        entries = [self.memo.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        if missing:
+            context = self.criteria_context(unique[missing])
+            matrices = self.build_decision_matrices(context)
+            weights = self.calculate_entropy_weights_batch(matrices)
+            best_idx, scores = self.apply_topsis_batch(matrices, weights)
+            for j, i in enumerate(missing):
+                # Copies: a view would keep the whole batch alive after eviction
+                entry = (int(best_idx[j]), context['rssi'][j, best_idx[j]],
+                         weights[j].copy(), scores[j].copy(), matrices[j].copy())
+                for array in entry[2:]:
+                    array.flags.writeable = False
+                self.memo.put(keys[i], entry)
+                entries[i] = entry
+        return [entries[i] for i in inverse.reshape(-1)]
+    
+    def mcdm_decision(self, sta_pos, context=None):
+        """
+        MCDM: Entropy + TOPSIS
+
+        context: criteria_context(sta_pos) if the caller already has it
+        """
+        if self.memo is not None:
+            best_idx, rssi, weights, scores, decision_matrix = self._memoized(sta_pos)[0]
+            return self.aps[best_idx], rssi, weights, scores, decision_matrix
+        if context is None:
+            context = self.criteria_context(sta_pos)
+        decision_matrix = self.build_decision_matrices(context)[0]  # Delay considers AP load
         weights = self.calculate_entropy_weights(decision_matrix)
         best_idx, scores = self.apply_topsis(decision_matrix, weights)
         
-        return self.aps[best_idx], candidates[best_idx][0], weights, scores, decision_matrix
+        return self.aps[best_idx], context['rssi'][0, best_idx], weights, scores, decision_matrix
+    
+    def criteria_context(self, sta_positions):
+        """Per-station and per-AP arrays the criteria extractors read"""
+        distances = self.engine.distance_matrix(sta_positions)
+        return {
+            'distance': distances,
+            'rssi': self.engine.rssi_from_distance(distances, sta_positions),
+            'load_factor': np.array([self.ap_loads[ap] for ap in self.aps]),
+            'load': np.array([self.ap_stations[ap] for ap in self.aps]),
+            'channel_utilization': np.array([self.ap_utilization[ap] for ap in self.aps]),
+        }
+    
+    def build_decision_matrices(self, context):
+        """Decision matrix for every station, shape (stations, APs, criteria)"""
+        return build_decision_matrices(self.criteria, context)
+    
+    def mcdm_decision_batch(self, sta_positions):
+        """
+        MCDM for many stations at once.
+        Returns best AP index per station, weights (stations x criteria) and scores (stations x APs)
+        """
+        if self.memo is not None:
+            entries = self._memoized(sta_positions)
+            return (np.array([e[0] for e in entries]), np.array([e[2] for e in entries]),
+                    np.array([e[3] for e in entries]))
+        decision_matrices = self.build_decision_matrices(self.criteria_context(sta_positions))
+        weights = self.calculate_entropy_weights_batch(decision_matrices)
+        best_idx, scores = self.apply_topsis_batch(decision_matrices, weights)
+        return best_idx, weights, scores
     
     def analyze_position(self, sta_pos_tuple):
         """Analyze and compare both algorithms at current position"""
         x, y = sta_pos_tuple
-        sta_pos = (str(x), str(y), '0')
+        sta_pos = (float(x), float(y), 0.0)
         
+        # Distances and RSSI once, for the MCDM decision and the metrics table
+        context = self.criteria_context(sta_pos)
         ssf_ap, ssf_rssi, ssf_rssi_values = self.ssf_decision(sta_pos)
-        mcdm_ap, mcdm_rssi, weights, scores, decision_matrix = self.mcdm_decision(sta_pos)
+        mcdm_ap, mcdm_rssi, weights, scores, decision_matrix = self.mcdm_decision(sta_pos, context)
         
         self.ssf_decisions.append(ssf_ap.name)
         self.mcdm_decisions.append(mcdm_ap.name)
         self.positions_analyzed.append((x, y))
         
+        distances = context['distance'][0]
+        rssi = context['rssi'][0]
+        delay = self.estimate_delays(distances)
         metrics = {}
         for i, ap in enumerate(self.aps):
-            ap_pos = self.ap_positions[ap]
-            distance = self.calculate_distance(sta_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            delay = self.estimate_delay(distance, ap)
             metrics[ap.name] = {
-                'distance': distance,
-                'rssi': rssi,
-                'delay': delay,
+                'distance': distances[i],
+                'rssi': rssi[i],
+                'delay': delay[i],
                 'topsis_score': scores[i],
                 'load_factor': self.ap_loads[ap]
             }
+            for j, criterion in enumerate(self.criteria):
+                metrics[ap.name][criterion.name] = decision_matrix[i, j]
         
         return {
             'position': (x, y),
             'ssf_choice': ssf_ap.name,
             'mcdm_choice': mcdm_ap.name,
             'agree': ssf_ap == mcdm_ap,
-            'weights': {'rssi': weights[0], 'delay': weights[1]},
+            'weights': {c.name: w for c, w in zip(self.criteria, weights)},
             'metrics': metrics
         }
 
-def move_and_compare(net, sta, comparator):
-    """Move station through complex path"""
-    time.sleep(3)
+def format_mcdm_position(result):
+    """Per-position metrics table and SSF/MCDM decisions of move_and_compare"""
+    x, y = result['position']
+    lines = [f"\n{'='*90}\n", f"POSITION: ({x:g}, {y:g})\n", f"{'='*90}\n"]
+    
+    # Show metrics with load factor
+    lines.append("\nNetwork Metrics (Load: 1.0=normal, >1.0=congested):\n")
+    lines.append(f"{'AP':<10} {'Dist':<10} {'RSSI':<12} {'Delay':<12} {'Load':<10} {'TOPSIS':<10}\n")
+    lines.append(f"{'-'*80}\n")
+    for ap_name, m in result['metrics'].items():
+        lines.append(f"{ap_name:<10} {m['distance']:>6.1f}m   "
+                     f"{m['rssi']:>8.1f}dBm  {m['delay']:>8.2f}ms   "
+                     f"{m['load_factor']:>6.1f}x    {m['topsis_score']:>8.3f}\n")
+    
+    # Show MCDM weights
+    lines.append(f"\nMCDM Analysis:\n")
+    weights = result['weights']
+    lines.append("  Weights → " + ", ".join(f"{name}: {w:.3f}" for name, w in weights.items()) + "\n")
+    
+    dominant = max(weights, key=weights.get)
+    lines.append(f"  ({dominant} is dominant - more variation across APs)\n")
+    
+    # Show decisions with explanation
+    lines.append(f"\nAlgorithm Decisions:\n")
+    ssf_metrics = result['metrics'][result['ssf_choice']]
+    mcdm_metrics = result['metrics'][result['mcdm_choice']]
+    
+    lines.append(f"  SSF  → {result['ssf_choice']:<4} "
+                 f"(RSSI: {ssf_metrics['rssi']:>6.1f}dBm, ignores delay)\n")
+    lines.append(f"  MCDM → {result['mcdm_choice']:<4} "
+                 f"(RSSI: {mcdm_metrics['rssi']:>6.1f}dBm, Delay: {mcdm_metrics['delay']:>5.1f}ms)\n")
+    
+    if result['agree']:
+        lines.append(f"  ✓ AGREEMENT\n")
+    else:
+        lines.append(f"  ✗ DISAGREEMENT!\n")
+        lines.append(f"  → SSF picked {result['ssf_choice']} (stronger signal)\n")
+        lines.append(f"  → MCDM picked {result['mcdm_choice']} (better overall: considers delay/congestion)\n")
+        
+        # Explain why MCDM is better
+        if mcdm_metrics['delay'] < ssf_metrics['delay']:
+            delay_improvement = ssf_metrics['delay'] - mcdm_metrics['delay']
+            lines.append(f"  → MCDM choice has {delay_improvement:.1f}ms LOWER delay!\n")
+    return "".join(lines)
+
+
+register_formatter('mcdm_position', format_mcdm_position)
+
+
+# More complex path through all APs
+MCDM_WAYPOINTS = [
+    # Start near AP1
+    (15, 25), (25, 25), (35, 25),
+    # Move toward center (between AP1 and AP3)
+    (45, 35), (50, 45),
+    # Move toward AP3
+    (55, 55), (60, 65),
+    # Move toward AP2 (high congestion)
+    (70, 60), (80, 50), (90, 40),
+    # Near AP2
+    (100, 35), (105, 30),
+    # Move down toward AP4
+    (105, 20), (100, 10),
+    # Near AP4
+    (90, 10), (80, 10), (70, 10)
+]
+
+
+def move_and_compare(net, sta, comparator, clock=None, decision_log=None, path=None):
+    """
+    Move station through complex path (paced by clock, real time by default)
+    
+    decision_log: Optional path of a binary decision log (see decision_log.py)
+    path: Trajectory of the station (default: MCDM_WAYPOINTS, one every 1.2s)
+    """
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    log_writer = None
+    if decision_log:
+        log_writer = trace.add_sink(DecisionLogWriter.for_comparator(decision_log, comparator))
+    clock.sleep(3)
     
     info("\n" + "="*90 + "\n")
     info("*** ENHANCED COMPARISON: 4 APs with varying congestion levels\n")
@@ -225,74 +371,23 @@ def move_and_compare(net, sta, comparator):
     info("*** AP3: Medium congestion | AP4: Low congestion\n")
     info("="*90 + "\n\n")
     
-    # More complex path through all APs
-    path = [
-        # Start near AP1
-        (15, 25), (25, 25), (35, 25),
-        # Move toward center (between AP1 and AP3)
-        (45, 35), (50, 45),
-        # Move toward AP3
-        (55, 55), (60, 65),
-        # Move toward AP2 (high congestion)
-        (70, 60), (80, 50), (90, 40),
-        # Near AP2
-        (100, 35), (105, 30),
-        # Move down toward AP4
-        (105, 20), (100, 10),
-        # Near AP4
-        (90, 10), (80, 10), (70, 10)
-    ]
-    
-    for x, y in path:
-        sta.setPosition(f'{x},{y},0')
-        
-        result = comparator.analyze_position((x, y))
-        
-        info(f"\n{'='*90}\n")
-        info(f"POSITION: ({x}, {y})\n")
-        info(f"{'='*90}\n")
-        
-        # Show metrics with load factor
-        info("\nNetwork Metrics (Load: 1.0=normal, >1.0=congested):\n")
-        info(f"{'AP':<10} {'Dist':<10} {'RSSI':<12} {'Delay':<12} {'Load':<10} {'TOPSIS':<10}\n")
-        info(f"{'-'*80}\n")
-        for ap_name, m in result['metrics'].items():
-            info(f"{ap_name:<10} {m['distance']:>6.1f}m   "
-                 f"{m['rssi']:>8.1f}dBm  {m['delay']:>8.2f}ms   "
-                 f"{m['load_factor']:>6.1f}x    {m['topsis_score']:>8.3f}\n")
-        
-        # Show MCDM weights
-        info(f"\nMCDM Analysis:\n")
-        info(f"  Weights → RSSI: {result['weights']['rssi']:.3f}, Delay: {result['weights']['delay']:.3f}\n")
-        
-        if result['weights']['delay'] > 0.5:
-            info(f"  (Delay is dominant - more variation across APs)\n")
-        else:
-            info(f"  (RSSI is dominant - more variation across APs)\n")
+    if path is None:
+        path = piecewise_linear(MCDM_WAYPOINTS, dt=1.2)
+    
+    for position, coords in zip(path.labels(), path.station(0)):
+        sta.setPosition(position)
         
-        # Show decisions with explanation
-        info(f"\nAlgorithm Decisions:\n")
-        ssf_metrics = result['metrics'][result['ssf_choice']]
-        mcdm_metrics = result['metrics'][result['mcdm_choice']]
+        result = comparator.analyze_position((float(coords[0]), float(coords[1])))
         
-        info(f"  SSF  → {result['ssf_choice']:<4} "
-             f"(RSSI: {ssf_metrics['rssi']:>6.1f}dBm, ignores delay)\n")
-        info(f"  MCDM → {result['mcdm_choice']:<4} "
-             f"(RSSI: {mcdm_metrics['rssi']:>6.1f}dBm, Delay: {mcdm_metrics['delay']:>5.1f}ms)\n")
+        if trace.enabled():
+            trace.emit('mcdm_position', **result)
         
-        if result['agree']:
-            info(f"  ✓ AGREEMENT\n")
-        else:
-            info(f"  ✗ DISAGREEMENT!\n")
-            info(f"  → SSF picked {result['ssf_choice']} (stronger signal)\n")
-            info(f"  → MCDM picked {result['mcdm_choice']} (better overall: considers delay/congestion)\n")
-            
-            # Explain why MCDM is better
-            if mcdm_metrics['delay'] < ssf_metrics['delay']:
-                delay_improvement = ssf_metrics['delay'] - mcdm_metrics['delay']
-                info(f"  → MCDM choice has {delay_improvement:.1f}ms LOWER delay!\n")
-        
-        time.sleep(1.2)
+        clock.sleep(path.dt)
+    
+    if log_writer:
+        trace.remove_sink(log_writer)
+        log_writer.close()
+        info(f"*** Decision log saved to {decision_log}\n")
     
     # Enhanced summary
     info(f"\n{'='*90}\n")
@@ -326,9 +421,12 @@ def move_and_compare(net, sta, comparator):
     info(f"{'-'*35}\n")
     for i, pos in enumerate(comparator.positions_analyzed):
         agree_mark = "✓" if comparator.ssf_decisions[i] == comparator.mcdm_decisions[i] else "✗"
-        info(f"({pos[0]:3d},{pos[1]:2d})    {comparator.ssf_decisions[i]}   "
+        info(f"({pos[0]:3g},{pos[1]:2g})    {comparator.ssf_decisions[i]}   "
              f"{comparator.mcdm_decisions[i]}    {agree_mark}\n")
     
+    if comparator.memo is not None:
+        info("\n" + comparator.memo.format_stats())
+    
     info(f"\n{'='*90}\n")
     info("*** KEY INSIGHTS:\n")
     info("*** 1. SSF only sees signal strength - picks closest/strongest AP\n")
@@ -339,8 +437,12 @@ def move_and_compare(net, sta, comparator):
     
     info("\n*** Movement and comparison complete!\n")
 
-def run_comparison():
-    """Run enhanced comparison with 4 APs"""
+def run_comparison(memo=None):
+    """
+    Run enhanced comparison with 4 APs
+
+    memo: Optional DecisionMemo to cache MCDM results across repeated positions
+    """
     net = Mininet_wifi(controller=Controller)
 
     info("*** Creating nodes with 4 APs\n")
@@ -380,7 +482,7 @@ def run_comparison():
         ap4: {'position': ('90', '10', '0'), 'load': 1.0}     # Low congestion
     }
     
-    comparator = HandoverComparison([ap1, ap2, ap3, ap4], ap_configs)
+    comparator = HandoverComparison([ap1, ap2, ap3, ap4], ap_configs, memo=memo)
     
     info("*** Starting complex mobility pattern\n")
     info("*** AP2 is heavily congested (load factor: 2.5x)\n")
@@ -396,5 +498,12 @@ def run_comparison():
     net.stop()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SSF vs MCDM comparison with 4 APs")
+    parser.add_argument('--memo', action='store_true',
+                        help="Cache MCDM decisions per position (decision_memo.py)")
+    parser.add_argument('--memo-quantum', type=float, default=None,
+                        help="Snap positions to this grid in meters before the memo "
+                             "lookup (default exact positions)")
+    args = parser.parse_args()
     setLogLevel('info')
-    run_comparison()
\ No newline at end of file
+    run_comparison(memo=DecisionMemo(quantum=args.memo_quantum) if args.memo else None)
\ No newline at end of file
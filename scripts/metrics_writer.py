@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Streaming writers for handover metrics.
+
+HandoverMetrics.save_to_csv only runs once the mobility loop is over, so a
+crash loses the whole run and every sample stays in memory until then.
+A MetricsWriter instead copies each record into a fixed-size buffer and
+appends it to disk in batches, whenever the buffer fills or flush_interval
+wall-clock seconds have passed. Memory stays bounded by batch_size no
+matter how long the run is.
+
+Two formats share the same buffering:
+
+    CSVMetricsWriter     same columns as save_to_csv
+    BinaryMetricsWriter  fixed-width records behind a small JSON header,
+                         read back (memory-mapped) with read_binary_metrics
+
+write_binary_header / map_binary_records implement that container for
+other fixed-width record streams too (see decision_log.py).
+"""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+
+BINARY_MAGIC = b'HOMETRC1'
+HEADER_ALIGN = 64
+
+
+def record_dtype(n_aps):
+    """Fixed-width record layout for n_aps RSSI columns"""
+    return np.dtype([('timestamp', '<f8'), ('position', '<f8'),
+                     ('rssi', '<f4', (n_aps,)), ('connected', '<i2')])
+
+
+def csv_header(ap_names):
+    """Header line of the metrics CSV (save_to_csv compatible)"""
+    return ",".join(["Timestamp", "Position"] + [f"RSSI_{name.upper()}" for name in ap_names] +
+                    ["Connected_AP"]) + "\n"
+
+
+def format_csv_rows(timestamps, positions, rssi, connected_names):
+    """Format column arrays into CSV text, one line per sample"""
+    if len(timestamps) == 0:
+        return ""
+    rows = np.char.mod('%.2f', timestamps)
+    columns = [np.asarray(positions).astype(str)]
+    columns += [np.char.mod('%.1f', rssi[:, j]) for j in range(rssi.shape[1])]
+    columns.append(connected_names)
+    for column in columns:
+        rows = np.char.add(np.char.add(rows, ','), column)
+    return "\n".join(rows) + "\n"
+
+
+class MetricsWriter(ABC):
+    """Bounded record buffer appended to a file in batches"""
+
+    def __init__(self, path, ap_names, batch_size=1024, flush_interval=5.0, fsync=False):
+        """
+        Args:
+            path: Output file, truncated on open
+            ap_names: AP names in RSSI column order
+            batch_size: Records buffered in memory before a flush
+            flush_interval: Max wall-clock seconds between flushes (None = size only)
+            fsync: Also fsync on every flush (survives power loss, slower)
+        """
+        self.path = path
+        self.ap_names = list(ap_names)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.dtype = self.record_dtype()
+        self._buffer = np.empty(batch_size, dtype=self.dtype)
+        self._size = 0
+        self.records_written = 0
+        self._last_flush = time.monotonic()
+        self._file = self._open()
+
+    def record_dtype(self):
+        return record_dtype(len(self.ap_names))
+
+    @abstractmethod
+    def _open(self):
+        """Open self.path, write the format's header and return the file"""
+
+    @abstractmethod
+    def _write_batch(self, records):
+        """Append a structured array of buffered records to the file"""
+
+    def write(self, timestamp, position, rssi_values, connected):
+        """Buffer one record (connected is the AP column index, -1 = none)"""
+        record = self._buffer[self._size]
+        record['timestamp'] = timestamp
+        record['position'] = position
+        record['rssi'] = rssi_values
+        record['connected'] = connected
+        self._commit()
+
+    def _commit(self):
+        """Count the record just filled in at _buffer[_size], flush if due"""
+        self._size += 1
+        if (self._size == len(self._buffer) or
+                (self.flush_interval is not None and
+                 time.monotonic() - self._last_flush >= self.flush_interval)):
+            self.flush()
+
+    def flush(self):
+        """Append buffered records to the file"""
+        if self._size:
+            self._write_batch(self._buffer[:self._size])
+            self.records_written += self._size
+            self._size = 0
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CSVMetricsWriter(MetricsWriter):
+    """Streams records as save_to_csv formatted rows"""
+
+    def _open(self):
+        f = open(self.path, 'w')
+        f.write(csv_header(self.ap_names))
+        self._names = np.array(self.ap_names + ['None'])
+        return f
+
+    def _write_batch(self, records):
+        self._file.write(format_csv_rows(records['timestamp'], records['position'],
+                                         records['rssi'], self._names[records['connected']]))
+
+
+class BinaryMetricsWriter(MetricsWriter):
+    """
+    Streams raw fixed-width records. File layout: magic, uint32 header
+    length, JSON header (ap_names, dtype) padded to HEADER_ALIGN bytes,
+    then the records back to back.
+    """
+
+    def _open(self):
+        f = open(self.path, 'wb')
+        write_binary_header(f, BINARY_MAGIC, {'ap_names': self.ap_names}, self.dtype)
+        return f
+
+    def _write_batch(self, records):
+        self._file.write(records.tobytes())
+
+
+def write_binary_header(f, magic, header, dtype):
+    """Magic, uint32 length and JSON header (with the record dtype), padded to HEADER_ALIGN"""
+    data = json.dumps(dict(header, dtype=dtype.descr)).encode()
+    prefix = len(magic) + 4
+    data += b' ' * (-(prefix + len(data)) % HEADER_ALIGN)
+    f.write(magic + struct.pack('<I', len(data)) + data)
+
+
+def map_binary_records(path, magic):
+    """
+    Memory-map a file written with write_binary_header plus raw records.
+
+    A partially written trailing record (crash mid-flush) is ignored.
+
+    Returns:
+        (header, records): the JSON header dict and a read-only structured array
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+        header_len, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len))
+    # JSON turns the subarray shape tuples into lists
+    dtype = np.dtype([(field[0], field[1]) + tuple(tuple(f) for f in field[2:])
+                      for field in header['dtype']])
+    offset = len(magic) + 4 + header_len
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return header, np.empty(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+
+def read_binary_metrics(path):
+    """
+    Memory-map a BinaryMetricsWriter file.
+
+    Returns:
+        (ap_names, records): records is a read-only structured array with
+        timestamp, position, rssi (samples, APs) and connected fields
+    """
+    header, records = map_binary_records(path, BINARY_MAGIC)
+    return header['ap_names'], records
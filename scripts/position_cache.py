@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Incremental station-position cache.
+
+Controllers used to look a station's position up on every decision
+(node.params['position'], then node.position, then a hard-coded default)
+and convert the string tuple to floats each time. PositionCache hooks the
+node's setPosition instead: the fallback chain and the float conversion
+run once per move, and every move bumps the node's version so consumers
+can tell which stations moved since they last looked:
+
+    positions.watch(sta)          # once, when the controller is created
+    sta.setPosition('30,20,0')    # cache updated by the hook
+    positions.coords(sta)         # array([30., 20., 0.])
+
+Moves that bypass setPosition (e.g. Mininet-WiFi's own mobility models)
+can be reported with update(). StationRows builds on the versions to
+recompute a station's candidate APs and RSSI row only when the station
+moved or the signal engine changed.
+"""
+
+import weakref
+
+import numpy as np
+
+from signal_engine import parse_position
+
+
+# Position of a station that reports none (the controllers' old fallback)
+DEFAULT_POSITION = ('10', '20', '0')
+
+
+def node_position(node, default=DEFAULT_POSITION):
+    """Position as the node reports it: params['position'], position, or default"""
+    try:
+        return node.params['position']
+    except (KeyError, AttributeError):
+        return getattr(node, 'position', default)
+
+
+class PositionCache:
+    """Float coordinates and a move counter per node, updated on setPosition"""
+
+    def __init__(self, default=DEFAULT_POSITION):
+        """
+        Args:
+            default: Position of nodes that report none
+        """
+        self.default = default
+        # Weak keys: the shared cache must not keep the nodes of finished runs alive
+        self._coords = weakref.WeakKeyDictionary()
+        self._labels = weakref.WeakKeyDictionary()
+        self._versions = weakref.WeakKeyDictionary()
+
+    def watch(self, node):
+        """Cache node's position and hook its setPosition (once per node)"""
+        if node in self._versions:
+            return node
+        set_position = node.setPosition
+
+        def setPosition(*args, **kwargs):
+            result = set_position(*args, **kwargs)
+            self.update(node)
+            return result
+
+        node.setPosition = setPosition
+        self.update(node)
+        return node
+
+    def update(self, node, position=None):
+        """
+        Record a move of node.
+
+        Args:
+            position: New position (default: read it back from the node)
+        """
+        label = node_position(node, self.default) if position is None else position
+        self._labels[node] = label
+        coords = np.array(parse_position(label), dtype=float)
+        coords.flags.writeable = False
+        self._coords[node] = coords
+        self._versions[node] = self._versions.get(node, 0) + 1
+
+    def coords(self, node):
+        """(3,) float coordinates of a watched node (read-only)"""
+        if node not in self._versions:
+            self.watch(node)
+        return self._coords[node]
+
+    def label(self, node):
+        """Position of a watched node as it reported it (for logs and traces)"""
+        if node not in self._versions:
+            self.watch(node)
+        return self._labels[node]
+
+    def version(self, node):
+        """Number of moves seen for node (0 if not watched)"""
+        return self._versions.get(node, 0)
+
+    def coords_array(self, nodes):
+        """(len(nodes), 3) coordinates of several nodes"""
+        return np.array([self.coords(node) for node in nodes], dtype=float).reshape(-1, 3)
+
+    def dirty(self, nodes, seen):
+        """
+        Which nodes moved since a consumer last looked.
+
+        Args:
+            nodes: Nodes in the consumer's order
+            seen: Versions the consumer recorded (array, or None for all dirty)
+
+        Returns:
+            (mask, versions): bool array of moved nodes and the current
+            versions, to store as the next `seen`
+        """
+        versions = np.array([self.version(node) for node in nodes], dtype=np.int64)
+        if seen is None or len(seen) != len(versions):
+            return np.ones(len(versions), dtype=bool), versions
+        return versions != seen, versions
+
+
+class StationRows:
+    """Candidate APs and RSSI row of a station, recomputed only after it moved"""
+
+    def __init__(self, engine, positions):
+        """
+        Args:
+            engine: SignalEngine of the controller
+            positions: PositionCache the station is watched by
+        """
+        self.engine = engine
+        self.positions = positions
+        self._rows = {}
+        self.computed = 0
+        self.reused = 0
+
+    def row(self, sta):
+        """
+        Returns:
+            (cols, rssi): candidate AP columns and their RSSI at the
+            station's current position; the arrays are shared between
+            calls and must not be modified
+        """
+        coords = self.positions.coords(sta)  # watches sta on first use
+        key = (self.positions.version(sta), self.engine.version)
+        cached = self._rows.get(sta)
+        if cached is not None and cached[0] == key:
+            self.reused += 1
+            return cached[1], cached[2]
+        cols = self.engine.candidates(coords)
+        rssi = self.engine.rssi_row(coords, cols)
+        rssi.flags.writeable = False
+        self._rows[sta] = (key, cols, rssi)
+        self.computed += 1
+        return cols, rssi
+
+
+# Cache shared by the controllers unless they are given their own
+positions = PositionCache()
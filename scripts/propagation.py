@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Pluggable radio propagation models.
+
+Every model maps an array of station-AP distances (meters, any shape) to
+RSSI in dBm with array operations only. Models that need geometry beyond
+the distance (wall crossings, floor separation) also receive the station
+(N, 3) and AP (APs, 3) coordinates for a (N, APs) distance matrix.
+
+Models are registered by name, like the MCDM criteria, and looked up with
+get_model(), which also accepts 'name:param=value,...' specs so a scenario
+or command line can pick one:
+
+    free_space     -40 - 20*log10(d), the controllers' original model
+    log_distance   log-distance path loss with a configurable exponent
+    two_ray        Friis up to the crossover distance, 40 dB/decade beyond
+    itu_indoor     ITU-R P.1238 indoor model, floors from the z separation
+    walls          a base model plus a fixed loss per wall crossed
+
+Benchmark every registered model (cost per million evaluations):
+
+    python3 scripts/propagation.py --evaluations 4000000
+"""
+
+from abc import ABC, abstractmethod
+import argparse
+import time
+
+import numpy as np
+
+
+SPEED_OF_LIGHT = 299792458.0  # m/s
+
+
+class PropagationModel(ABC):
+    """Distance (and optionally geometry) -> RSSI, vectorized"""
+
+    name = None
+
+    def __init__(self, tx_power=0.0, **params):
+        """
+        Args:
+            tx_power: Transmit power in dBm (0 keeps the original RSSI scale)
+            params: Model parameters, part of key()
+        """
+        self.tx_power = float(tx_power)
+        self.params = dict(params, tx_power=self.tx_power)
+
+    @abstractmethod
+    def path_loss(self, distances, sta=None, ap=None):
+        """Path loss in dB, same shape as distances"""
+
+    def rssi(self, distances, sta=None, ap=None):
+        """
+        RSSI in dBm for every distance.
+
+        Args:
+            distances: Array of distances in meters
+            sta: Optional (N, 3) station coordinates, when distances is (N, APs)
+            ap: Optional (APs, 3) AP coordinates, when distances is (N, APs)
+        """
+        return self.tx_power - self.path_loss(np.asarray(distances, dtype=float), sta, ap)
+
+    def key(self):
+        """Stable text identity of the model and its parameters (cache keys, logs)"""
+        params = ",".join(f"{k}={v!r}" for k, v in sorted(self.params.items()))
+        return f"{self.name}({params})"
+
+    def __repr__(self):
+        return self.key()
+
+
+class LogDistance(PropagationModel):
+    """PL(d) = ref_loss + 10*n*log10(d / d0), with d clamped to d0"""
+
+    name = 'log_distance'
+
+    def __init__(self, exponent=3.0, ref_loss=40.0, ref_distance=1.0, tx_power=0.0):
+        """
+        Args:
+            exponent: Path loss exponent n (2 = free space, 3-4 indoors)
+            ref_loss: Path loss at the reference distance in dB
+            ref_distance: Reference distance d0 in meters
+        """
+        super().__init__(tx_power, exponent=float(exponent), ref_loss=float(ref_loss),
+                         ref_distance=float(ref_distance))
+        self.exponent = float(exponent)
+        self.ref_loss = float(ref_loss)
+        self.ref_distance = float(ref_distance)
+
+    def path_loss(self, distances, sta=None, ap=None):
+        ratio = np.maximum(distances, self.ref_distance) / self.ref_distance
+        return self.ref_loss + (10 * self.exponent) * np.log10(ratio)
+
+
+class FreeSpace(LogDistance):
+    """Log-distance with n = 2: RSSI = -40 - 20*log10(d) at the default settings"""
+
+    name = 'free_space'
+
+    def __init__(self, ref_loss=40.0, ref_distance=1.0, tx_power=0.0):
+        super().__init__(2.0, ref_loss, ref_distance, tx_power)
+        del self.params['exponent']
+
+
+class TwoRay(PropagationModel):
+    """Two-ray ground reflection: Friis before the crossover distance, d^4 after"""
+
+    name = 'two_ray'
+
+    def __init__(self, tx_height=2.0, rx_height=1.0, frequency=2.412e9, tx_power=0.0):
+        """
+        Args:
+            tx_height, rx_height: Antenna heights above ground in meters
+            frequency: Carrier frequency in Hz (default 802.11 channel 1)
+        """
+        super().__init__(tx_power, tx_height=float(tx_height), rx_height=float(rx_height),
+                         frequency=float(frequency))
+        wavelength = SPEED_OF_LIGHT / frequency
+        self.friis_offset = 20 * np.log10(4 * np.pi / wavelength)
+        self.height_gain = 20 * np.log10(tx_height * rx_height)
+        self.crossover = 4 * np.pi * tx_height * rx_height / wavelength
+
+    def path_loss(self, distances, sta=None, ap=None):
+        log_d = np.log10(np.maximum(distances, 1.0))
+        return np.where(distances < self.crossover,
+                        self.friis_offset + 20 * log_d,
+                        40 * log_d - self.height_gain)
+
+
+class ITUIndoor(PropagationModel):
+    """ITU-R P.1238: PL = 20*log10(f) + N*log10(d) + Lf(n) - 28, f in MHz"""
+
+    name = 'itu_indoor'
+
+    def __init__(self, frequency=2412.0, distance_coefficient=28.0, floor_height=3.0,
+                 floor_loss=15.0, floor_loss_step=4.0, tx_power=0.0):
+        """
+        Args:
+            frequency: Carrier frequency in MHz
+            distance_coefficient: N (28 for offices at 2.4 GHz)
+            floor_height: Meters per floor, floors crossed come from the z separation
+            floor_loss: Lf for one floor in dB
+            floor_loss_step: Extra dB per additional floor
+        """
+        super().__init__(tx_power, frequency=float(frequency),
+                         distance_coefficient=float(distance_coefficient),
+                         floor_height=float(floor_height), floor_loss=float(floor_loss),
+                         floor_loss_step=float(floor_loss_step))
+        self.offset = 20 * np.log10(frequency) - 28
+        self.distance_coefficient = float(distance_coefficient)
+        self.floor_height = float(floor_height)
+        self.floor_loss = float(floor_loss)
+        self.floor_loss_step = float(floor_loss_step)
+
+    def path_loss(self, distances, sta=None, ap=None):
+        loss = self.offset + self.distance_coefficient * np.log10(np.maximum(distances, 1.0))
+        if sta is not None and ap is not None:
+            floors = np.floor(np.abs(sta[:, 2, None] - ap[None, :, 2]) / self.floor_height)
+            loss = loss + np.where(floors > 0,
+                                   self.floor_loss + self.floor_loss_step * (floors - 1), 0.0)
+        return loss
+
+
+class WallAttenuation(PropagationModel):
+    """Base model plus a fixed loss for every wall segment the direct path crosses"""
+
+    name = 'walls'
+
+    def __init__(self, walls=(), wall_loss=5.0, base='free_space', tx_power=0.0):
+        """
+        Args:
+            walls: Sequence of ((x1, y1), (x2, y2)) or ((x1, y1), (x2, y2), loss_db)
+                   segments in plan view
+            wall_loss: Loss in dB of walls given without their own loss
+            base: Model (or registered name) for the unobstructed path loss
+        """
+        self.base = get_model(base)
+        self.walls = [(np.asarray(w[0], dtype=float), np.asarray(w[1], dtype=float),
+                       float(w[2]) if len(w) > 2 else float(wall_loss)) for w in walls]
+        super().__init__(tx_power, walls=[(a.tolist(), b.tolist(), loss) for a, b, loss in self.walls],
+                         base=self.base.key())
+
+    def path_loss(self, distances, sta=None, ap=None):
+        loss = self.base.path_loss(distances, sta, ap)
+        if not self.walls:
+            return loss
+        if sta is None or ap is None:
+            raise ValueError("Wall attenuation needs station and AP coordinates")
+        px, py = sta[:, 0, None], sta[:, 1, None]
+        dx = ap[None, :, 0] - px
+        dy = ap[None, :, 1] - py
+        for a, b, wall_loss in self.walls:
+            ex, ey = b - a
+            # Endpoints on opposite sides of the wall, and wall ends on
+            # opposite sides of the station-AP path
+            side_sta = ex * (py - a[1]) - ey * (px - a[0])
+            side_ap = ex * (ap[None, :, 1] - a[1]) - ey * (ap[None, :, 0] - a[0])
+            side_a = dx * (a[1] - py) - dy * (a[0] - px)
+            side_b = dx * (b[1] - py) - dy * (b[0] - px)
+            crossed = (side_sta * side_ap < 0) & (side_a * side_b < 0)
+            loss = loss + wall_loss * crossed
+        return loss
+
+
+MODELS = {}
+DEFAULT_MODEL = 'free_space'
+
+
+def register_model(name, factory):
+    """Add (or replace) a model factory (class or function returning a model)"""
+    MODELS[name] = factory
+    return factory
+
+
+def parse_model_spec(spec):
+    """'log_distance:exponent=3.5,ref_loss=40' -> ('log_distance', {...})"""
+    name, _, args = spec.partition(':')
+    params = {}
+    for item in filter(None, args.split(',')):
+        key, _, value = item.partition('=')
+        try:
+            params[key.strip()] = float(value)
+        except ValueError:
+            params[key.strip()] = value.strip()
+    return name.strip(), params
+
+
+def get_model(model=None, **params):
+    """
+    Resolve a propagation model.
+
+    Args:
+        model: PropagationModel (returned as is), registered name or
+               'name:param=value,...' spec; None for the default model
+        params: Extra constructor parameters for a name or spec
+    """
+    if isinstance(model, PropagationModel):
+        return model
+    name, spec_params = parse_model_spec(model or DEFAULT_MODEL)
+    try:
+        factory = MODELS[name]
+    except KeyError:
+        raise ValueError(f"Unknown propagation model {name!r}, "
+                         f"registered: {sorted(MODELS)}") from None
+    return factory(**spec_params, **params)
+
+
+for _cls in (FreeSpace, LogDistance, TwoRay, ITUIndoor, WallAttenuation):
+    register_model(_cls.name, _cls)
+
+
+def benchmark(evaluations=1000000, repeat=5, seed=0):
+    """
+    Time every registered model on (stations, APs) distance matrices.
+
+    Returns:
+        Dict {model name: best ms per million evaluations}
+    """
+    rng = np.random.default_rng(seed)
+    n_aps = 100
+    n_sta = max(1, evaluations // n_aps)
+    sta = np.column_stack([rng.uniform(0, 140, n_sta), rng.uniform(0, 90, n_sta),
+                           rng.choice([0.0, 3.0], n_sta)])
+    ap = np.column_stack([rng.uniform(0, 140, n_aps), rng.uniform(0, 90, n_aps),
+                          np.zeros(n_aps)])
+    distances = np.sqrt(((sta[:, None, :] - ap[None, :, :]) ** 2).sum(axis=2))
+    # Example floor plan for the wall model: two interior walls across the area
+    walls = [((60, 0), (60, 90)), ((0, 45), (140, 45), 8.0)]
+
+    results = {}
+    for name in MODELS:
+        model = get_model(name, walls=walls) if name == 'walls' else get_model(name)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            model.rssi(distances, sta, ap)
+            best = min(best, time.perf_counter() - start)
+        results[name] = best / distances.size * 1e6 * 1e3
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the propagation models")
+    parser.add_argument('--evaluations', type=int, default=1000000,
+                        help="Distances per timed call")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed calls per model (best kept)")
+    args = parser.parse_args()
+
+    results = benchmark(args.evaluations, args.repeat)
+    print(f"{'Model':<14} {'ms / 1M evals':>14}")
+    for name, ms in results.items():
+        print(f"{name:<14} {ms:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
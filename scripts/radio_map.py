@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Precomputed radio map for static AP layouts.
+
+AP positions do not move during a run, so RSSI only depends on where the
+station is. RadioMap samples every AP's RSSI once on a regular grid over
+the plot area (max_x=140, max_y=90 in the scripts) and answers lookups by
+bilinear interpolation, i.e. a handful of array gathers per station
+instead of distances and logarithms. Attach it to a SignalEngine and
+rssi_matrix()/rssi_row() use it transparently; positions outside the map
+fall back to the exact model.
+
+Maps are cached on disk as .npy files keyed by the AP layout, area,
+resolution and propagation model (with its parameters), so repeated runs
+of a layout load instantly. Grid points are sampled at station height
+z = 0.
+Interpolation error is largest right next to an AP, where the log-distance
+curve bends most (about 1 dB within 2 m of an AP at 1 m resolution).
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from propagation import get_model
+from signal_engine import positions_array
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'RADIO_MAP_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'wifi-handover'))
+
+
+class RadioMap:
+    """Per-AP RSSI on a regular grid with bilinear lookup"""
+
+    def __init__(self, rssi, resolution, origin=(0.0, 0.0)):
+        """
+        Args:
+            rssi: Array (ny, nx, APs) of RSSI at the grid points
+            resolution: Grid spacing in meters
+            origin: (x, y) of grid point [0, 0]
+        """
+        self.rssi = rssi
+        self.resolution = float(resolution)
+        self.x0, self.y0 = origin
+        self.ny, self.nx = rssi.shape[:2]
+        self._flat = rssi.reshape(self.ny * self.nx, -1)
+
+    @classmethod
+    def build(cls, ap_coords, model=None, max_x=140, max_y=90, resolution=1.0,
+              cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Sample (or load from cache) the RSSI of every AP over [0, max_x] x [0, max_y].
+
+        Args:
+            ap_coords: Array (APs, 2 or 3) of AP coordinates
+            model: Propagation model, registered name or spec (default free space)
+            max_x, max_y: Plot area covered by the map
+            resolution: Grid spacing in meters
+            cache_dir: Directory of cached maps (None disables the disk cache)
+        """
+        ap_coords = positions_array(np.asarray(ap_coords, dtype=float))
+        model = get_model(model)
+        path = None
+        if cache_dir:
+            key = layout_key(ap_coords, max_x, max_y, resolution, model.key())
+            path = os.path.join(cache_dir, f'radio_map_{key}.npy')
+            if os.path.exists(path):
+                return cls(np.load(path, mmap_mode='r'), resolution)
+
+        xs = np.arange(0, max_x + resolution / 2, resolution)
+        ys = np.arange(0, max_y + resolution / 2, resolution)
+        # Row by row: (nx, APs) distances at a time bounds peak memory
+        rssi = np.empty((len(ys), len(xs), len(ap_coords)), dtype=np.float32)
+        row = np.zeros((len(xs), 3))
+        row[:, 0] = xs
+        for iy, y in enumerate(ys):
+            row[:, 1] = y
+            d = row[:, None, :] - ap_coords[None, :, :]
+            rssi[iy] = model.rssi(np.sqrt((d * d).sum(axis=2)), row, ap_coords)
+
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write then rename, so concurrent runs never see a partial file
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                np.save(f, rssi)
+            os.replace(tmp, path)
+        return cls(rssi, resolution)
+
+    @classmethod
+    def for_engine(cls, engine, **kwargs):
+        """Map of a SignalEngine's APs and propagation model (build() keyword arguments)"""
+        return cls.build(engine.ap_coords, engine.model, **kwargs)
+
+    def lookup(self, sta_positions, cols=None):
+        """
+        Interpolated RSSI from every station to every AP (or to AP columns cols).
+
+        Returns:
+            (rssi, inside): (stations, APs) RSSI and a (stations,) bool array,
+            False where the station is outside the map (values clamped to the edge)
+        """
+        sta = positions_array(sta_positions)
+        if len(sta) == 1:
+            return self._lookup_one(sta[0, 0], sta[0, 1], cols)
+        fx = (sta[:, 0] - self.x0) / self.resolution
+        fy = (sta[:, 1] - self.y0) / self.resolution
+        inside = (fx >= 0) & (fx <= self.nx - 1) & (fy >= 0) & (fy <= self.ny - 1)
+        fx = np.clip(fx, 0, self.nx - 1)
+        fy = np.clip(fy, 0, self.ny - 1)
+        ix = np.minimum(fx.astype(np.intp), self.nx - 2)
+        iy = np.minimum(fy.astype(np.intp), self.ny - 2)
+        tx = (fx - ix).astype(np.float32)[:, None]
+        ty = (fy - iy).astype(np.float32)[:, None]
+
+        # Row gathers from the flattened (points, APs) grid
+        i00 = iy * self.nx + ix
+        if cols is None:
+            v00, v01, v10, v11 = (self._flat.take(i, axis=0)
+                                  for i in (i00, i00 + 1, i00 + self.nx, i00 + self.nx + 1))
+        else:
+            cols = np.asarray(cols)[None, :]
+            v00, v01, v10, v11 = (self._flat[i[:, None], cols]
+                                  for i in (i00, i00 + 1, i00 + self.nx, i00 + self.nx + 1))
+        top = v00 + (v01 - v00) * tx
+        bottom = v10 + (v11 - v10) * tx
+        return top + (bottom - top) * ty, inside
+
+    def _lookup_one(self, x, y, cols):
+        """Single station: scalar index math, four AP rows"""
+        fx = (x - self.x0) / self.resolution
+        fy = (y - self.y0) / self.resolution
+        inside = 0 <= fx <= self.nx - 1 and 0 <= fy <= self.ny - 1
+        fx = min(max(fx, 0.0), self.nx - 1)
+        fy = min(max(fy, 0.0), self.ny - 1)
+        ix = min(int(fx), self.nx - 2)
+        iy = min(int(fy), self.ny - 2)
+        tx, ty = fx - ix, fy - iy
+        weights = np.array([(1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty])
+        corners = self.rssi[iy:iy + 2, ix:ix + 2].reshape(4, -1)
+        if cols is not None:
+            corners = corners[:, cols]
+        return (weights @ corners)[None, :], np.array([inside])
+
+
+def layout_key(ap_coords, max_x, max_y, resolution, model):
+    """Cache key of a map: AP layout, area, resolution and propagation model key"""
+    layout = {'aps': np.round(np.asarray(ap_coords, dtype=float), 3).tolist(),
+              'area': [max_x, max_y], 'resolution': resolution, 'model': model}
+    return hashlib.sha1(json.dumps(layout, sort_keys=True).encode()).hexdigest()[:16]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+RSSI smoothing and time-to-trigger for handover decisions.
+
+A static hysteresis margin compares single samples, so one shadowing
+outlier is enough to trigger a disconnect/associate cycle. RSSIFilter
+keeps a smoothed RSSI per (station, AP) in compact float32 arrays, either
+an EWMA or a sliding-window mean, and TimeToTrigger only lets a handover
+fire once the same target AP has kept its advantage for a minimum time:
+
+    filtered = rssi_filter.update(rssi, rows, cols)
+    fire = ttt.check(candidate, now, rows)   # candidate -1 = no condition
+
+Both work on any subset of stations and AP columns, so the single-station
+controllers (row 0) and BatchHandover (all rows) share them. Columns left
+out of an update (APs out of range) lose their history, so an AP coming
+back into range starts from its first new sample.
+"""
+
+import numpy as np
+
+
+class RSSIFilter:
+    """Per-(station, AP) smoothed RSSI: EWMA or sliding-window mean"""
+
+    def __init__(self, n_stations, n_aps, alpha=None, window=None):
+        """
+        Args:
+            n_stations: Rows of the state
+            n_aps: AP columns of the state
+            alpha: EWMA weight of a new sample (0 < alpha <= 1)
+            window: Sliding-window length in samples (instead of alpha)
+        """
+        if (alpha is None) == (window is None):
+            raise ValueError("RSSIFilter needs exactly one of alpha or window")
+        if alpha is not None and not 0 < alpha <= 1:
+            raise ValueError(f"EWMA alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.window = window
+        # NaN = no sample yet: the first sample initializes the state
+        self.value = np.full((n_stations, n_aps), np.nan, dtype=np.float32)
+        if window is not None:
+            self._samples = np.full((n_stations, n_aps, window), np.nan, dtype=np.float32)
+            self._count = np.zeros((n_stations, n_aps), dtype=np.int64)
+
+    @property
+    def n_stations(self):
+        return self.value.shape[0]
+
+    def _index(self, rows, cols):
+        rows = np.arange(self.value.shape[0]) if rows is None else np.atleast_1d(rows)
+        cols = np.arange(self.value.shape[1]) if cols is None else np.atleast_1d(cols)
+        return np.ix_(rows, cols)
+
+    def update(self, rssi, rows=None, cols=None):
+        """
+        Feed new samples and return the filtered RSSI.
+
+        Args:
+            rssi: Array (len(rows), len(cols)) of raw RSSI in dBm
+            rows: Station rows (default all)
+            cols: AP columns (default all); the other columns of these rows
+                  are reset
+
+        Returns:
+            Filtered RSSI, same shape as rssi
+        """
+        if cols is not None:
+            dropped = np.ones(self.value.shape[1], dtype=bool)
+            dropped[cols] = False
+            if dropped.any():
+                self.reset(rows, np.flatnonzero(dropped))
+        index = self._index(rows, cols)
+        rssi = np.asarray(rssi, dtype=np.float32)
+        if self.window is None:
+            state = self.value[index]
+            state = np.where(np.isnan(state), rssi, state + self.alpha * (rssi - state))
+        else:
+            count = self._count[index]
+            samples = self._samples[index]
+            np.put_along_axis(samples, (count % self.window)[..., None], rssi[..., None], axis=-1)
+            self._samples[index] = samples
+            self._count[index] = count + 1
+            filled = np.minimum(count + 1, self.window)
+            state = np.nansum(samples, axis=-1) / filled
+        self.value[index] = state
+        return state.astype(float)
+
+    def reset(self, rows=None, cols=None):
+        """Forget the history of some stations (default all), e.g. after a jump, or of some APs"""
+        if cols is None:
+            index = slice(None) if rows is None else rows
+        else:
+            index = self._index(rows, cols)
+        self.value[index] = np.nan
+        if self.window is not None:
+            self._samples[index] = np.nan
+            self._count[index] = 0
+
+
+class TimeToTrigger:
+    """Per-station pending handover target and the time its condition started"""
+
+    def __init__(self, n_stations, duration):
+        """
+        Args:
+            n_stations: Number of stations
+            duration: Seconds a handover condition must hold before it fires
+        """
+        self.duration = float(duration)
+        self.candidate = np.full(n_stations, -1, dtype=np.int32)
+        self.since = np.zeros(n_stations)
+
+    @property
+    def n_stations(self):
+        return len(self.candidate)
+
+    def check(self, candidate, now, rows=None):
+        """
+        Update the pending targets and report which handovers may fire.
+
+        Args:
+            candidate: Int array of target AP columns per station,
+                       -1 where no handover condition holds
+            now: Current time in seconds
+            rows: Station rows of candidate (default all)
+
+        Returns:
+            Bool array: condition held for at least duration
+        """
+        rows = slice(None) if rows is None else rows
+        candidate = np.asarray(candidate, dtype=np.int32)
+        since = np.where(candidate != self.candidate[rows], now, self.since[rows])
+        self.candidate[rows] = candidate
+        self.since[rows] = since
+        return (candidate >= 0) & (now - since >= self.duration)
+
+    def held(self, now, rows=None):
+        """Seconds the pending condition of each station has held so far"""
+        rows = slice(None) if rows is None else rows
+        return np.where(self.candidate[rows] >= 0, now - self.since[rows], 0.0)
+
+    def reset(self, rows=None):
+        """Drop pending conditions (default all stations)"""
+        rows = slice(None) if rows is None else rows
+        self.candidate[rows] = -1
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Seeded, batched shadowing noise.
+
+Controllers used to call random.gauss() from the global random module once
+per AP per step: runs were not reproducible and consecutive samples were
+independent even when the station had moved only a few centimeters.
+ShadowingNoise owns a seeded NumPy generator, pre-draws standard normals
+in large batches and, with a decorrelation distance, correlates each AP's
+shadowing along the station trajectory (Gudmundson model):
+
+    S_k = rho_k * S_(k-1) + sigma * sqrt(1 - rho_k^2) * Z_k,
+    rho_k = exp(-d_k / decorrelation_distance)
+
+where d_k is the distance moved since the previous sample. The marginal
+distribution stays N(0, sigma^2) for every sample.
+"""
+
+import numpy as np
+
+from signal_engine import positions_array
+
+
+class ShadowingNoise:
+    """Per-controller log-normal shadowing (dB) for a fixed set of APs"""
+
+    def __init__(self, n_aps, sigma, seed=None, decorrelation_distance=None, batch_size=4096):
+        """
+        Args:
+            n_aps: Number of AP columns per sample
+            sigma: Shadowing std-dev in dB (0 disables the noise)
+            seed: Seed of the generator (None = fresh entropy)
+            decorrelation_distance: Meters over which correlation falls to 1/e;
+                                    None draws independent samples
+            batch_size: Standard normals drawn per refill
+        """
+        self.n_aps = n_aps
+        self.sigma = float(sigma)
+        self.decorrelation_distance = decorrelation_distance
+        self.batch_size = max(batch_size, n_aps)
+        self.rng = np.random.default_rng(seed)
+        self._normals = np.empty(0)
+        self._next = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the trajectory state (next sample is uncorrelated)"""
+        self._state = None
+        self._last_position = None
+
+    def _standard_normals(self, n):
+        """Next n values of the pre-drawn N(0, 1) stream"""
+        if self._next + n > len(self._normals):
+            rest = self._normals[self._next:]
+            fresh = self.rng.standard_normal(max(self.batch_size, n))
+            self._normals = np.concatenate([rest, fresh])
+            self._next = 0
+        values = self._normals[self._next:self._next + n]
+        self._next += n
+        return values
+
+    def draw(self, n=1):
+        """n independent shadowing values in dB"""
+        return self.sigma * self._standard_normals(n)
+
+    def sample(self, position=None):
+        """
+        Shadowing of every AP at the station's next position.
+
+        Args:
+            position: Station position; needed for correlated shadowing
+
+        Returns:
+            Array (n_aps,) in dB
+        """
+        if self.sigma <= 0:
+            return np.zeros(self.n_aps)
+        z = self._standard_normals(self.n_aps)
+        if self.decorrelation_distance is None or position is None:
+            return self.sigma * z
+
+        xy = positions_array(position)[0, :2]
+        if self._state is None:
+            self._state = self.sigma * z
+        else:
+            moved = np.hypot(*(xy - self._last_position))
+            rho = np.exp(-moved / self.decorrelation_distance)
+            self._state = rho * self._state + self.sigma * np.sqrt(1 - rho * rho) * z
+        self._last_position = xy
+        return self._state.copy()
+
+    def trajectory(self, positions):
+        """
+        Shadowing of every AP along a whole path, continuing the current state.
+
+        Args:
+            positions: Sequence or array of station positions
+
+        Returns:
+            Array (positions, n_aps) in dB
+        """
+        xy = positions_array(positions)[:, :2] if len(positions) else np.empty((0, 2))
+        if self.sigma <= 0 or len(xy) == 0:
+            return np.zeros((len(xy), self.n_aps))
+        z = self._standard_normals(len(xy) * self.n_aps).reshape(len(xy), self.n_aps)
+        if self.decorrelation_distance is None:
+            return self.sigma * z
+
+        # Per-step correlation and innovation scale for the whole path at once
+        previous = np.vstack([xy[:1] if self._last_position is None else self._last_position,
+                              xy[:-1]])
+        rho = np.exp(-np.hypot(*(xy - previous).T) / self.decorrelation_distance)
+        innovation = self.sigma * np.sqrt(1 - rho * rho)[:, None] * z
+        if self._state is None:
+            innovation[0] = self.sigma * z[0]
+            rho[0] = 0.0
+
+        out = np.empty_like(innovation)
+        state = np.zeros(self.n_aps) if self._state is None else self._state
+        for k in range(len(xy)):
+            state = rho[k] * state + innovation[k]
+            out[k] = state
+        self._state = state.copy()
+        self._last_position = xy[-1]
+        return out
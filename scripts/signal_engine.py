@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Vectorized signal engine shared by the handover controllers.
+
+AP coordinates are parsed into a float array once; distances and RSSI for
+any number of station positions are then computed in a single NumPy call
+instead of a per-AP Python loop. RSSI comes from a pluggable propagation
+model (propagation.py, free space by default). For static layouts a
+precomputed RadioMap (radio_map.py) can replace the per-call model
+evaluation.
+"""
+
+import numpy as np
+from spatial_index import GridIndex
+from propagation import get_model
+
+
+def parse_position(pos):
+    """Convert a node position ('x,y,z' string or tuple of str/float) to [x, y, z] floats"""
+    if isinstance(pos, str):
+        pos = pos.split(',')
+    coords = [float(c) for c in pos][:3]
+    while len(coords) < 3:
+        coords.append(0.0)
+    return coords
+
+
+def positions_array(positions):
+    """Convert one position or a sequence of positions to an (N, 3) float array"""
+    if isinstance(positions, np.ndarray):
+        arr = positions.astype(float, copy=False)
+    elif isinstance(positions, str) or np.isscalar(positions[0]):
+        arr = np.array([parse_position(positions)], dtype=float)
+    else:
+        arr = np.array([parse_position(p) for p in positions], dtype=float)
+    arr = np.atleast_2d(arr)
+    if arr.shape[1] < 3:
+        arr = np.hstack([arr, np.zeros((arr.shape[0], 3 - arr.shape[1]))])
+    return arr
+
+
+class SignalEngine:
+    """Station x AP distance and RSSI matrices for a set of APs"""
+
+    def __init__(self, aps, ap_positions, ap_range=None, model=None):
+        """
+        Args:
+            aps: List of AP objects (column order of every returned matrix)
+            ap_positions: Dict {ap: position} as stored by the controllers
+            ap_range: AP coverage radius in meters; enables the grid index
+                      used by candidates() when set
+            model: Propagation model, registered name or spec (default free space)
+        """
+        # Shared with the controller so add_ap() keeps both in sync
+        self.aps = aps
+        self.ap_positions = ap_positions
+        self.ap_index = {ap: i for i, ap in enumerate(self.aps)}
+        self.ap_coords = np.array([parse_position(ap_positions[ap]) for ap in self.aps],
+                                  dtype=float).reshape(-1, 3)
+        self.model = get_model(model)
+        self.radio_map = None  # Optional precomputed RSSI, see attach_radio_map()
+        self.version = 0  # Bumped whenever RSSI results may change, for row caches
+
+        self.ap_range = ap_range
+        self.grid = None
+        if ap_range:
+            self.grid = GridIndex(ap_range)
+            for i, (x, y, _) in enumerate(self.ap_coords):
+                self.grid.insert(i, x, y)
+
+    def add_ap(self, ap, position):
+        """Register a new AP as the last column"""
+        coords = parse_position(position)
+        self.ap_index[ap] = len(self.aps)
+        self.aps.append(ap)
+        self.ap_positions[ap] = position
+        self.ap_coords = np.vstack([self.ap_coords, coords])
+        self.radio_map = None  # Built for the old layout
+        self.version += 1
+        if self.grid is not None:
+            self.grid.insert(self.ap_index[ap], coords[0], coords[1])
+
+    def move_ap(self, ap, position):
+        """Update an AP's coordinates in place"""
+        i = self.ap_index[ap]
+        coords = parse_position(position)
+        self.ap_positions[ap] = position
+        self.ap_coords[i] = coords
+        self.radio_map = None  # Built for the old layout
+        self.version += 1
+        if self.grid is not None:
+            self.grid.move(i, coords[0], coords[1])
+
+    def attach_radio_map(self, radio_map):
+        """Answer RSSI queries from a precomputed RadioMap of this layout (None to detach)"""
+        self.radio_map = radio_map
+        self.version += 1
+
+    def candidates(self, sta_pos):
+        """Column indices of APs within ap_range of a station (all APs without a range)"""
+        if self.grid is None:
+            return np.arange(len(self.aps))
+        x, y, _ = positions_array(sta_pos)[0]
+        return self.grid.query(x, y, self.ap_range)
+
+    def distance_matrix(self, sta_positions, cols=None):
+        """3D Euclidean distance from every station to every AP (or to AP columns cols)"""
+        sta = positions_array(sta_positions)
+        ap = self.ap_coords if cols is None else self.ap_coords[cols]
+        dx = sta[:, 0, None] - ap[None, :, 0]
+        dy = sta[:, 1, None] - ap[None, :, 1]
+        dz = sta[:, 2, None] - ap[None, :, 2]
+        return np.sqrt(dx * dx + dy * dy + dz * dz)
+
+    def set_model(self, model):
+        """Switch the propagation model (drops a radio map built with the old one)"""
+        self.model = get_model(model)
+        self.radio_map = None
+        self.version += 1
+
+    def rssi_from_distance(self, distances, sta_positions=None, cols=None):
+        """
+        RSSI (dBm) of the propagation model for a distance array.
+
+        Args:
+            distances: Distances in meters; a (stations, APs) matrix when
+                       sta_positions is given
+            sta_positions: Stations of the matrix rows, for geometry-aware models
+            cols: AP columns of the matrix (default all APs)
+        """
+        if sta_positions is None:
+            return self.model.rssi(distances)
+        ap = self.ap_coords if cols is None else self.ap_coords[cols]
+        return self.model.rssi(distances, positions_array(sta_positions), ap)
+
+    def rssi_matrix(self, sta_positions, cols=None):
+        """RSSI (dBm) from every station to every AP, shape (stations, APs)"""
+        sta = positions_array(sta_positions)
+        if self.radio_map is None:
+            return self.rssi_from_distance(self.distance_matrix(sta, cols), sta, cols)
+        rssi, inside = self.radio_map.lookup(sta, cols)
+        rssi = rssi.astype(float)
+        if not inside.all():
+            # Exact model for stations outside the mapped area
+            outside = sta[~inside]
+            rssi[~inside] = self.rssi_from_distance(self.distance_matrix(outside, cols),
+                                                    outside, cols)
+        return rssi
+
+    def rssi_row(self, sta_pos, cols=None):
+        """RSSI (dBm) from a single station position to every AP (or to AP columns cols)"""
+        return self.rssi_matrix(sta_pos, cols)[0]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Discrete-event simulation clock.
+
+Mobility loops used to pace themselves with time.sleep(), so a 23-step
+walk took 23+ wall-clock seconds even when nothing real was attached.
+SimulationClock keeps virtual time and a priority queue of scheduled
+events: sleep()/run() jump straight to the next event time. With
+realtime=True the clock also waits for the wall clock to catch up, which
+is what a live Mininet-WiFi network needs.
+"""
+
+import heapq
+import itertools
+import time
+
+
+class SimulationClock:
+    """Virtual time plus a (time, seq)-ordered event queue"""
+
+    def __init__(self, realtime=False, speed=1.0):
+        """
+        Args:
+            realtime: Sync virtual time to the wall clock (live networks)
+            speed: Virtual seconds per wall second when realtime is set
+        """
+        self.now = 0.0
+        self.realtime = realtime
+        self.speed = speed
+        self._queue = []
+        self._seq = itertools.count()
+        self._wall_start = time.time()
+
+    def time(self):
+        """Current virtual time in seconds"""
+        return self.now
+
+    def schedule_at(self, at, callback, *args):
+        """Run callback(*args) at virtual time `at`"""
+        heapq.heappush(self._queue, (max(at, self.now), next(self._seq), callback, args))
+
+    def schedule(self, delay, callback, *args):
+        """Run callback(*args) `delay` virtual seconds from now"""
+        self.schedule_at(self.now + delay, callback, *args)
+
+    def pending(self):
+        """Number of events still queued"""
+        return len(self._queue)
+
+    def _advance(self, t):
+        if self.realtime:
+            wait = self._wall_start + t / self.speed - time.time()
+            if wait > 0:
+                time.sleep(wait)
+        self.now = t
+
+    def run(self, until=None):
+        """Process events in time order until the queue empties (or virtual time `until`)"""
+        while self._queue and (until is None or self._queue[0][0] <= until):
+            at, _, callback, args = heapq.heappop(self._queue)
+            self._advance(at)
+            callback(*args)
+        if until is not None and until > self.now:
+            self._advance(until)
+
+    def sleep(self, seconds):
+        """Drop-in for time.sleep(): advance virtual time, firing any due events"""
+        self.run(until=self.now + seconds)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Uniform grid index over AP positions.
+
+Only APs within range of a station can ever be selected, so candidate
+lookup only needs to visit the grid cells overlapping the station's range
+circle. Cost scales with local AP density instead of total AP count.
+"""
+
+import math
+import numpy as np
+
+
+class GridIndex:
+    """Bucket AP keys by (x, y) grid cell for fast in-range queries"""
+
+    def __init__(self, cell_size):
+        """
+        Args:
+            cell_size: Grid cell edge in meters (typically the AP range)
+        """
+        self.cell_size = float(cell_size)
+        self.cells = {}   # (cx, cy) -> set of keys
+        self.coords = {}  # key -> (x, y)
+
+    def _cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def insert(self, key, x, y):
+        """Add a key (e.g. AP column index) at (x, y)"""
+        if key in self.coords:
+            self.move(key, x, y)
+            return
+        self.coords[key] = (float(x), float(y))
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+
+    def remove(self, key):
+        """Remove a key from the index"""
+        x, y = self.coords.pop(key)
+        cell = self._cell(x, y)
+        self.cells[cell].discard(key)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def move(self, key, x, y):
+        """Update a key's position, re-bucketing only if it changed cell"""
+        old_x, old_y = self.coords[key]
+        old_cell = self._cell(old_x, old_y)
+        new_cell = self._cell(x, y)
+        self.coords[key] = (float(x), float(y))
+        if new_cell != old_cell:
+            self.cells[old_cell].discard(key)
+            if not self.cells[old_cell]:
+                del self.cells[old_cell]
+            self.cells.setdefault(new_cell, set()).add(key)
+
+    def query(self, x, y, radius):
+        """Sorted array of keys within radius of (x, y)"""
+        span = int(math.ceil(radius / self.cell_size))
+        cx, cy = self._cell(x, y)
+        nearby = []
+        for i in range(cx - span, cx + span + 1):
+            for j in range(cy - span, cy + span + 1):
+                nearby.extend(self.cells.get((i, j), ()))
+        if not nearby:
+            return np.array([], dtype=int)
+
+        keys = np.array(sorted(nearby))
+        pts = np.array([self.coords[k] for k in keys])
+        d2 = (pts[:, 0] - x) ** 2 + (pts[:, 1] - y) ** 2
+        return keys[d2 <= radius * radius]
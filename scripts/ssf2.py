@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
-from mn_wifi.cli import CLI
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+    from mn_wifi.cli import CLI
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi, CLI
 from threading import Thread
-import time
+from sim_clock import SimulationClock
+from trajectory import corridor
 import math
+import time
+import numpy as np
+from signal_engine import SignalEngine, parse_position
+from rssi_filter import RSSIFilter, TimeToTrigger
+import decision_trace
+import position_cache
 
 class SSFHandover:
     """Strongest Signal First (SSF) - Pure RSSI-based handover with hysteresis"""
     
-    def __init__(self, net, sta, aps, hysteresis_margin=5):
+    def __init__(self, net, sta, aps, hysteresis_margin=5, ap_range=None, trace=None,
+                 propagation=None, filter_alpha=None, filter_window=None, time_to_trigger=0.0,
+                 positions=None):
         self.net = net
         self.sta = sta
         self.aps = aps
@@ -33,82 +46,109 @@ class SSFHandover:
                     else:
                         self.ap_positions[ap] = ('100', '40', '0')
         
+        # Vectorized RSSI for all APs (coordinates parsed once); with
+        # ap_range only in-range APs are scored, via the engine's grid index
+        self.engine = SignalEngine(aps, self.ap_positions, ap_range=ap_range,
+                                   model=propagation)
+        self.trace = trace if trace is not None else decision_trace.trace
+        # Station coordinates kept by a setPosition hook; RSSI only recomputed after a move
+        self.positions = positions if positions is not None else position_cache.positions
+        self.positions.watch(sta)
+        self.rows = position_cache.StationRows(self.engine, self.positions)
+        # Optional RSSI smoothing and time-to-trigger against noise-driven handovers
+        self.rssi_filter = None
+        if filter_alpha is not None or filter_window is not None:
+            self.rssi_filter = RSSIFilter(1, len(aps), alpha=filter_alpha, window=filter_window)
+        self.ttt = TimeToTrigger(1, time_to_trigger) if time_to_trigger > 0 else None
+        
     def get_position(self, node):
         """Get position of a node (station or AP)"""
         if node in self.ap_positions:
             return self.ap_positions[node]
         
-        # For station, get current position
-        try:
-            return node.params['position']
-        except (KeyError, AttributeError):
-            try:
-                return node.position
-            except AttributeError:
-                return ('10', '20', '0')  # Default
+        # For station, its current position from the cache
+        return self.positions.label(node)
     
     def calculate_distance(self, pos1, pos2):
-        """Calculate Euclidean distance"""
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
     
     def estimate_rssi(self, distance):
-        """Estimate RSSI using path loss model"""
-        if distance < 1:
-            distance = 1
-        return -40 - 20 * math.log10(distance)
+        """RSSI of the engine's propagation model at one distance"""
+        return float(self.engine.model.rssi(distance))
     
-    def select_best_ap(self):
-        """Select AP with strongest signal (with hysteresis)"""
+    def select_best_ap(self, now=None):
+        """Select AP with strongest signal (with hysteresis and optional time-to-trigger)"""
         current_pos = self.get_position(self.sta)
         
-        best_ap = None
-        best_rssi = float('-inf')
-        current_ap_rssi = None
+        # In-range APs and their RSSI, recomputed only if the station moved
+        cols, rssi = self.rows.row(self.sta)
+        if cols.size == 0:
+            if self.trace.enabled():
+                self.trace.emit('ssf_no_candidate', position=current_pos)
+            return self.current_ap
         
-        rssi_values = {}
+        if self.rssi_filter is not None:
+            rssi = self.rssi_filter.update(rssi[None], cols=cols)[0]
+        best_idx = int(np.argmax(rssi))
+        best_ap = self.aps[cols[best_idx]]
+        best_rssi = rssi[best_idx]
         
-        # Calculate RSSI for all APs
-        for ap in self.aps:
-            ap_pos = self.get_position(ap)
-            distance = self.calculate_distance(current_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            rssi_values[ap] = rssi
-            
-            if ap == self.current_ap:
-                current_ap_rssi = rssi
-            
-            if rssi > best_rssi:
-                best_rssi = rssi
-                best_ap = ap
+        current_ap_rssi = None
+        if self.current_ap in self.engine.ap_index:
+            current_col = np.flatnonzero(cols == self.engine.ap_index[self.current_ap])
+            if current_col.size:
+                current_ap_rssi = rssi[current_col[0]]
         
         # Apply hysteresis: only switch if new AP is significantly better
         if self.current_ap and current_ap_rssi:
             if best_rssi - current_ap_rssi < self.hysteresis_margin:
                 # Stay with current AP (not enough improvement)
-                info(f"\n*** SSF Analysis: Staying with {self.current_ap.name} "
-                     f"(RSSI={current_ap_rssi:.1f}dBm, best={best_rssi:.1f}dBm, "
-                     f"margin={best_rssi-current_ap_rssi:.1f}dB < {self.hysteresis_margin}dB)\n")
+                if self.ttt is not None:
+                    self.ttt.reset()
+                if self.trace.enabled():
+                    self.trace.emit('ssf_stay', ap=self.current_ap.name, rssi=current_ap_rssi,
+                                    best=best_rssi, margin=self.hysteresis_margin)
                 return self.current_ap
+
+        # Time-to-trigger: the target must keep its advantage before we switch
+        # (only while the current AP is still in range; a lost link is left at once)
+        if (self.current_ap and current_ap_rssi is not None and self.ttt is not None
+                and best_ap != self.current_ap):
+            now = time.monotonic() if now is None else now
+            if not self.ttt.check([cols[best_idx]], now)[0]:
+                if self.trace.enabled():
+                    self.trace.emit('ssf_wait', ap=self.current_ap.name, best=best_ap.name,
+                                    held=self.ttt.held(now)[0], ttt=self.ttt.duration)
+                return self.current_ap
+            self.ttt.reset()
+        elif self.ttt is not None:
+            self.ttt.reset()
         
-        # Display all RSSI values
-        info(f"\n*** SSF Analysis at position {current_pos}:\n")
-        for ap, rssi in rssi_values.items():
-            marker = " <-- STRONGEST" if ap == best_ap else ""
-            info(f"*** {ap.name}: RSSI={rssi:.1f}dBm{marker}\n")
+        # Report all RSSI values
+        if self.trace.enabled():
+            self.trace.emit('ssf_select', position=current_pos, best=best_ap.name,
+                            aps=[self.aps[col].name for col in cols], rssi=rssi)
         
         return best_ap
 
-def move_station_ssf(net, sta, handover_controller):
-    """Move station with SSF handover"""
-    time.sleep(3)
+def move_station_ssf(net, sta, handover_controller, clock=None, path=None):
+    """
+    Move station with SSF handover (paced by clock, real time by default)
+    
+    path: Trajectory of the station (default: the x=10 -> 120 corridor)
+    """
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    if path is None:
+        path = corridor()
+    clock.sleep(3)
     info("*** Starting SSF (Strongest Signal First) handover\n")
     
-    for x in range(10, 121, 5):
-        sta.setPosition(f'{x},20,0')
+    for position in path.labels():
+        sta.setPosition(position)
         
-        best_ap = handover_controller.select_best_ap()
+        best_ap = handover_controller.select_best_ap(now=clock.now)
         
         if best_ap != handover_controller.current_ap:
             info(f"\n*** SSF HANDOVER! {handover_controller.current_ap.name if handover_controller.current_ap else 'None'} -> {best_ap.name}\n")
@@ -123,7 +163,7 @@ def move_station_ssf(net, sta, handover_controller):
             
             handover_controller.current_ap = best_ap
         
-        time.sleep(1)
+        clock.sleep(path.dt)
     
     info("*** Movement complete!\n")
 
@@ -152,7 +192,7 @@ def run():
     sta1.setRange(50)
 
     info("*** Initializing SSF handover controller (hysteresis=5dB)\n")
-    handover_controller = SSFHandover(net, sta1, [ap1, ap2], hysteresis_margin=5)
+    handover_controller = SSFHandover(net, sta1, [ap1, ap2], hysteresis_margin=5, ap_range=60)
 
     info("*** Starting mobility\n")
     mobility_thread = Thread(target=move_station_ssf, args=(net, sta1, handover_controller))
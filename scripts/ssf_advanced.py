@@ -1,32 +1,54 @@
 #!/usr/bin/env python3
-from mininet.node import Controller
-from mininet.log import setLogLevel, info
-from mn_wifi.net import Mininet_wifi
-from mn_wifi.cli import CLI
+try:
+    from mininet.node import Controller
+    from mininet.log import setLogLevel, info
+    from mn_wifi.net import Mininet_wifi
+    from mn_wifi.cli import CLI
+except ImportError:
+    # Headless evaluation without Mininet-WiFi (see headless.py)
+    from headless import Controller, setLogLevel, info, Mininet_wifi, CLI
 from threading import Thread
 import time
 import math
-import random
+from sim_clock import SimulationClock
+from trajectory import corridor
+import numpy as np
+from signal_engine import SignalEngine, parse_position
+from rssi_filter import RSSIFilter, TimeToTrigger
+from handover_latency import HandoverLatency, ping_probe
+from iperf_monitor import ThroughputMonitor, IperfLogTail, throughput_dips, format_dips
+from shadowing import ShadowingNoise
+import decision_trace
+import position_cache
 
 
 class SSFHandover:
     """
     Strongest Signal First (SSF) - RSSI-based handover with:
-      - path-loss + random shadowing
+      - path-loss + seeded (optionally spatially correlated) shadowing
       - hysteresis margin
-      - handover delay logging
+      - optional EWMA / sliding-window RSSI smoothing and time-to-trigger
+      - per-stage handover latency (decision, disconnect, associate, link-up,
+        first packet), see handover_latency.py
     """
 
-    def __init__(self, net, sta, aps, hysteresis_margin=5, shadow_sigma=2.0):
+    def __init__(self, net, sta, aps, hysteresis_margin=5, shadow_sigma=2.0, ap_range=None,
+                 trace=None, seed=None, decorrelation_distance=None, shadowing=None,
+                 propagation=None, filter_alpha=None, filter_window=None, time_to_trigger=0.0,
+                 latency=None, positions=None):
         self.net = net
         self.sta = sta
         self.aps = aps
         self.hysteresis_margin = hysteresis_margin  # dB
         self.shadow_sigma = shadow_sigma            # dB std-dev for shadowing
+        # Seeded noise source; decorrelation_distance (m) correlates it along the path
+        self.shadowing = shadowing if shadowing is not None else ShadowingNoise(
+            len(aps), shadow_sigma, seed=seed, decorrelation_distance=decorrelation_distance)
         self.current_ap = None
 
-        # For logging handover events
+        # For logging handover events; latency times every stage of a handover
         self.handover_events = []
+        self.latency = latency if latency is not None else HandoverLatency()
 
         # Store AP positions at initialization (fallbacks included)
         self.ap_positions = {}
@@ -47,80 +69,108 @@ class SSFHandover:
                     else:
                         self.ap_positions[ap] = ('50', '50', '0')
 
+        # Vectorized path-loss RSSI for all APs (coordinates parsed once);
+        # with ap_range only in-range APs are scored, via the grid index
+        self.engine = SignalEngine(aps, self.ap_positions, ap_range=ap_range,
+                                   model=propagation)
+        self.trace = trace if trace is not None else decision_trace.trace
+        # Station coordinates kept by a setPosition hook; path loss only recomputed after a move
+        self.positions = positions if positions is not None else position_cache.positions
+        self.positions.watch(sta)
+        self.rows = position_cache.StationRows(self.engine, self.positions)
+        # Optional RSSI smoothing and time-to-trigger against noise-driven handovers
+        self.rssi_filter = None
+        if filter_alpha is not None or filter_window is not None:
+            self.rssi_filter = RSSIFilter(1, len(aps), alpha=filter_alpha, window=filter_window)
+        self.ttt = TimeToTrigger(1, time_to_trigger) if time_to_trigger > 0 else None
+
     def get_position(self, node):
         """Get position of a node (station or AP)."""
         if node in self.ap_positions:
             return self.ap_positions[node]
 
-        try:
-            return node.params['position']
-        except (KeyError, AttributeError):
-            try:
-                return node.position
-            except AttributeError:
-                return ('10', '20', '0')
+        return self.positions.label(node)
 
     def calculate_distance(self, pos1, pos2):
-        """Calculate 2D Euclidean distance between two (x,y,*) positions."""
-        x1, y1 = float(pos1[0]), float(pos1[1])
-        x2, y2 = float(pos2[0]), float(pos2[1])
-        return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        """3D Euclidean distance between two positions"""
+        return math.dist(parse_position(pos1), parse_position(pos2))
 
     def estimate_rssi(self, distance):
         """
-        Estimate RSSI using log-distance path-loss with optional random shadowing.
-        RSSI(d) = -40 - 20 log10(d) + N(0, shadow_sigma^2)
+        Estimate RSSI with the engine's propagation model plus random shadowing.
+        RSSI(d) = model(d) + N(0, shadow_sigma^2)
         """
-        if distance < 1:
-            distance = 1
-        rssi = -40 - 20 * math.log10(distance)
+        rssi = float(self.engine.model.rssi(distance))
         if self.shadow_sigma > 0:
-            rssi += random.gauss(0, self.shadow_sigma)
+            rssi += self.shadowing.draw()[0]
         return rssi
 
-    def select_best_ap(self):
-        """Select AP with strongest signal (with hysteresis decision)."""
+    def select_best_ap(self, now=None):
+        """Select AP with strongest (smoothed) signal, with hysteresis and time-to-trigger."""
         current_pos = self.get_position(self.sta)
 
-        best_ap = None
-        best_rssi = float('-inf')
-        current_ap_rssi = None
-        rssi_values = {}
+        # In-range APs and their path-loss RSSI, recomputed only if the station moved
+        cols, rssi = self.rows.row(self.sta)
+        if cols.size == 0:
+            if self.trace.enabled():
+                self.trace.emit('ssf_no_candidate', position=current_pos)
+            return self.current_ap
 
-        # Calculate RSSI for all APs
-        for ap in self.aps:
-            ap_pos = self.get_position(ap)
-            distance = self.calculate_distance(current_pos, ap_pos)
-            rssi = self.estimate_rssi(distance)
-            rssi_values[ap] = rssi
+        # Fresh shadowing on every decision
+        if self.shadow_sigma > 0:
+            rssi = rssi + self.shadowing.sample(self.positions.coords(self.sta))[cols]
+        if self.rssi_filter is not None:
+            rssi = self.rssi_filter.update(rssi[None], cols=cols)[0]
 
-            if ap == self.current_ap:
-                current_ap_rssi = rssi
+        best_idx = int(np.argmax(rssi))
+        best_ap = self.aps[cols[best_idx]]
+        best_rssi = rssi[best_idx]
 
-            if rssi > best_rssi:
-                best_rssi = rssi
-                best_ap = ap
+        current_ap_rssi = None
+        if self.current_ap in self.engine.ap_index:
+            current_col = np.flatnonzero(cols == self.engine.ap_index[self.current_ap])
+            if current_col.size:
+                current_ap_rssi = rssi[current_col[0]]
 
         # Apply hysteresis: only switch if new AP is significantly better
         if self.current_ap and current_ap_rssi is not None:
             if best_rssi - current_ap_rssi < self.hysteresis_margin:
-                info(
-                    f"\n*** SSF Analysis: Staying with {self.current_ap.name} "
-                    f"(RSSI={current_ap_rssi:.1f}dBm, best={best_rssi:.1f}dBm, "
-                    f"margin={best_rssi - current_ap_rssi:.1f}dB < {self.hysteresis_margin}dB)\n"
-                )
+                if self.ttt is not None:
+                    self.ttt.reset()
+                if self.trace.enabled():
+                    self.trace.emit('ssf_stay', ap=self.current_ap.name, rssi=current_ap_rssi,
+                                    best=best_rssi, margin=self.hysteresis_margin)
+                return self.current_ap
+
+        # Time-to-trigger: the target must keep its advantage before we switch
+        # (only while the current AP is still in range; a lost link is left at once)
+        if (self.current_ap and current_ap_rssi is not None and self.ttt is not None
+                and best_ap != self.current_ap):
+            now = time.monotonic() if now is None else now
+            if not self.ttt.check([cols[best_idx]], now)[0]:
+                if self.trace.enabled():
+                    self.trace.emit('ssf_wait', ap=self.current_ap.name, best=best_ap.name,
+                                    held=self.ttt.held(now)[0], ttt=self.ttt.duration)
                 return self.current_ap
+            self.ttt.reset()
+        elif self.ttt is not None:
+            self.ttt.reset()
 
-        # Display all RSSI values at this position
-        info(f"\n*** SSF Analysis at position {current_pos}:\n")
-        for ap, rssi in rssi_values.items():
-            marker = " <-- STRONGEST" if ap == best_ap else ""
-            info(f"*** {ap.name}: RSSI={rssi:.1f}dBm{marker}\n")
+        # Report all RSSI values at this position
+        if self.trace.enabled():
+            self.trace.emit('ssf_select', position=current_pos, best=best_ap.name,
+                            aps=[self.aps[col].name for col in cols], rssi=rssi)
 
         return best_ap
 
-    def log_handover(self, old_ap, new_ap, position, t_start, t_end):
-        """Store handover event for later analysis."""
+    def log_handover(self, old_ap, new_ap, position, t_start, t_end, stages=None):
+        """
+        Store handover event for later analysis.
+
+        Args:
+            t_start, t_end: Decision time and end of the handover (seconds)
+            stages: Optional {stage: ms} latency breakdown of this handover
+        """
         delay = t_end - t_start
         event = {
             "from": old_ap.name if old_ap else "None",
@@ -129,25 +179,41 @@ class SSFHandover:
             "t_start": t_start,
             "t_end": t_end,
             "delay": delay,
+            "stages": stages or {},
         }
         self.handover_events.append(event)
+        detail = ", ".join(f"{stage} {ms:.1f}" for stage, ms in event["stages"].items()
+                           if stage != 'total' and np.isfinite(ms))
         info(
             f"*** Handover delay: {delay * 1000:.1f} ms at position {position}, "
-            f"{event['from']} -> {event['to']}\n"
+            f"{event['from']} -> {event['to']}" + (f" ({detail} ms)" if detail else "") + "\n"
         )
 
 
-def move_station_ssf(net, sta, handover_controller):
-    """Move station with SSF handover, logging events."""
-    time.sleep(3)
+def move_station_ssf(net, sta, handover_controller, clock=None, latency_csv=None,
+                     monitor=None, path=None):
+    """
+    Move station with SSF handover, logging events (paced by clock, real time by default).
+
+    Args:
+        latency_csv: Write the per-handover latency breakdown to this file at the end
+        monitor: ThroughputMonitor with the station's iperf log under sta.name;
+                 reports the throughput dip and recovery of every handover
+        path: Trajectory of the station (default: x=10 -> 120 in 5m steps)
+    """
+    if clock is None:
+        clock = SimulationClock(realtime=True)
+    if path is None:
+        path = corridor()
+    clock.sleep(3)
     info("*** Starting SSF (Strongest Signal First) handover movement\n")
 
-    # Move STA from x=10 to x=120 in 5m steps
-    for x in range(10, 121, 5):
-        sta.setPosition(f'{x},20,0')
+    for position in path.labels():
+        sta.setPosition(position)
         current_pos = handover_controller.get_position(sta)
 
-        best_ap = handover_controller.select_best_ap()
+        best_ap = handover_controller.select_best_ap(now=clock.now)
+        t_decision = handover_controller.latency.timer()
 
         if best_ap != handover_controller.current_ap:
             old_ap = handover_controller.current_ap
@@ -157,19 +223,18 @@ def move_station_ssf(net, sta, handover_controller):
             )
             info(f"*** Reason: {best_ap.name} has strongest signal\n")
 
-            t_start = time.time()
-            try:
-                if old_ap:
-                    sta.wintfs[0].disconnect(sta.wintfs[0].associatedTo)
-                sta.wintfs[0].associate(best_ap.wintfs[0])
-            except Exception as e:
-                info(f"*** Association note: {e}\n")
-            t_end = time.time()
+            # Disconnect/associate, then wait for link-up (and first packet)
+            latency = handover_controller.latency
+            record = latency.execute(sta, old_ap, best_ap, current_pos, t_decision=t_decision)
+            if record['error']:
+                info(f"*** Association note: {record['error']}\n")
+            stages = {stage: values[-1] for stage, values in latency.breakdown().items()}
 
             handover_controller.current_ap = best_ap
-            handover_controller.log_handover(old_ap, best_ap, current_pos, t_start, t_end)
+            handover_controller.log_handover(old_ap, best_ap, current_pos, t_decision,
+                                             t_decision + stages['total'] / 1000, stages)
 
-        time.sleep(1)
+        clock.sleep(path.dt)
 
     info("*** Movement complete!\n")
     if handover_controller.handover_events:
@@ -179,6 +244,16 @@ def move_station_ssf(net, sta, handover_controller):
                 f"*** At position {ev['position']}: "
                 f"{ev['from']} -> {ev['to']} in {ev['delay'] * 1000:.1f} ms\n"
             )
+        info(handover_controller.latency.format_summary())
+        if latency_csv:
+            handover_controller.latency.save_csv(latency_csv)
+            info(f"*** Handover latency breakdown saved to {latency_csv}\n")
+        if monitor is not None:
+            monitor.poll()
+            times, mbps = monitor.timeline(sta.name)
+            events = handover_controller.handover_events
+            info(format_dips(throughput_dips(times, mbps, [ev['t_start'] for ev in events]),
+                             events))
     else:
         info("*** No handovers recorded.\n")
 
@@ -260,15 +335,27 @@ def run():
     h1.cmd('iperf -s -i 1 > iperf_server.log &')
 
     # Initialize SSF handover controller with shadowing noise
-    info("*** Initializing SSF handover controller (hysteresis=5dB, shadow_sigma=2dB)\n")
+    info("*** Initializing SSF handover controller (hysteresis=5dB, shadow_sigma=2dB, "
+         "EWMA alpha=0.5, time-to-trigger=2s)\n")
     handover_controller = SSFHandover(
         net, sta1, [ap1, ap2, ap3],
         hysteresis_margin=5,
-        shadow_sigma=2.0
+        shadow_sigma=2.0,
+        ap_range=60,
+        filter_alpha=0.5,
+        time_to_trigger=2.0,
+        # First packet after link-up: a ping to the iperf server
+        latency=HandoverLatency(packet_probe=ping_probe(h1.IP()))
     )
 
-    # Start throughput measurement from STA1 to h1
+    # Start throughput measurement from STA1 to h1, tailing the iperf logs as they grow
     start_background_traffic(sta1, h1.IP(), duration=60, label="sta1")
+    # sta2/sta3 only start iperf with the load spike, so their t0 is inferred
+    monitor = ThroughputMonitor({
+        'sta1': IperfLogTail('sta1_iperf.log', t0=time.perf_counter()),
+        'sta2': IperfLogTail('sta2_iperf.log'),
+        'sta3': IperfLogTail('sta3_iperf.log'),
+    }).start()
 
     # Start load spike thread (to stress AP2 via sta2 & sta3)
     spike_thread = Thread(
@@ -282,7 +369,8 @@ def run():
     info("*** Starting mobility with SSF\n")
     mobility_thread = Thread(
         target=move_station_ssf,
-        args=(net, sta1, handover_controller)
+        args=(net, sta1, handover_controller),
+        kwargs={'latency_csv': 'ssf_handover_latency.csv', 'monitor': monitor}
     )
     mobility_thread.daemon = True
     mobility_thread.start()
@@ -292,6 +380,7 @@ def run():
     # Interactive CLI (you can inspect: sta1 iw dev sta1-wlan0 link, etc.)
     CLI(net)
 
+    monitor.stop()
     info("*** Stopping network\n")
     net.stop()
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep runner for the SSF vs LLF comparison.
+
+Fans independent compare_algorithms2.run_test scenarios out over a process
+pool. Every scenario runs on the headless network with a virtual clock and
+its own seed, so runs share no state and need no Mininet-WiFi. Results are
+streamed back as they complete and aggregated into one comparison table.
+
+    python3 scripts/sweep.py --hysteresis 3 5 8 --shadow-sigma 0 2 \\
+        --ap-counts 2 3 4 --paths line zigzag --seeds 5 \\
+        --propagation free_space log_distance:exponent=3
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Station paths over the 140x90 plot area
+PATHS = {
+    'line': [(x, 20) for x in range(10, 121, 5)],
+    'zigzag': [(x, 20 if (x // 10) % 2 == 0 else 60) for x in range(10, 121, 5)],
+    'return': ([(x, 20) for x in range(10, 121, 5)] +
+               [(x, 30) for x in range(120, 9, -5)]),
+}
+
+
+def ap_layout(count):
+    """
+    'x,y,z' positions for `count` APs spread over x=20..100. The ends stay
+    at y=40 (the standard two-AP layout), odd interior APs drop to y=10
+    (the 3-AP triangle of ssf_advanced.py).
+    """
+    if count == 1:
+        return ('60,40,0',)
+    step = 80 / (count - 1)
+    return tuple(f'{20 + i * step:g},{10 if 0 < i < count - 1 and i % 2 else 40},0'
+                 for i in range(count))
+
+
+def build_scenarios(hysteresis=(5,), shadow_sigma=(0.0,), ap_counts=(2,), paths=('line',),
+                    seeds=1, algorithms=('SSF', 'LLF'), base_seed=0, decorrelation_distance=None,
+                    propagation=('free_space',)):
+    """Cartesian product of sweep parameters, one dict per independent run"""
+    scenarios = []
+    for i, (model, hyst, sigma, n_aps, path, rep, algorithm) in enumerate(itertools.product(
+            propagation, hysteresis, shadow_sigma, ap_counts, paths, range(seeds), algorithms)):
+        scenarios.append({
+            'algorithm': algorithm,
+            'hysteresis': hyst,
+            'shadow_sigma': sigma,
+            'ap_count': n_aps,
+            'path': path,
+            'propagation': model,
+            'rep': rep,
+            # Same seed for SSF and LLF of one repetition: identical noise draws
+            'seed': base_seed + i // len(algorithms),
+            'decorrelation_distance': decorrelation_distance,
+        })
+    return scenarios
+
+
+def run_scenario(scenario):
+    """Worker: one headless run_test, reduced to summary numbers"""
+    # Imported in the worker so each process has its own module state
+    from headless import HeadlessNet, setLogLevel
+    from sim_clock import SimulationClock
+    import compare_algorithms2
+
+    setLogLevel('warning')
+    t_start = time.perf_counter()
+    metrics = compare_algorithms2.run_test(
+        scenario['algorithm'],
+        clock=SimulationClock(),
+        hysteresis_margin=scenario['hysteresis'],
+        shadow_sigma=scenario['shadow_sigma'],
+        decorrelation_distance=scenario.get('decorrelation_distance'),
+        propagation=scenario.get('propagation'),
+        ap_positions=ap_layout(scenario['ap_count']),
+        path=PATHS[scenario['path']],
+        seed=scenario['seed'],
+        net_cls=HeadlessNet,
+        save_csv=False,
+    )
+
+    # Ping-pong: returning to the AP we just left on the next handover
+    events = metrics.handover_events
+    ping_pongs = sum(1 for prev, ev in zip(events, events[1:])
+                     if ev['to'] == prev['from'])
+
+    result = dict(scenario)
+    result.update({
+        'handovers': metrics.get_handover_count(),
+        'ping_pongs': ping_pongs,
+        'samples': len(metrics),
+        'runtime': time.perf_counter() - t_start,
+    })
+    return result
+
+
+def run_sweep(scenarios, workers=None):
+    """Run scenarios on a process pool, yielding each result as it completes"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_scenario, scenario) for scenario in scenarios]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def comparison_table(results):
+    """Mean handovers / ping-pongs per parameter set, SSF and LLF side by side"""
+    groups = {}
+    for r in results:
+        key = (r['propagation'], r['hysteresis'], r['shadow_sigma'], r['ap_count'], r['path'])
+        groups.setdefault(key, {}).setdefault(r['algorithm'], []).append(r)
+
+    def mean(rows, field):
+        return sum(row[field] for row in rows) / len(rows) if rows else float('nan')
+
+    lines = [f"{'Model':<24} {'Hyst':>5} {'Sigma':>6} {'APs':>4} {'Path':<8} "
+             f"{'SSF HO':>7} {'SSF PP':>7} {'LLF HO':>7} {'LLF PP':>7} {'Runs':>5}",
+             '-' * 91]
+    for key in sorted(groups):
+        model, hyst, sigma, n_aps, path = key
+        ssf = groups[key].get('SSF', [])
+        llf = groups[key].get('LLF', [])
+        lines.append(f"{model:<24} {hyst:>5g} {sigma:>6g} {n_aps:>4} {path:<8} "
+                     f"{mean(ssf, 'handovers'):>7.2f} {mean(ssf, 'ping_pongs'):>7.2f} "
+                     f"{mean(llf, 'handovers'):>7.2f} {mean(llf, 'ping_pongs'):>7.2f} "
+                     f"{len(ssf) + len(llf):>5}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSF vs LLF parameter sweep")
+    parser.add_argument('--hysteresis', type=float, nargs='+', default=[5])
+    parser.add_argument('--shadow-sigma', type=float, nargs='+', default=[0.0])
+    parser.add_argument('--ap-counts', type=int, nargs='+', default=[2])
+    parser.add_argument('--paths', nargs='+', default=['line'], choices=sorted(PATHS))
+    parser.add_argument('--seeds', type=int, default=1, help="Repetitions per parameter set")
+    parser.add_argument('--base-seed', type=int, default=0)
+    parser.add_argument('--decorrelation-distance', type=float,
+                        help="Spatially correlated shadowing over this many meters")
+    parser.add_argument('--propagation', nargs='+', default=['free_space'],
+                        help="Propagation models as name or 'name:param=value,...'")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', help="Write per-run results to this CSV file")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.hysteresis, args.shadow_sigma, args.ap_counts,
+                                args.paths, args.seeds, base_seed=args.base_seed,
+                                decorrelation_distance=args.decorrelation_distance,
+                                propagation=args.propagation)
+    print(f"*** Running {len(scenarios)} scenarios on {args.workers} workers")
+
+    results = []
+    t_start = time.perf_counter()
+    for r in run_sweep(scenarios, args.workers):
+        results.append(r)
+        print(f"*** [{len(results)}/{len(scenarios)}] {r['algorithm']} hyst={r['hysteresis']:g} "
+              f"sigma={r['shadow_sigma']:g} aps={r['ap_count']} path={r['path']} "
+              f"model={r['propagation']} "
+              f"seed={r['seed']}: {r['handovers']} handovers")
+    print(f"*** Sweep finished in {time.perf_counter() - t_start:.1f}s\n")
+    print(comparison_table(results))
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\n*** Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Throughput models for the handover metrics.
+
+Two interchangeable sources of per-sample throughput for HandoverMetrics
+(compare_algorithms2.py), both evaluated with array operations and linear
+in the number of samples:
+
+    RateTableModel      802.11g PHY rate from the connected AP's SNR (rate
+                        table lookup), MAC efficiency, airtime shared
+                        equally among the stations on that AP, and a dip
+                        for samples close to a handover
+    MeasuredThroughput  iperf interval samples (iperf_monitor.py) held over
+                        the metrics timestamps they cover
+
+Both provide estimate(metrics, background=None) -> (samples,) Mbps.
+"""
+
+import numpy as np
+
+from mcdm import NOISE_FLOOR
+
+
+# 802.11g OFDM rates (Mbps) and the SNR (dB) each needs: the standard's
+# minimum receiver sensitivities (-82 ... -65 dBm) over a -95 dBm noise floor
+RATES_80211G = np.array([6, 9, 12, 18, 24, 36, 48, 54], dtype=float)
+MIN_SNR_80211G = np.array([13, 14, 16, 18, 21, 25, 29, 30], dtype=float)
+
+
+def handover_dip(positions, handover_positions, window=2.0, factor=0.3):
+    """
+    Throughput factor per sample: `factor` within `window` meters of a handover, else 1.
+
+    Sorted handover positions and one searchsorted per sample keep this
+    O(samples log handovers) instead of a samples x handovers comparison.
+    """
+    positions = np.asarray(positions, dtype=float)
+    handovers = np.sort(np.asarray(handover_positions, dtype=float))
+    if handovers.size == 0:
+        return np.ones(len(positions))
+    # Nearest handover is the one at the insertion point or just before it
+    i = np.searchsorted(handovers, positions)
+    after = handovers[np.minimum(i, len(handovers) - 1)]
+    before = handovers[np.maximum(i - 1, 0)]
+    nearest = np.minimum(np.abs(positions - after), np.abs(positions - before))
+    return np.where(nearest < window, factor, 1.0)
+
+
+def contenders(metrics, background=None):
+    """
+    Stations sharing the connected AP per sample: the station itself plus
+    the AP's background stations ({ap_name: stations}).
+    """
+    background = background or {}
+    per_ap = np.array([background.get(name, 0) for name in metrics.ap_names] + [0], dtype=float)
+    return 1 + per_ap[metrics.connected]  # connected -1 picks the trailing 0
+
+
+class RateTableModel:
+    """SNR -> 802.11g rate, MAC efficiency, equal airtime share and handover dip"""
+
+    def __init__(self, rates=RATES_80211G, min_snr=MIN_SNR_80211G, noise_floor=NOISE_FLOOR,
+                 mac_efficiency=0.55, handover_window=2.0, handover_factor=0.3):
+        """
+        Args:
+            rates: PHY rates in Mbps, ascending
+            min_snr: SNR in dB each rate needs, ascending
+            noise_floor: Noise floor in dBm for SNR = RSSI - noise_floor
+            mac_efficiency: Share of the PHY rate left as TCP goodput
+            handover_window: Samples within this many meters of a handover dip
+            handover_factor: Throughput factor of those samples
+        """
+        self.rates = np.asarray(rates, dtype=float)
+        self.min_snr = np.asarray(min_snr, dtype=float)
+        self.noise_floor = noise_floor
+        self.mac_efficiency = mac_efficiency
+        self.handover_window = handover_window
+        self.handover_factor = handover_factor
+
+    def phy_rate(self, rssi):
+        """Highest rate whose SNR requirement is met (0 below the lowest)"""
+        snr = np.asarray(rssi, dtype=float) - self.noise_floor
+        i = np.searchsorted(self.min_snr, snr, side='right') - 1
+        return np.where(i >= 0, self.rates[np.maximum(i, 0)], 0.0)
+
+    def throughput(self, rssi, stations=1):
+        """Goodput in Mbps of one station among `stations` sharing the AP's airtime"""
+        return self.phy_rate(rssi) * self.mac_efficiency / np.maximum(stations, 1)
+
+    def estimate(self, metrics, background=None):
+        """
+        Modelled throughput per metrics sample (NaN while not associated,
+        so nanmin/nanmean skip samples taken before the first association).
+
+        Args:
+            metrics: HandoverMetrics
+            background: Optional {ap_name: stations} sharing each AP
+        """
+        throughput = self.throughput(metrics.connected_rssi(), contenders(metrics, background))
+        throughput = np.where(metrics.connected >= 0, throughput, np.nan)
+        return throughput * handover_dip(metrics.positions, metrics.get_handover_positions(),
+                                         self.handover_window, self.handover_factor)
+
+
+class MeasuredThroughput:
+    """iperf interval samples mapped onto the metrics timeline"""
+
+    def __init__(self, times, mbps, offset=0.0, interval=None):
+        """
+        Args:
+            times, mbps: Interval end times and throughput (IperfLogTail.series())
+            offset: Subtracted from times to reach the metrics' time base
+                    (e.g. the timer value when the run's clock started)
+            interval: iperf report interval in seconds (default: median
+                      spacing of the interval ends, 0 for a single sample)
+        """
+        order = np.argsort(times)
+        self.times = np.asarray(times, dtype=float)[order] - offset
+        self.mbps = np.asarray(mbps, dtype=float)[order]
+        if interval is None:
+            interval = float(np.median(np.diff(self.times))) if len(self.times) > 1 else 0.0
+        self.interval = interval
+
+    def estimate(self, metrics, background=None):
+        """
+        Measured throughput per metrics sample: the iperf interval covering
+        its timestamp (NaN before the start of the first interval and after
+        the end of the last). background is ignored, contention is already
+        in the measurement.
+        """
+        t = metrics.timestamps
+        i = np.searchsorted(self.times, t, side='left')
+        covered = i < len(self.times)
+        if len(self.times):
+            covered &= t >= self.times[0] - self.interval
+        values = np.full(len(t), np.nan)
+        values[covered] = self.mbps[i[covered]]
+        return values
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Station trajectories generated in bulk with NumPy.
+
+A Trajectory holds the positions of N stations on a common time grid:
+`times` (T,) seconds and `positions` (T, N, 3) meters. Generators build
+them for any number of stations at any time step dt:
+
+    piecewise_linear  through given waypoints (at a speed, at given
+                      times, or one waypoint per sample)
+    random_waypoint   to uniform random destinations at random speeds,
+                      with random pauses
+    gauss_markov      speed and direction with Gauss-Markov memory,
+                      reflected at the area border
+    manhattan         along a street grid, turning at intersections
+
+Random waypoint and Manhattan movement are generated leg by leg for all
+stations at once and then sampled in one vectorized pass; Gauss-Markov
+steps all stations per time step.
+
+The live scripts walk a single station through labels() (setPosition
+strings), and the headless evaluator feeds positions[t] of a population to
+BatchHandover tick by tick:
+
+    path = corridor()                       # x = 10 -> 120 at 5 m/s, y = 20
+    for position in path.labels():
+        sta.setPosition(position)
+        ...
+        clock.sleep(path.dt)
+"""
+
+import numpy as np
+
+
+AREA = (140.0, 90.0)  # plot area of the scripts, meters
+
+
+def format_position(coords):
+    """'x,y,z' setPosition string of a coordinate triple (integers without decimals, others exact)"""
+    return ','.join(str(int(c)) if c.is_integer() else repr(c) for c in map(float, coords))
+
+
+def sample_times(duration, dt):
+    """Sample times 0, dt, 2 dt, ... up to and including duration"""
+    return np.arange(int(np.floor(duration / dt + 1e-9)) + 1) * dt
+
+
+class Trajectory:
+    """Positions of one or more stations sampled on a common time grid"""
+
+    def __init__(self, times, positions):
+        """
+        Args:
+            times: Array (T,) of sample times in seconds, increasing
+            positions: Array (T, N, 2 or 3) or (T, 2 or 3) for one station
+        """
+        self.times = np.asarray(times, dtype=float)
+        positions = np.asarray(positions, dtype=float)
+        if positions.ndim == 2:
+            positions = positions[:, None, :]
+        if positions.shape[2] < 3:
+            pad = np.zeros(positions.shape[:2] + (3 - positions.shape[2],))
+            positions = np.concatenate([positions, pad], axis=2)
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        """(time, (N, 3) positions) per sample"""
+        return zip(self.times, self.positions)
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__} {self.n_stations} stations, "
+                f"{len(self)} samples, dt={self.dt:g}s>")
+
+    @property
+    def n_stations(self):
+        return self.positions.shape[1]
+
+    @property
+    def dt(self):
+        """Sample spacing in seconds (0 for a single sample)"""
+        return float(self.times[1] - self.times[0]) if len(self.times) > 1 else 0.0
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0]) if len(self.times) else 0.0
+
+    def station(self, i=0):
+        """Positions (T, 3) of station i"""
+        return self.positions[:, i]
+
+    def labels(self, i=0):
+        """setPosition strings of station i, one per sample"""
+        return [format_position(p) for p in self.positions[:, i]]
+
+    def resample(self, dt):
+        """Same movement sampled every dt seconds (linear interpolation)"""
+        times = self.times[0] + sample_times(self.duration, dt)
+        flat = self.positions.reshape(len(self.times), -1)
+        columns = [np.interp(times, self.times, flat[:, j]) for j in range(flat.shape[1])]
+        return Trajectory(times, np.stack(columns, axis=1).reshape(len(times), -1, 3))
+
+    def speeds(self):
+        """Array (T - 1, N) of average speed between consecutive samples in m/s"""
+        step = np.diff(self.positions, axis=0)
+        return np.linalg.norm(step, axis=2) / np.diff(self.times)[:, None]
+
+
+def _as_3d(points):
+    """Pad the last axis of a point array to 3 coordinates"""
+    points = np.asarray(points, dtype=float)
+    if points.shape[-1] < 3:
+        pad = np.zeros(points.shape[:-1] + (3 - points.shape[-1],))
+        points = np.concatenate([points, pad], axis=-1)
+    return points
+
+
+def _sample_legs(points, leg_start, leg_time, times):
+    """
+    Positions along piecewise-linear legs at the sample times.
+
+    Args:
+        points: Array (N, K + 1, 3), leg k runs from points[:, k] to points[:, k + 1]
+        leg_start: Array (N, K) of leg start times, increasing per station
+        leg_time: Array (N, K) of travel time per leg; the station waits at
+                  the leg's end until the next leg starts
+        times: Array (T,) of sample times
+
+    Returns:
+        Array (T, N, 3)
+    """
+    n, k = leg_start.shape
+    # One searchsorted for all stations: shift every station's leg starts
+    # into its own time window so the flattened array stays sorted
+    window = max(leg_start.max(initial=0.0), times[-1]) - min(leg_start.min(initial=0.0), times[0]) + 1
+    offsets = np.arange(n)[:, None] * window
+    leg = np.searchsorted((leg_start + offsets).ravel(), (times[None, :] + offsets).ravel(),
+                          side='right').reshape(n, -1) - 1 - np.arange(n)[:, None] * k
+    leg = np.clip(leg, 0, k - 1)
+
+    start = np.take_along_axis(leg_start, leg, axis=1)
+    duration = np.take_along_axis(leg_time, leg, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(duration > 0, (times[None, :] - start) / duration, 1.0)
+    fraction = np.clip(fraction, 0.0, 1.0)[..., None]
+
+    rows = np.arange(n)[:, None]
+    begin = points[rows, leg]
+    end = points[rows, leg + 1]
+    return np.transpose(begin + (end - begin) * fraction, (1, 0, 2))
+
+
+def piecewise_linear(waypoints, dt=1.0, speed=None, times=None):
+    """
+    Movement through waypoints.
+
+    Args:
+        waypoints: Array (K, 2 or 3) for one station or (N, K, 2 or 3)
+        dt: Sample spacing in seconds
+        speed: Constant speed in m/s (waypoint times from the path length)
+        times: Waypoint times (K,) or (N, K); default one waypoint every dt
+               (or from speed)
+
+    Stations that arrive early stay at their last waypoint.
+    """
+    points = _as_3d(waypoints)
+    if points.ndim == 2:
+        points = points[None]
+    n, k = points.shape[:2]
+    if times is not None:
+        times = np.broadcast_to(np.asarray(times, dtype=float), (n, k))
+    elif speed is not None:
+        lengths = np.linalg.norm(np.diff(points, axis=1), axis=2)
+        times = np.concatenate([np.zeros((n, 1)), np.cumsum(lengths, axis=1) / speed], axis=1)
+    else:
+        times = np.broadcast_to(np.arange(k) * dt, (n, k))
+    samples = times[:, 0].min() + sample_times(times[:, -1].max() - times[:, 0].min(), dt)
+    if k == 1:
+        return Trajectory(samples, np.broadcast_to(points[:, 0], (len(samples), n, 3)))
+    return Trajectory(samples, _sample_legs(points, times[:, :-1], np.diff(times, axis=1), samples))
+
+
+def corridor(start=10, end=120, y=20, speed=5.0, dt=1.0):
+    """The scripts' standard walk: along y from x=start to x=end (10 -> 120 in 5 m steps)"""
+    return piecewise_linear([(start, y, 0), (end, y, 0)], dt=dt, speed=speed)
+
+
+def _start_positions(rng, n_stations, area, start):
+    if start is None:
+        return rng.uniform((0, 0), area, (n_stations, 2))
+    return np.broadcast_to(np.asarray(start, dtype=float)[..., :2], (n_stations, 2)).copy()
+
+
+def random_waypoint(n_stations, duration, dt=1.0, area=AREA, speed=(0.5, 1.5), pause=(0.0, 10.0),
+                    seed=None, start=None):
+    """
+    Random waypoint mobility.
+
+    Args:
+        n_stations: Number of stations
+        duration: Seconds to generate
+        dt: Sample spacing in seconds
+        area: (width, height) in meters
+        speed: (min, max) m/s, drawn per leg
+        pause: (min, max) seconds waited at every destination
+        seed: Seed of the generator
+        start: Optional start position (x, y) or (N, 2) (default uniform)
+    """
+    rng = np.random.default_rng(seed)
+    position = _start_positions(rng, n_stations, area, start)
+    points, starts, travel = [position], [], []
+    t = np.zeros(n_stations)
+    while (t <= duration).any():
+        destination = rng.uniform((0, 0), area, (n_stations, 2))
+        leg_time = (np.linalg.norm(destination - position, axis=1) /
+                    rng.uniform(speed[0], speed[1], n_stations))
+        starts.append(t)
+        travel.append(leg_time)
+        t = t + leg_time + rng.uniform(pause[0], pause[1], n_stations)
+        points.append(destination)
+        position = destination
+    samples = sample_times(duration, dt)
+    return Trajectory(samples, _sample_legs(_as_3d(np.stack(points, axis=1)),
+                                            np.stack(starts, axis=1), np.stack(travel, axis=1),
+                                            samples))
+
+
+def gauss_markov(n_stations, duration, dt=1.0, area=AREA, mean_speed=1.0, alpha=0.75,
+                 speed_sigma=0.3, direction_sigma=0.5, seed=None, start=None):
+    """
+    Gauss-Markov mobility: speed and direction are AR(1) processes.
+
+        s_n = a s_(n-1) + (1 - a) mean_speed + sqrt(1 - a^2) speed_sigma z
+        d_n = a d_(n-1) + (1 - a) d_mean     + sqrt(1 - a^2) direction_sigma z
+
+    with a = alpha ** dt, so the memory per second does not depend on the
+    sample spacing. Each station keeps its initial direction as d_mean;
+    stations reflect off the area border (direction mirrored with them).
+
+    Args:
+        alpha: Memory per second, 0 (random walk) .. 1 (straight line)
+    """
+    rng = np.random.default_rng(seed)
+    samples = sample_times(duration, dt)
+    a = alpha ** dt
+    noise = np.sqrt(1 - a * a)
+    width, height = area
+
+    out = np.zeros((len(samples), n_stations, 3))
+    position = _start_positions(rng, n_stations, area, start)
+    speed = np.full(n_stations, float(mean_speed))
+    direction = rng.uniform(0, 2 * np.pi, n_stations)
+    mean_direction = direction.copy()
+    out[0, :, :2] = position
+    for i in range(1, len(samples)):
+        speed = np.maximum(a * speed + (1 - a) * mean_speed +
+                           noise * speed_sigma * rng.standard_normal(n_stations), 0.0)
+        direction = (a * direction + (1 - a) * mean_direction +
+                     noise * direction_sigma * rng.standard_normal(n_stations))
+        position = position + (speed * dt)[:, None] * np.column_stack([np.cos(direction),
+                                                                       np.sin(direction)])
+        # Reflect off the border; mirror the direction (and its mean) too
+        for axis, limit in ((0, width), (1, height)):
+            low, high = position[:, axis] < 0, position[:, axis] > limit
+            position[low, axis] *= -1
+            position[high, axis] = 2 * limit - position[high, axis]
+            hit = low | high
+            if hit.any():
+                mirror = np.pi if axis == 0 else 0.0
+                direction[hit] = mirror - direction[hit]
+                mean_direction[hit] = mirror - mean_direction[hit]
+        out[i, :, :2] = position
+    return Trajectory(samples, out)
+
+
+# Heading -> unit step on the street grid: east, north, west, south
+_HEADINGS = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)])
+
+
+def manhattan(n_stations, duration, dt=1.0, area=AREA, block=20.0, speed=(0.5, 1.5),
+              turn=(0.5, 0.25, 0.25), seed=None):
+    """
+    Manhattan grid mobility: streets every `block` meters, one block per leg.
+
+    At every intersection a station goes straight, left or right with the
+    probabilities `turn`; if that street leaves the area it tries the other
+    turns and, at a dead end, turns back. Speed is drawn once per station.
+    """
+    rng = np.random.default_rng(seed)
+    nx, ny = int(area[0] // block), int(area[1] // block)
+    cell = np.column_stack([rng.integers(0, nx + 1, n_stations),
+                            rng.integers(0, ny + 1, n_stations)])
+    heading = rng.integers(0, 4, n_stations)
+    leg_time = block / rng.uniform(speed[0], speed[1], n_stations)
+    legs = int(np.ceil(duration / leg_time.min())) + 1
+
+    turns = np.array([0, 1, 3])  # straight, left, right (heading offsets)
+    cells = [cell]
+    for _ in range(legs):
+        preferred = turns[rng.choice(3, n_stations, p=turn)]
+        options = [preferred] + [np.full(n_stations, t) for t in (0, 1, 3, 2)]
+        chosen = np.full(n_stations, -1)
+        for option in options:
+            candidate = (heading + option) % 4
+            target = cell + _HEADINGS[candidate]
+            valid = ((target[:, 0] >= 0) & (target[:, 0] <= nx) &
+                     (target[:, 1] >= 0) & (target[:, 1] <= ny) & (chosen < 0))
+            chosen[valid] = candidate[valid]
+        heading = chosen
+        cell = cell + _HEADINGS[heading]
+        cells.append(cell)
+
+    samples = sample_times(duration, dt)
+    starts = leg_time[:, None] * np.arange(legs)
+    return Trajectory(samples, _sample_legs(_as_3d(np.stack(cells, axis=1) * block), starts,
+                                            np.broadcast_to(leg_time[:, None], starts.shape),
+                                            samples))
+
+
+def main():
+    """Generation time of every model for a large population"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Trajectory generation benchmark")
+    parser.add_argument('--stations', type=int, default=5000)
+    parser.add_argument('--duration', type=float, default=600.0)
+    parser.add_argument('--dt', type=float, default=1.0)
+    args = parser.parse_args()
+
+    for name, generate in (('random_waypoint', random_waypoint), ('gauss_markov', gauss_markov),
+                           ('manhattan', manhattan)):
+        t_start = time.perf_counter()
+        path = generate(args.stations, args.duration, args.dt, seed=0)
+        elapsed = time.perf_counter() - t_start
+        print(f"{name:<16} {path!r}: {elapsed * 1000:8.1f} ms, "
+              f"mean speed {path.speeds().mean():.2f} m/s")
+
+
+if __name__ == '__main__':
+    main()